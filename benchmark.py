@@ -0,0 +1,490 @@
+"""
+Herramientas de medición de rendimiento y calidad del juego.
+
+Uso:
+    python benchmark.py riffle [--mazos N] [--max-riffles K] [--modelo paquetes|gsr]
+    python benchmark.py superficies [--repeticiones N]
+    python benchmark.py escala [--mazos 1,2,4,...] [--rangos R] [--mazos-juego 1,2,4,...]
+    python benchmark.py carga [--hilos 1,2,4,...] [--repeticiones N] [--paquete recursos.pak]
+    python benchmark.py dibujo [--escenas N] [--fotogramas N] [--acelerado]
+    python benchmark.py repartos [--repartos N]
+"""
+import argparse
+import math
+import os
+import random
+import time
+
+from reglas import NUM_RANGOS, NUM_PALOS
+
+
+# RIFFLE: velocidad y calidad de la mezcla
+
+def _histograma(volteadas, n):
+    import numpy as np
+    return np.bincount(volteadas, minlength=n + 1) / len(volteadas)
+
+
+def benchmark_riffle(args):
+    import numpy as np
+    from riffle import riffles_vectorizados, cartas_volteadas_vectorizado
+
+    rng = np.random.default_rng(args.semilla)
+    n = NUM_RANGOS * NUM_PALOS
+    mazo_nuevo = np.arange(n, dtype=np.int16)  # Orden de fábrica: palo por palo, A..K
+
+    # Velocidad de un riffle sobre muchos mazos
+    mazos = np.broadcast_to(mazo_nuevo, (args.mazos, n))
+    inicio = time.perf_counter()
+    riffles_vectorizados(mazos, 1, args.modelo, rng)
+    duracion = time.perf_counter() - inicio
+    print(f"Modelo '{args.modelo}': {args.mazos} mazos en {duracion:.3f} s "
+          f"({args.mazos / duracion / 1e6:.2f} millones de riffles/s)")
+
+    # Distribución de referencia: mezcla uniforme (dos muestras para medir el ruido)
+    def resultados(mazos):
+        return cartas_volteadas_vectorizado(mazos % NUM_RANGOS + 1)
+
+    uniforme = _histograma(resultados(rng.permuted(mazos, axis=1)), n)
+    ruido = 0.5 * np.abs(_histograma(resultados(rng.permuted(mazos, axis=1)), n) - uniforme).sum()
+    umbral = args.tolerancia * ruido
+    print(f"Referencia uniforme: victorias {uniforme[n]:.4%}, ruido de muestreo TV={ruido:.4f}, umbral={umbral:.4f}")
+    print()
+    print(f"{'riffles':>7} {'victorias':>10} {'TV':>8}")
+
+    mezclado = None
+    actuales = mazos
+    for k in range(1, args.max_riffles + 1):
+        actuales = riffles_vectorizados(actuales, 1, args.modelo, rng)
+        histograma = _histograma(resultados(actuales), n)
+        tv = 0.5 * np.abs(histograma - uniforme).sum()
+        print(f"{k:>7} {histograma[n]:>10.4%} {tv:>8.4f}")
+        if mezclado is None and tv <= umbral:
+            mezclado = k
+    print()
+    if mezclado is None:
+        print(f"Tras {args.max_riffles} riffles los resultados aún no coinciden con una mezcla uniforme")
+    else:
+        print(f"Riffles necesarios para igualar una mezcla uniforme: {mezclado}")
+
+
+# SUPERFICIES: formato elegido y coste de blit de cada recurso
+
+def _juego_sin_ventana():
+    """
+    Importa juegoBaraja con los drivers "dummy" de SDL y devuelve el módulo.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))  # Rutas de recursos relativas
+    import juegoBaraja
+    return juegoBaraja
+
+
+def _tiempo_blit(pantalla, superficie, flags, repeticiones):
+    pantalla.blit(superficie, (0, 0), special_flags=flags)  # El primer blit codifica el RLE
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        pantalla.blit(superficie, (0, 0), special_flags=flags)
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def _tiempo_dibujo(juegoBaraja, juego, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        juego.draw(juegoBaraja.screen)
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def benchmark_superficies(args):
+    import pygame
+    import superficies
+    juegoBaraja = _juego_sin_ventana()
+    pantalla = juegoBaraja.screen
+
+    juego = juegoBaraja.Juego()
+    juego.caras.todas()  # Las caras también, aunque no se hayan visto
+    candidatos = [superficies.OPACO, superficies.CLAVE, superficies.ALFA, superficies.ALFA_RLE]
+    if hasattr(pygame.Surface, 'premul_alpha'):
+        candidatos.append(superficies.PREMULTIPLICADO)
+
+    print("Coste de un blit por formato (µs); * = formato elegido por cargar_imagen")
+    print(f"{'recurso':<28} {'clase':<12}" + ''.join(f"{c:>17}" for c in candidatos))
+    originales = {}
+    for ruta, (size, elegido) in sorted(juego.imagenes_cargadas.items()):
+        original = pygame.image.load(ruta).convert_alpha()
+        if size:
+            original = pygame.transform.scale(original, size)
+        originales[ruta] = original
+        clase = superficies.clasificar_alfa(original)
+        columnas = []
+        for formato in candidatos:
+            # Opaco y clave solo conservan el aspecto en imágenes opacas o binarias
+            if (formato == superficies.OPACO and clase != 'opaca') or \
+               (formato == superficies.CLAVE and clase != 'binaria'):
+                columnas.append(f"{'-':>17}")
+                continue
+            preparada = superficies.preparar_superficie(original, formato)
+            flags = superficies.FLAGS_BLIT.get(formato, 0)
+            tiempo = _tiempo_blit(pantalla, preparada, flags, args.repeticiones) * 1e6
+            marca = '*' if formato == elegido else ' '
+            columnas.append(f"{tiempo:>16.1f}{marca}")
+        nombre = ruta if len(ruta) <= 28 else '...' + ruta[-25:]
+        print(f"{nombre:<28} {clase:<12}" + ''.join(columnas))
+
+    # Fotograma completo de la mesa repartida: formatos elegidos frente a convert_alpha
+    juego.estado = juegoBaraja.Juego.ESTADO_JUEGO
+    juego.repartir()
+    while juego.animando_reparto:
+        juego.actualizar_reparto(1000)
+    optimizado = _tiempo_dibujo(juegoBaraja, juego, args.repeticiones // 10)
+
+    def solo_alfa(ruta):
+        return superficies.preparar_superficie(originales[ruta], superficies.ALFA)
+    juego.fondo = solo_alfa(os.path.join("recursos", "fondo.png"))
+    juego.img_mascota = solo_alfa(os.path.join("recursos", "mascota.png"))
+    reverso = solo_alfa(os.path.join("recursos", "reversoo.png"))
+    for pila in juego.cartas_por_posicion.values():
+        for carta in pila:
+            carta.imagen_reverso = reverso.copy()
+    sin_optimizar = _tiempo_dibujo(juegoBaraja, juego, args.repeticiones // 10)
+    print()
+    print(f"Mesa repartida: {optimizado * 1e3:.2f} ms por fotograma con los formatos elegidos, "
+          f"{sin_optimizar * 1e3:.2f} ms con convert_alpha en todo ({sin_optimizar / optimizado:.1f}x)")
+
+
+# ESCALA: cómo crecen simulación, comprobación del resultado y dibujo con el tamaño del mazo
+
+def _tiempo_medio(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def _imprimir_escala(titulo, columnas, filas):
+    """
+    Imprime µs por carta de cada medición y, entre tamaños consecutivos, el
+    exponente de crecimiento (1 = lineal). Un '!' marca exponentes por
+    encima de 1.3: crecimiento superlineal.
+    """
+    print(titulo)
+    anchos = [max(16, len(c) + 11) for c in columnas]
+    print(f"{'cartas':>8}" + ''.join(f"{c + ' µs/carta':>{a}}{'exp':>7}" for c, a in zip(columnas, anchos)))
+    anterior = None
+    for n, tiempos in filas:
+        linea = f"{n:>8}"
+        for i, tiempo in enumerate(tiempos):
+            exponente = ''
+            if anterior is not None:
+                n_ant, tiempos_ant = anterior
+                e = math.log(tiempo / tiempos_ant[i]) / math.log(n / n_ant)
+                exponente = f"{e:.2f}" + ('!' if e > 1.3 else ' ')
+            linea += f"{tiempo / n * 1e6:>{anchos[i]}.3f}{exponente:>7}"
+        print(linea)
+        anterior = (n, tiempos)
+    print()
+
+
+def benchmark_escala(args):
+    from reglas import crear_valores, simular_partida, calcular_trayectoria
+    from riffle import np, cartas_volteadas_vectorizado
+
+    columnas = ['simular_partida', 'calcular_trayectoria']
+    if np is not None:
+        columnas.append('vectorizado')
+    filas = []
+    rng = random.Random(args.semilla)
+    for num_mazos in args.mazos:
+        valores = crear_valores(num_mazos, args.rangos)
+        rng.shuffle(valores)
+        n = len(valores)
+        repeticiones = max(1, args.cartas_por_medicion // n)
+        tiempos = [
+            _tiempo_medio(lambda: simular_partida(valores, args.rangos), repeticiones),
+            _tiempo_medio(lambda: calcular_trayectoria(valores, args.rangos), repeticiones),
+        ]
+        if np is not None:
+            # 100 partidas por llamada; se divide para dar el coste de una partida
+            matriz = np.array([rng.sample(valores, n) for _ in range(100)], dtype=np.int32)
+            tiempos.append(_tiempo_medio(lambda: cartas_volteadas_vectorizado(matriz, args.rangos),
+                                         max(1, repeticiones // 100)) / 100)
+        filas.append((n, tiempos))
+    _imprimir_escala(f"Reglas ({args.rangos} rangos, una pila por rango):", columnas, filas)
+
+    # Motor completo con pygame: reparto, partida y dibujo de la mesa
+    juegoBaraja = _juego_sin_ventana()
+    juego = juegoBaraja.Juego()
+    filas = []
+    for num_mazos in args.mazos_juego:
+        juego.num_mazos = num_mazos
+        # Varias partidas por tamaño: las perdidas terminan tras pocas jugadas
+        reparto = partida = 0.0
+        partidas = jugadas = 0
+        while partidas < args.partidas or jugadas < 10 * len(juego.mazo):
+            juego.reiniciar_juego()
+            rng.shuffle(juego.mazo)
+            juego.estado = juegoBaraja.Juego.ESTADO_JUEGO
+            inicio = time.perf_counter()
+            juego.repartir()
+            while juego.animando_reparto:
+                juego.actualizar_reparto(juego.duracion_reparto_carta)
+            reparto += time.perf_counter() - inicio
+            juego.jugando = True
+            inicio = time.perf_counter()
+            while juego.jugando:
+                juego.aplicar_jugada()
+            partida += time.perf_counter() - inicio
+            partidas += 1
+            jugadas += juego.paso_trayectoria
+        # Mesa con la mitad de las cartas volteadas, como a mitad de partida. No
+        # sirve juego.mazo: el reparto lo vacía y se dibujarían solo reversos
+        juego.cartas_volteadas = set(juego.cartas_por_id[::2])
+        assert juego.cartas_volteadas, "sin cartas volteadas el fotograma no dibuja caras"
+        juego.draw(juegoBaraja.screen)  # Las caras se cargan al verlas: fuera de la medida
+        dibujo = _tiempo_medio(lambda: juego.draw(juegoBaraja.screen), args.fotogramas)
+        reparto /= partidas
+        partida *= juego.total_cartas / jugadas  # Coste de voltear todas las cartas
+        filas.append((juego.total_cartas, [reparto, partida, dibujo]))
+    _imprimir_escala("Juego (13 pilas):", ['reparto', 'partida', 'fotograma'], filas)
+
+
+# CARGA: decodificación de las imágenes de las cartas con distinto número de hilos
+
+def benchmark_carga(args):
+    from cargador import CargadorImagenes
+    import paquete
+    juegoBaraja = _juego_sin_ventana()
+    juegoBaraja.RUTA_PAQUETE = None  # Primero desde img/ y recursos/
+    juego = juegoBaraja.Juego()
+    print(f"Núcleos disponibles: {os.cpu_count()}")
+    print(f"{'hilos':>5} {'cargar caras ms':>17} {'solo decodificar ms':>20} {'aceleración':>12}")
+    rutas = [(os.path.join("img", nombre), (juegoBaraja.CARD_WIDTH, juegoBaraja.CARD_HEIGHT))
+             for nombre in os.listdir("img") if nombre.endswith(".png")]
+
+    def cargar_caras():
+        juego.caras.vaciar()  # Las caras se cargan al verlas: forzar todas
+        juego.caras.todas()
+
+    base = None
+    for hilos in args.hilos or [1, os.cpu_count() or 1]:
+        juego.cargador.cerrar()
+        juego.cargador = CargadorImagenes(hilos)
+        cargar_caras()  # Arrancar los hilos y calentar la caché de disco
+        total = _tiempo_medio(cargar_caras, args.repeticiones)
+        decodificar = _tiempo_medio(lambda: juego.cargador.cargar(rutas), args.repeticiones)
+        base = base or total
+        print(f"{hilos:>5} {total * 1e3:>17.1f} {decodificar * 1e3:>20.1f} {base / total:>11.2f}x")
+    juego.cargador.cerrar()
+
+    if args.paquete:
+        juego.paquete = paquete.cargar(args.paquete)
+        if juego.paquete is None:
+            print(f"No existe el paquete {args.paquete}; créalo con: python paquete.py {args.paquete}")
+            return
+        total = _tiempo_medio(cargar_caras, args.repeticiones)
+        print(f"{'paq.':>5} {total * 1e3:>17.1f} {'-':>20} {base / total:>11.2f}x")
+
+
+# DIBUJO: motor de superficies frente a motor de texturas en los mismos fotogramas
+
+class _Escenas:
+    """
+    Salida para exportar_video.exportar que guarda una instantánea del juego
+    cada pocos fotogramas en lugar de escribir el vídeo.
+    """
+    def __init__(self, juego, cada):
+        self.juego = juego
+        self.cada = cada
+        self.instantaneas = []
+
+    def escribir(self, pantalla, fotograma):
+        import instantanea
+        if fotograma % self.cada == 0:
+            self.instantaneas.append(instantanea.capturar(self.juego))
+
+
+def _pixeles_distintos(a, b):
+    """
+    Fracción de píxeles distintos entre dos capturas. Sin NumPy solo se
+    sabe si son iguales: devuelve 0 o None.
+    """
+    import pygame
+    from riffle import np
+    rgb_a = pygame.image.tobytes(a, 'RGB')
+    rgb_b = pygame.image.tobytes(b, 'RGB')
+    if np is None or len(rgb_a) != len(rgb_b):
+        return 0.0 if rgb_a == rgb_b else None
+    pa = np.frombuffer(rgb_a, dtype=np.uint8).reshape(-1, 3)
+    pb = np.frombuffer(rgb_b, dtype=np.uint8).reshape(-1, 3)
+    return float((pa != pb).any(axis=1).mean())
+
+
+def benchmark_dibujo(args):
+    import pygame
+    import instantanea
+    import texturas
+    from exportar_video import exportar
+    juegoBaraja = _juego_sin_ventana()
+    if not texturas.disponible():
+        print("pygame._sdl2.video no está disponible en esta versión de pygame")
+        return
+
+    # Escenas de una partida automática completa: pregunta, mezcla, reparto, jugadas y resultado
+    random.seed(args.semilla)
+    juego = juegoBaraja.Juego()
+    escenas = [instantanea.capturar(juego)]  # Menú principal
+    recolector = _Escenas(juego, 1)
+    fotogramas_partida = exportar(juego, juegoBaraja.screen, recolector, 30, "¿Saldrá bien?", cola_ms=500)
+    recolector.instantaneas = recolector.instantaneas[::max(1, fotogramas_partida // args.escenas)]
+    escenas += recolector.instantaneas
+
+    def medir(pantalla, presentar):
+        tiempos = []
+        for datos in escenas:
+            instantanea.restaurar(juego, datos)
+            juego.draw(pantalla)  # Calentar: RLE en superficies, subida de texturas
+            presentar()
+            inicio = time.perf_counter()
+            for _ in range(args.fotogramas):
+                juego.draw(pantalla)
+                presentar()
+            tiempos.append((time.perf_counter() - inicio) / args.fotogramas)
+        return tiempos
+
+    def capturas(pantalla, copiar):
+        resultado = []
+        for datos in escenas:
+            instantanea.restaurar(juego, datos)
+            juego.draw(pantalla)
+            resultado.append(copiar())
+        return resultado
+
+    ventana = pygame.display.get_surface()
+    superficies = medir(ventana, pygame.display.flip)
+    referencia = capturas(ventana, ventana.copy)
+
+    inicio = time.perf_counter()
+    pantalla = juegoBaraja.crear_pantalla_texturas(juego, acelerado=args.acelerado)
+    preparacion = time.perf_counter() - inicio
+    con_texturas = medir(pantalla, pantalla.flip)
+    subidas = pantalla.subidas
+    distintos = [_pixeles_distintos(a, b) for a, b in zip(referencia, capturas(pantalla, pantalla.to_surface))]
+
+    renderer = "acelerado" if args.acelerado else "software"
+    print(f"{len(escenas)} escenas, {args.fotogramas} fotogramas por escena; texturas con renderer {renderer}")
+    print(f"Atlas y ventana de texturas: {preparacion * 1e3:.1f} ms; texturas creadas en total: {subidas}")
+    print(f"{'escena':>6} {'superficies ms':>15} {'texturas ms':>12} {'aceleración':>12} {'píxeles distintos':>18}")
+    for i, (a, b, d) in enumerate(zip(superficies, con_texturas, distintos)):
+        diferencia = '-' if d is None else f"{d:.2%}"
+        print(f"{i:>6} {a * 1e3:>15.2f} {b * 1e3:>12.2f} {a / b:>11.2f}x {diferencia:>18}")
+    total_a, total_b = sum(superficies) / len(escenas), sum(con_texturas) / len(escenas)
+    print(f"{'media':>6} {total_a * 1e3:>15.2f} {total_b * 1e3:>12.2f} {total_a / total_b:>11.2f}x")
+
+
+# REPARTOS: codificación compacta de órdenes de 52 cartas
+
+def benchmark_repartos(args):
+    import numpy as np
+    import repartos
+
+    rng = np.random.default_rng(args.semilla)
+    n = repartos.NUM_CARTAS
+    mazos = np.argsort(rng.random((args.repartos, n)), axis=1)
+
+    print(f"{'codificación':<24}{'bytes':>6}{'codificar':>13}{'decodificar':>13}")
+    for nombre, bytes_, codificar, decodificar in (
+            ("permutación (Lehmer)", repartos.BYTES_PERMUTACION,
+             repartos.a_bytes_vectorizado, repartos.desde_bytes_vectorizado),
+            ("ids a 6 bits", repartos.BYTES_6BITS,
+             repartos.empaquetar_6bits_vectorizado, repartos.desempaquetar_6bits_vectorizado)):
+        inicio = time.perf_counter()
+        codigos = codificar(mazos)
+        medio = time.perf_counter()
+        recuperados = decodificar(codigos)
+        fin = time.perf_counter()
+        if not np.array_equal(recuperados, mazos):
+            raise RuntimeError(f"La codificación '{nombre}' no recupera los repartos")
+        print(f"{nombre:<24}{bytes_:>6}{(medio - inicio) / len(mazos) * 1e6:>10.2f} µs"
+              f"{(fin - medio) / len(mazos) * 1e6:>10.2f} µs")
+
+    muestra = [[int(x) for x in mazo] for mazo in mazos[:min(len(mazos), 2000)]]
+    inicio = time.perf_counter()
+    for mazo in muestra:
+        repartos.desde_bytes(repartos.a_bytes(mazo))
+    print(f"{'permutación, Python':<24}{repartos.BYTES_PERMUTACION:>6}"
+          f"{(time.perf_counter() - inicio) / len(muestra) * 1e6:>10.2f} µs  (ida y vuelta)")
+
+    # Deduplicación: repartos que solo difieren en los palos
+    mitad = mazos[:len(mazos) // 2]
+    palos = np.stack([rng.permutation(NUM_PALOS) for _ in range(len(mitad))])
+    cambiados = mitad - mitad % NUM_PALOS + np.take_along_axis(palos, mitad % NUM_PALOS, axis=1)
+    todos = np.vstack([mazos, cambiados])
+    distintos = len(np.unique(repartos.a_bytes_vectorizado(todos), axis=0))
+    canonicos = len(np.unique(repartos.a_bytes_vectorizado(repartos.canonico_palos_vectorizado(todos)), axis=0))
+    claves = len(np.unique(repartos.clave_valores_vectorizado(todos), axis=0))
+    print()
+    print(f"{len(todos)} repartos ({len(cambiados)} con los palos permutados): {distintos} distintos, "
+          f"{canonicos} sin contar los palos, {claves} claves de valores")
+
+
+def _lista_enteros(texto):
+    return [int(x) for x in texto.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del juego de cartas")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    p_riffle = subparsers.add_parser("riffle", help="Velocidad del riffle vectorizado y riffles necesarios para mezclar")
+    p_riffle.add_argument("--mazos", type=int, default=200_000, help="Mazos por muestra (por defecto 200000)")
+    p_riffle.add_argument("--max-riffles", type=int, default=12, help="Riffles máximos a evaluar (por defecto 12)")
+    p_riffle.add_argument("--modelo", choices=["paquetes", "gsr"], default="paquetes")
+    p_riffle.add_argument("--tolerancia", type=float, default=1.5,
+                          help="Múltiplo del ruido de muestreo aceptado como mezcla uniforme (por defecto 1.5)")
+    p_riffle.add_argument("--semilla", type=int, default=0)
+    p_riffle.set_defaults(funcion=benchmark_riffle)
+
+    p_superficies = subparsers.add_parser("superficies", help="Formato elegido y coste de blit de cada imagen")
+    p_superficies.add_argument("--repeticiones", type=int, default=200, help="Blits por medición (por defecto 200)")
+    p_superficies.set_defaults(funcion=benchmark_superficies)
+
+    p_escala = subparsers.add_parser("escala", help="Crecimiento del coste con el tamaño del mazo")
+    p_escala.add_argument("--mazos", type=_lista_enteros, default=[1, 2, 4, 8, 16, 32, 64, 128, 256],
+                          help="Barajas por mazo en las reglas, separadas por comas")
+    p_escala.add_argument("--rangos", type=int, default=NUM_RANGOS, help="Rangos (y pilas) por baraja (por defecto 13)")
+    p_escala.add_argument("--mazos-juego", type=_lista_enteros, default=[1, 2, 4, 8, 16],
+                          help="Barajas por mazo en el juego completo, separadas por comas")
+    p_escala.add_argument("--cartas-por-medicion", type=int, default=200_000,
+                          help="Cartas jugadas por medición en las reglas (por defecto 200000)")
+    p_escala.add_argument("--partidas", type=int, default=10, help="Partidas mínimas por tamaño en el juego (por defecto 10)")
+    p_escala.add_argument("--fotogramas", type=int, default=20, help="Fotogramas por medición de dibujo (por defecto 20)")
+    p_escala.add_argument("--semilla", type=int, default=0)
+    p_escala.set_defaults(funcion=benchmark_escala)
+
+    p_carga = subparsers.add_parser("carga", help="Tiempo de carga de las cartas según los hilos del cargador")
+    p_carga.add_argument("--hilos", type=_lista_enteros, default=None,
+                         help="Hilos a comparar, separados por comas (por defecto 1 y uno por núcleo)")
+    p_carga.add_argument("--repeticiones", type=int, default=5, help="Cargas por medición (por defecto 5)")
+    p_carga.add_argument("--paquete", default=None, help="Medir también la carga desde este paquete de recursos")
+    p_carga.set_defaults(funcion=benchmark_carga)
+
+    p_dibujo = subparsers.add_parser("dibujo", help="Motor de superficies frente a motor de texturas")
+    p_dibujo.add_argument("--escenas", type=int, default=12, help="Escenas de la partida a comparar (por defecto 12)")
+    p_dibujo.add_argument("--fotogramas", type=int, default=30, help="Fotogramas por escena (por defecto 30)")
+    p_dibujo.add_argument("--acelerado", action="store_true",
+                          help="Renderer acelerado por GPU (por defecto el de software de SDL)")
+    p_dibujo.add_argument("--semilla", type=int, default=0)
+    p_dibujo.set_defaults(funcion=benchmark_dibujo)
+
+    p_repartos = subparsers.add_parser("repartos", help="Velocidad de las codificaciones compactas de repartos")
+    p_repartos.add_argument("--repartos", type=int, default=200_000, help="Repartos a codificar (por defecto 200000)")
+    p_repartos.add_argument("--semilla", type=int, default=0)
+    p_repartos.set_defaults(funcion=benchmark_repartos)
+
+    args = parser.parse_args()
+    args.funcion(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Caras de las cartas cargadas bajo demanda.
+
+Casi todas las cartas pasan la mayor parte de la partida boca abajo, y la
+mezcla y el reparto solo dibujan el reverso. CarasPerezosas no decodifica
+ninguna cara al arrancar: cada una se carga la primera vez que se pide
+(Carta.imagen_frontal) y se conserva para los reinicios. Como el reparto
+decide todas las jugadas, el juego pide por adelantado con precargar() las
+siguientes caras de la trayectoria; se decodifican y escalan en los hilos
+del cargador y recoger(), entre fotogramas, las convierte al formato de
+pantalla en el hilo principal. Así una carta casi nunca espera al voltearse;
+si lo hace, se cuenta en esperas.
+
+Uso:
+    caras = CarasPerezosas({nombre: (ruta, size)}, decodificar, enviar, convertir)
+    caras.precargar(["Acorazon.png", ...])   # tras repartir y en cada jugada
+    caras.recoger()                           # en cada vuelta del bucle
+    imagen = caras.obtener("Acorazon.png")
+"""
+
+
+class CarasPerezosas:
+    def __init__(self, rutas, decodificar, enviar, convertir):
+        """
+        rutas: nombre de archivo -> (ruta, size) de cada cara.
+        decodificar(ruta, size) lee una imagen en este hilo; enviar(ruta,
+        size) la encola en otro y devuelve un Future, o None si no merece la
+        pena (ya está en el paquete de recursos); convertir(ruta, size,
+        imagen) la pasa al formato de pantalla y solo se llama en este hilo.
+        """
+        self.rutas = dict(rutas)
+        self._decodificar = decodificar
+        self._enviar = enviar
+        self._convertir = convertir
+        self._superficies = {}  # nombre -> superficie convertida
+        self._futuros = {}      # nombre -> Future de la decodificación en curso
+        self.esperas = 0        # Caras pedidas antes de estar listas
+
+    def __contains__(self, nombre):
+        return nombre in self._superficies
+
+    def obtener(self, nombre):
+        """
+        Superficie de la cara, cargándola ahora si aún no está.
+        """
+        superficie = self._superficies.get(nombre)
+        if superficie is None:
+            ruta, size = self.rutas[nombre]
+            futuro = self._futuros.pop(nombre, None)
+            if futuro is None or not futuro.done():
+                self.esperas += 1
+            imagen = futuro.result() if futuro is not None else self._decodificar(ruta, size)
+            superficie = self._superficies[nombre] = self._convertir(ruta, size, imagen)
+        return superficie
+
+    def precargar(self, nombres):
+        """
+        Empieza a decodificar en segundo plano las caras indicadas que aún
+        no estén cargadas ni en camino.
+        """
+        for nombre in nombres:
+            if nombre in self._superficies or nombre in self._futuros:
+                continue
+            futuro = self._enviar(*self.rutas[nombre])
+            if futuro is not None:
+                self._futuros[nombre] = futuro
+
+    def recoger(self):
+        """
+        Convierte las caras que ya terminaron de decodificarse. Devuelve
+        cuántas.
+        """
+        listas = [nombre for nombre, futuro in self._futuros.items() if futuro.done()]
+        for nombre in listas:
+            ruta, size = self.rutas[nombre]
+            self._superficies[nombre] = self._convertir(ruta, size, self._futuros.pop(nombre).result())
+        return len(listas)
+
+    def pendientes(self):
+        return len(self._futuros)
+
+    def todas(self):
+        """
+        Carga todas las caras (en paralelo) y devuelve nombre -> superficie.
+        """
+        self.precargar(self.rutas)
+        return {nombre: self.obtener(nombre) for nombre in self.rutas}
+
+    def cargadas(self):
+        """
+        Caras ya cargadas, sin cargar ninguna: nombre -> superficie.
+        """
+        return dict(self._superficies)
+
+    def reemplazar(self, nombre, imagen):
+        """
+        Cambia la cara por imagen (escalada, sin convertir). Si no estaba
+        cargada, se descarta: se leerá del archivo nuevo al pedirla.
+        """
+        self._futuros.pop(nombre, None)
+        if nombre in self._superficies:
+            ruta, size = self.rutas[nombre]
+            self._superficies[nombre] = self._convertir(ruta, size, imagen)
+
+    def vaciar(self):
+        """
+        Olvida todas las caras cargadas; se vuelven a leer al pedirlas.
+        """
+        self._superficies.clear()
+        self._futuros.clear()
@@ -0,0 +1,67 @@
+"""
+Decodificación de imágenes en paralelo.
+
+pygame.image.load y pygame.transform.scale sueltan el GIL mientras trabajan,
+así que un grupo de hilos puede decodificar y escalar varias imágenes a la
+vez. La conversión al formato de pantalla (convert/convert_alpha) se queda
+en el hilo principal, que es el dueño de la ventana.
+
+Uso:
+    cargador = CargadorImagenes()
+    futuro = cargador.enviar("img/as.png", (100, 150))   # concurrent.futures.Future
+    imagenes = cargador.cargar([("img/as.png", (100, 150)), ...], progreso=funcion)
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pygame
+
+
+def decodificar(ruta, size=None):
+    """
+    Lee una imagen de disco y la escala si se indica, sin convertirla al
+    formato de pantalla. Se puede llamar desde cualquier hilo.
+    """
+    imagen = pygame.image.load(ruta)
+    if size:
+        imagen = pygame.transform.scale(imagen, size)
+    return imagen
+
+
+class CargadorImagenes:
+    def __init__(self, hilos=None):
+        # Por defecto, uno por núcleo: el trabajo es de CPU, no de espera
+        self.hilos = hilos or os.cpu_count() or 1
+        self._pool = None
+
+    def enviar(self, ruta, size=None):
+        """
+        Encola la decodificación de una imagen y devuelve su Future.
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix="cargador")
+        return self._pool.submit(decodificar, ruta, size)
+
+    def cargar(self, peticiones, convertir=None, progreso=None):
+        """
+        Decodifica en paralelo una lista de (ruta, size) y devuelve las
+        imágenes en el mismo orden. Cada imagen se pasa por convertir(ruta,
+        size, imagen) en el hilo principal en cuanto termina de decodificarse,
+        y después se llama a progreso(hechas, total, ruta).
+        """
+        peticiones = list(peticiones)
+        futuros = {self.enviar(ruta, size): i for i, (ruta, size) in enumerate(peticiones)}
+        resultado = [None] * len(peticiones)
+        for hechas, futuro in enumerate(as_completed(futuros), 1):
+            i = futuros[futuro]
+            ruta, size = peticiones[i]
+            imagen = futuro.result()
+            resultado[i] = convertir(ruta, size, imagen) if convertir else imagen
+            if progreso:
+                progreso(hechas, len(peticiones), ruta)
+        return resultado
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,194 @@
+"""
+Diagnóstico de memoria del juego.
+
+Informa de los bytes que ocupa cada clase de recurso de un Juego
+(superficies de las cartas, fondo, imágenes superpuestas, fuentes y
+sonidos decodificados) y mide si la memoria crece al repetir
+reiniciar_juego, que vuelve a crear el mazo con cargar_cartas. Las caras
+de las cartas solo cuentan si ya se cargaron (se cargan al verlas).
+
+Los píxeles de las superficies y las muestras de audio viven en memoria de
+SDL, que tracemalloc no ve; por eso se cuentan a partir de su tamaño y se
+comparan con la memoria residente (RSS) del proceso. tracemalloc cubre la
+parte de Python.
+
+Uso:
+    python diagnostico_memoria.py [--ciclos N] [--top N]
+"""
+import argparse
+import gc
+import os
+import string
+import sys
+import tracemalloc
+from functools import lru_cache
+
+import pygame
+
+
+def bytes_superficie(superficie):
+    """
+    Bytes de píxeles que ocupa una superficie.
+    """
+    return superficie.get_pitch() * superficie.get_height()
+
+
+def bytes_sonido(sonido):
+    """
+    Bytes de muestras decodificadas que ocupa un pygame.mixer.Sound.
+    """
+    frecuencia, formato, canales = pygame.mixer.get_init()
+    return int(sonido.get_length() * frecuencia * canales * (abs(formato) & 0xff) // 8)
+
+
+def rss_actual():
+    """
+    Memoria residente del proceso en bytes. En Linux se lee de /proc; en
+    otros sistemas se usa el pico de getrusage como aproximación.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows: sin getrusage
+        return 0
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+GLIFOS = string.ascii_letters + string.digits + "áéíóúüñÁÉÍÓÚÑ¿?¡!.,:;-()/ "
+
+
+@lru_cache(maxsize=None)
+def bytes_por_fuente(ruta, tamano, muestras=100):
+    """
+    Estima la memoria de un pygame.font.Font midiendo el RSS al crear
+    muchas fuentes iguales y dibujar con cada una todos los glifos que usa
+    el juego (SDL_ttf no expone su tamaño). Con pocas, o pocos glifos, caben
+    en memoria ya libre del proceso y el RSS no cambia; si aun así no crece,
+    devuelve None: tamaño desconocido, no cero.
+    """
+    antes = rss_actual()
+    fuentes = [pygame.font.Font(ruta, tamano) for _ in range(muestras)]
+    for fuente in fuentes:
+        fuente.render(GLIFOS, True, (0, 0, 0))  # Forzar la carga de glifos
+    despues = rss_actual()
+    del fuentes
+    return (despues - antes) // muestras if despues > antes else None
+
+
+def _botones(juego):
+    from interfaz import Button
+    return [valor for valor in vars(juego).values() if isinstance(valor, Button)]
+
+
+def informe_memoria(juego):
+    """
+    Devuelve un diccionario {categoría: (cantidad, bytes)} con la memoria
+    ocupada por cada clase de recurso del juego. Las superficies
+    compartidas se cuentan una sola vez, en la primera categoría. Los bytes
+    son None si no se pueden medir (fuentes).
+    """
+    vistas = set()
+
+    def superficies(lista):
+        unicas = [s for s in lista if s is not None and id(s) not in vistas]
+        vistas.update(id(s) for s in unicas)
+        return len(unicas), sum(bytes_superficie(s) for s in unicas)
+
+    mazo = list(juego.mazo)
+    for pila in juego.cartas_por_posicion.values():
+        mazo.extend(carta for carta in pila if carta not in mazo)
+
+    informe = {
+        'imagen_frontal': superficies(list(juego.caras.cargadas().values())),
+        'imagen_reverso': superficies([c.imagen_reverso for c in mazo]),
+        'fondo': superficies([juego.fondo]),
+        'reverso_base': superficies([juego.reverso_base]),
+        'superpuestas': superficies([juego.img_si, juego.img_no, juego.img_pregunta, juego.img_mascota]),
+        'botones': superficies([sup for b in _botones(juego) for sup in [b.text_surface, *b.superficies.values()]]),
+    }
+
+    ruta_fuente = os.path.join("recursos", "JandaEverydayCasual.ttf")
+    fuentes = [b.font for b in _botones(juego)] + [juego.font_titulo, juego.font_btn, juego.font]
+    fuentes = list({id(f): f for f in fuentes}.values())
+    por_fuente = bytes_por_fuente(ruta_fuente, 28)
+    informe['fuentes'] = (len(fuentes), None if por_fuente is None else len(fuentes) * por_fuente)
+
+    if juego.audio_disponible:
+        sonidos = [juego.sonido_click, juego.sonido_error, juego.sonido_tomar,
+                   juego.sonido_soltar, juego.sonido_barajar]
+        informe['sonidos'] = (len(sonidos), sum(bytes_sonido(s) for s in sonidos))
+    else:
+        informe['sonidos'] = (0, 0)
+    return informe
+
+
+def imprimir_informe(informe):
+    total = 0
+    print(f"{'categoría':<16} {'cantidad':>8} {'KiB':>10}")
+    for categoria, (cantidad, tamano) in informe.items():
+        if tamano is None:
+            print(f"{categoria:<16} {cantidad:>8} {'desconocido':>10}")
+            continue
+        total += tamano
+        print(f"{categoria:<16} {cantidad:>8} {tamano / 1024:>10.1f}")
+    print(f"{'total':<16} {'':>8} {total / 1024:>10.1f}")
+
+
+def medir_reinicios(juego, ciclos, top=10):
+    """
+    Ejecuta reiniciar_juego varias veces y muestra el crecimiento de la
+    memoria de Python (tracemalloc), de las superficies del juego y del RSS.
+    """
+    # Un reinicio ya con tracemalloc activo, para que el mazo vivo quede
+    # registrado y su sustitución no cuente como crecimiento
+    tracemalloc.start()
+    juego.reiniciar_juego()
+    gc.collect()
+    instantanea_inicial = tracemalloc.take_snapshot()
+    rss_inicial = rss_actual()
+    superficies_inicial = recursos = sum(t or 0 for _, t in informe_memoria(juego).values())
+
+    print(f"{'ciclo':>5} {'RSS MiB':>9} {'Python KiB':>11} {'recursos KiB':>13}")
+    for ciclo in range(1, ciclos + 1):
+        juego.reiniciar_juego()
+        gc.collect()
+        python_actual, _ = tracemalloc.get_traced_memory()
+        recursos = sum(t or 0 for _, t in informe_memoria(juego).values())
+        print(f"{ciclo:>5} {rss_actual() / 2**20:>9.1f} {python_actual / 1024:>11.1f} {recursos / 1024:>13.1f}")
+
+    instantanea_final = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    print()
+    print(f"Crecimiento tras {ciclos} reinicios: RSS {(rss_actual() - rss_inicial) / 1024:+.1f} KiB, "
+          f"recursos {(recursos - superficies_inicial) / 1024:+.1f} KiB")
+    print(f"Mayores crecimientos de memoria Python (top {top}):")
+    for diferencia in instantanea_final.compare_to(instantanea_inicial, "lineno")[:top]:
+        print(f"  {diferencia}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diagnóstico de memoria del juego de cartas")
+    parser.add_argument("--ciclos", type=int, default=20, help="Reinicios a medir (por defecto 20; 0 solo el informe)")
+    parser.add_argument("--top", type=int, default=10, help="Líneas de tracemalloc a mostrar (por defecto 10)")
+    args = parser.parse_args()
+
+    # Sin ventana ni sonido real; las rutas de recursos son relativas al juego
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    from juegoBaraja import Juego
+
+    juego = Juego()
+    print("Memoria por clase de recurso:")
+    imprimir_informe(informe_memoria(juego))
+    print()
+    medir_reinicios(juego, args.ciclos, args.top)
+
+
+if __name__ == "__main__":
+    main()
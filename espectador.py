@@ -0,0 +1,173 @@
+"""
+Visor para seguir desde otra pantalla la mesa que transmite el juego.
+
+Se conecta al puerto de transmisión (PUERTO_TRANSMISION en juegoBaraja.py),
+reconstruye la mesa con transmision.Mesa a partir de la foto inicial y de
+los cambios que llegan, y la dibuja con las mismas imágenes que el juego.
+Solo redibuja cuando llega algo; si se corta la conexión, vuelve a
+intentarlo y recibe una foto nueva.
+
+Uso:
+    python espectador.py [host] [--puerto 9110]
+"""
+import argparse
+import os
+import socket
+
+import pygame
+
+import transmision
+
+REINTENTO = 2000   # milisegundos entre intentos de conexión
+ESPERA = 50        # milisegundos máximos sin mirar el socket
+
+TEXTOS_FASE = {
+    'pregunta': "Escribiendo la pregunta",
+    'mezclar': "Mezclando",
+    'repartir': "Repartiendo",
+    'esperando_reparto': "Repartiendo",
+    'jugar': "Jugando",
+}
+
+
+class Visor:
+    def __init__(self, juegoBaraja, pantalla):
+        self.jb = juegoBaraja
+        self.pantalla = pantalla
+        self.mesa = transmision.Mesa(len(juegoBaraja.posiciones))
+        tam_carta = (juegoBaraja.CARD_WIDTH, juegoBaraja.CARD_HEIGHT)
+        self.fondo = self.cargar(os.path.join("recursos", "fondo.png"), (juegoBaraja.WIDTH, juegoBaraja.HEIGHT))
+        self.reverso = self.cargar(os.path.join("recursos", "reversoo.png"), tam_carta)
+        self.img_si = self.cargar(os.path.join("recursos", "respSI.png"), (480, 300))
+        self.img_no = self.cargar(os.path.join("recursos", "respNO.png"), (480, 300))
+        self.caras = {}  # nombre de archivo -> superficie, se cargan al verlas
+        self.fuente = pygame.font.Font(juegoBaraja.RUTA_FUENTE, 28)
+
+    def cargar(self, ruta, size):
+        from cargador import decodificar
+        imagen = decodificar(ruta, size)
+        return imagen.convert_alpha() if imagen.get_alpha() is not None else imagen.convert()
+
+    def cara(self, id_carta):
+        nombre = self.mesa.nombres[id_carta] if id_carta < len(self.mesa.nombres) else None
+        if nombre is None:
+            return self.reverso
+        if nombre not in self.caras:
+            self.caras[nombre] = self.cargar(os.path.join("img", nombre),
+                                             (self.jb.CARD_WIDTH, self.jb.CARD_HEIGHT))
+        return self.caras[nombre]
+
+    def texto(self, texto, centro_x, y, color=(255, 255, 255)):
+        superficie = self.fuente.render(texto, True, color)
+        self.pantalla.blit(superficie, (centro_x - superficie.get_width() // 2, y))
+
+    def draw(self, conectado):
+        jb, mesa = self.jb, self.mesa
+        self.pantalla.blit(self.fondo, (0, 0))
+        if not conectado:
+            self.texto("Conectando con la mesa...", jb.WIDTH // 2, jb.HEIGHT // 2)
+            return
+        for pos, pila in zip(jb.posiciones, mesa.pilas):
+            for i, id_carta in enumerate(pila):
+                imagen = self.cara(id_carta) if id_carta in mesa.volteadas else self.reverso
+                self.pantalla.blit(imagen, (pos[0] + i * jb.CARD_OFFSET_H, pos[1]))
+
+        if mesa.estado == jb.Juego.ESTADO_INICIO or mesa.estado == jb.Juego.ESTADO_INSTRUCCIONES:
+            estado = "Esperando una partida"
+        elif mesa.estado == jb.Juego.ESTADO_JUEGO:
+            estado = "Partida manual"
+        else:
+            estado = TEXTOS_FASE.get(mesa.fase, "Modo automático")
+        total = sum(len(pila) for pila in mesa.pilas)
+        if total:
+            estado += f" - {len(mesa.volteadas)}/{total} cartas volteadas"
+        self.texto(estado, jb.WIDTH // 2, 10)
+        if mesa.pregunta:
+            self.texto(f"«{mesa.pregunta}»", jb.WIDTH // 2, jb.HEIGHT - 45, (255, 215, 0))
+        if mesa.resultado is not None:
+            imagen = self.img_si if mesa.resultado else self.img_no
+            self.pantalla.blit(imagen, (jb.WIDTH // 2 - imagen.get_width() // 2,
+                                        jb.HEIGHT // 2 - imagen.get_height() // 2))
+
+
+def conectar(host, puerto):
+    try:
+        conexion = socket.create_connection((host, puerto), timeout=REINTENTO / 1000)
+    except OSError:
+        return None
+    conexion.setblocking(False)
+    return conexion
+
+
+def recibir(conexion, lector):
+    """
+    Lee todo lo disponible sin bloquear. Devuelve la lista de mensajes, o
+    None si la conexión se cerró.
+    """
+    mensajes = []
+    while True:
+        try:
+            datos = conexion.recv(65536)
+        except BlockingIOError:
+            return mensajes
+        except OSError:
+            return None
+        if not datos:
+            return None
+        mensajes += lector.recibir(datos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sigue la mesa que transmite el juego")
+    parser.add_argument("host", nargs="?", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=transmision.PUERTO)
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))  # Rutas de recursos relativas
+    import juegoBaraja
+    pygame.display.set_caption(f"Espectador - {args.host}:{args.puerto}")
+    visor = Visor(juegoBaraja, juegoBaraja.screen)
+
+    conexion = lector = None
+    ultimo_intento = None
+    redibujar = True
+    running = True
+    while running:
+        ahora = pygame.time.get_ticks()
+        if conexion is None and (ultimo_intento is None or ahora - ultimo_intento >= REINTENTO):
+            ultimo_intento = ahora
+            conexion = conectar(args.host, args.puerto)
+            if conexion is not None:
+                lector = transmision.Lector()
+                visor.mesa = transmision.Mesa(len(juegoBaraja.posiciones))
+            redibujar = True
+        if conexion is not None:
+            mensajes = recibir(conexion, lector)
+            if mensajes is None:
+                conexion.close()
+                conexion = None
+                redibujar = True
+            else:
+                for tipo, datos in mensajes:
+                    if datos is not None:  # Tipos que este visor no conoce
+                        visor.mesa.aplicar(tipo, datos)
+                redibujar = redibujar or bool(mensajes)
+
+        if redibujar:
+            visor.draw(conexion is not None)
+            pygame.display.flip()
+            redibujar = False
+        evento = pygame.event.wait(ESPERA)
+        for evento in [evento] + pygame.event.get():
+            if evento.type == pygame.QUIT:
+                running = False
+            elif evento.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                redibujar = True
+
+    if conexion is not None:
+        conexion.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+Estadísticas de partidas en memoria constante, combinables entre procesos.
+
+Para calcular la tasa de victorias o la distribución de cartas volteadas de
+miles de millones de partidas no hace falta guardarlas: cada partida suma a
+acumuladores de tamaño fijo, y los acumuladores de varios procesos,
+quioscos o ejecuciones se combinan sumándolos.
+
+- Histograma: conteo exacto de un entero acotado (cartas volteadas, de 0
+  al total). Da la media, la varianza y cualquier cuantil sin error, y dos
+  histogramas se combinan de forma exacta sumando casilla a casilla. Las
+  victorias son la última casilla; las derrotas, el resto.
+- Momentos: cuenta, media, varianza, mínimo y máximo de valores reales
+  (Welford, combinados con la fórmula de Chan), para la duración de las
+  partidas de los quioscos.
+- Estadisticas: las dos cosas más, por pila, en cuántas derrotas quedó
+  atascada (con cartas boca abajo) y cuántas cartas le quedaban. Toda
+  derrota termina en la pila central, así que la pila final no informa;
+  lo que distingue unas derrotas de otras es qué pilas quedaron sin voltear.
+
+Se guardan como un blob binario de unos cientos de bytes (a_bytes,
+desde_bytes) y no crecen con el número de partidas.
+
+Uso:
+    python estadisticas.py simular [--partidas N] [--procesos P] [--salida partidas.est]
+    python estadisticas.py registro registro.jsonl [registro.jsonl.1 ...] [--salida quiosco.est]
+    python estadisticas.py combinar a.est b.est ... [--salida total.est]
+    python estadisticas.py mostrar total.est
+"""
+import argparse
+import json
+import math
+import os
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from reglas import NUM_RANGOS, NUM_PALOS, NUM_MAZOS, crear_valores, calcular_trayectoria
+
+MAGICO = b'JCES'
+VERSION = 1
+_CABECERA = struct.Struct('<4sHII')        # mágico, versión, cartas por partida, pilas
+_MOMENTOS = struct.Struct('<Qdddd')        # n, media, m2, mínimo, máximo
+
+
+class Histograma:
+    """
+    Conteo de enteros entre 0 y maximo. Ocupa maximo + 1 contadores.
+    """
+    def __init__(self, maximo):
+        self.conteos = [0] * (maximo + 1)
+
+    def anotar(self, valor, veces=1):
+        self.conteos[valor] += veces
+
+    def combinar(self, otro):
+        if len(otro.conteos) != len(self.conteos):
+            raise ValueError("Histogramas de distinto tamaño")
+        self.conteos = [a + b for a, b in zip(self.conteos, otro.conteos)]
+        return self
+
+    def total(self):
+        return sum(self.conteos)
+
+    def media(self):
+        n = self.total()
+        return sum(valor * veces for valor, veces in enumerate(self.conteos)) / n if n else math.nan
+
+    def varianza(self):
+        """
+        Varianza muestral, calculada con sumas enteras exactas.
+        """
+        n = self.total()
+        if n < 2:
+            return math.nan
+        suma = sum(valor * veces for valor, veces in enumerate(self.conteos))
+        suma_cuadrados = sum(valor * valor * veces for valor, veces in enumerate(self.conteos))
+        return (suma_cuadrados - suma * suma / n) / (n - 1)
+
+    def cuantil(self, q):
+        """
+        Menor valor v con al menos una fracción q de las muestras <= v.
+        """
+        n = self.total()
+        if not n:
+            return None
+        objetivo = max(1, math.ceil(q * n))
+        acumulado = 0
+        for valor, veces in enumerate(self.conteos):
+            acumulado += veces
+            if acumulado >= objetivo:
+                return valor
+        return len(self.conteos) - 1
+
+
+class Momentos:
+    """
+    Cuenta, media, varianza, mínimo y máximo de una serie de números.
+    """
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0        # Suma de cuadrados de las desviaciones a la media
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def anotar(self, valor):
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (valor - self.media)
+        self.minimo = min(self.minimo, valor)
+        self.maximo = max(self.maximo, valor)
+
+    def combinar(self, otro):
+        if otro.n:
+            n = self.n + otro.n
+            delta = otro.media - self.media
+            self.media += delta * otro.n / n
+            self.m2 += otro.m2 + delta * delta * self.n * otro.n / n
+            self.n = n
+            self.minimo = min(self.minimo, otro.minimo)
+            self.maximo = max(self.maximo, otro.maximo)
+        return self
+
+    def varianza(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else math.nan
+
+
+class Estadisticas:
+    def __init__(self, num_cartas=NUM_RANGOS * NUM_PALOS * NUM_MAZOS, num_rangos=NUM_RANGOS):
+        self.num_cartas = num_cartas
+        self.num_rangos = num_rangos
+        self.volteadas = Histograma(num_cartas)      # Cartas volteadas por partida
+        self.atascos = [0] * num_rangos              # Derrotas con cartas boca abajo en cada pila
+        self.boca_abajo = [0] * num_rangos           # Cartas sin voltear en cada pila al perder
+        self.duracion = Momentos()                   # Segundos por partida (registro de quioscos)
+
+    # Anotar partidas
+
+    def anotar(self, volteadas, boca_abajo=None):
+        """
+        Anota una partida. boca_abajo (cartas sin voltear en cada pila) solo
+        cuenta en las derrotas y puede faltar.
+        """
+        self.volteadas.anotar(volteadas)
+        if volteadas < self.num_cartas and boca_abajo is not None:
+            for pila, restantes in enumerate(boca_abajo):
+                if restantes:
+                    self.atascos[pila] += 1
+                    self.boca_abajo[pila] += restantes
+
+    def anotar_partida(self, valores):
+        """
+        Juega el reparto dado (valores en orden de reparto) y lo anota.
+        """
+        jugadas, _ = calcular_trayectoria(valores, self.num_rangos)
+        if len(jugadas) == len(valores):
+            self.volteadas.anotar(len(jugadas))
+            return
+        boca_abajo = [len(range(pila, len(valores), self.num_rangos)) for pila in range(self.num_rangos)]
+        for _, origen, _ in jugadas:
+            boca_abajo[origen] -= 1
+        self.anotar(len(jugadas), boca_abajo)
+
+    def anotar_lote(self, volteadas):
+        """
+        Anota de golpe un array de NumPy de cartas volteadas (por ejemplo de
+        riffle.cartas_volteadas_vectorizado). No aporta datos por pila.
+        """
+        import numpy as np
+        conteos = np.bincount(np.asarray(volteadas), minlength=self.num_cartas + 1)
+        self.volteadas.combinar(_histograma_de(conteos.tolist()))
+
+    # Combinar y guardar
+
+    def combinar(self, otra):
+        """
+        Suma las partidas de otra a estas. El resultado no depende del
+        orden en que se combinen (salvo el redondeo de la duración).
+        """
+        if (otra.num_cartas, otra.num_rangos) != (self.num_cartas, self.num_rangos):
+            raise ValueError("Estadísticas de partidas con distinto número de cartas o pilas")
+        self.volteadas.combinar(otra.volteadas)
+        self.atascos = [a + b for a, b in zip(self.atascos, otra.atascos)]
+        self.boca_abajo = [a + b for a, b in zip(self.boca_abajo, otra.boca_abajo)]
+        self.duracion.combinar(otra.duracion)
+        return self
+
+    def a_bytes(self):
+        d = self.duracion
+        enteros = self.volteadas.conteos + self.atascos + self.boca_abajo
+        return (_CABECERA.pack(MAGICO, VERSION, self.num_cartas, self.num_rangos)
+                + _MOMENTOS.pack(d.n, d.media, d.m2, d.minimo, d.maximo)
+                + struct.pack(f'<{len(enteros)}Q', *enteros))
+
+    @classmethod
+    def desde_bytes(cls, datos):
+        try:
+            magico, version, num_cartas, num_rangos = _CABECERA.unpack_from(datos, 0)
+        except struct.error:
+            raise ValueError("Estadísticas demasiado cortas")
+        if magico != MAGICO or version != VERSION:
+            raise ValueError("No son estadísticas de partidas válidas o son de otra versión")
+        estadisticas = cls(num_cartas, num_rangos)
+        d = estadisticas.duracion
+        d.n, d.media, d.m2, d.minimo, d.maximo = _MOMENTOS.unpack_from(datos, _CABECERA.size)
+        cantidad = num_cartas + 1 + 2 * num_rangos
+        try:
+            enteros = struct.unpack_from(f'<{cantidad}Q', datos, _CABECERA.size + _MOMENTOS.size)
+        except struct.error:
+            raise ValueError("Estadísticas incompletas")
+        estadisticas.volteadas.conteos = list(enteros[:num_cartas + 1])
+        estadisticas.atascos = list(enteros[num_cartas + 1:num_cartas + 1 + num_rangos])
+        estadisticas.boca_abajo = list(enteros[num_cartas + 1 + num_rangos:])
+        return estadisticas
+
+    def guardar(self, ruta):
+        with open(ruta, 'wb') as f:
+            f.write(self.a_bytes())
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, 'rb') as f:
+            return cls.desde_bytes(f.read())
+
+    # Resultados
+
+    def partidas(self):
+        return self.volteadas.total()
+
+    def victorias(self):
+        return self.volteadas.conteos[-1]
+
+    def derrotas(self):
+        """
+        Histograma de las cartas volteadas en las partidas perdidas.
+        """
+        return _histograma_de(self.volteadas.conteos[:-1] + [0])
+
+    def resumen(self):
+        n = self.partidas()
+        if not n:
+            return "Sin partidas"
+        lineas = [f"Partidas: {n}  victorias: {self.victorias()} ({self.victorias() / n:.4%})"]
+        h = self.volteadas
+        lineas.append(f"Cartas volteadas: media {h.media():.3f}, desviación {math.sqrt(h.varianza()) if n > 1 else 0:.3f}")
+        perdidas = self.derrotas()
+        if perdidas.total():
+            cuantiles = ", ".join(f"p{int(q * 100)}={perdidas.cuantil(q)}" for q in (0.1, 0.25, 0.5, 0.75, 0.9, 0.99))
+            lineas.append(f"Volteadas antes de perder: media {perdidas.media():.3f}; {cuantiles}")
+        if any(self.atascos):
+            derrotas = perdidas.total()
+            lineas.append("Pila  derrotas con cartas sin voltear  cartas sin voltear por derrota")
+            for pila, (veces, cartas) in enumerate(zip(self.atascos, self.boca_abajo)):
+                lineas.append(f"{pila + 1:>4}  {veces / derrotas:>31.2%}  {cartas / derrotas:>30.3f}")
+        if self.duracion.n:
+            d = self.duracion
+            lineas.append(f"Duración: {d.n} partidas, media {d.media:.1f} s (mín {d.minimo:.1f}, máx {d.maximo:.1f})")
+        return "\n".join(lineas)
+
+
+def _histograma_de(conteos):
+    histograma = Histograma(len(conteos) - 1)
+    histograma.conteos = list(conteos)
+    return histograma
+
+
+def desde_registro(rutas, estadisticas=None):
+    """
+    Anota las partidas terminadas de los registros de quioscos
+    (registro.jsonl), leídos línea a línea. La duración va del evento
+    reparto_inicio al fin de la misma semilla.
+    """
+    inicio = None  # (semilla, instante) del reparto de la partida en juego
+    for ruta in rutas:
+        with open(ruta, encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    evento = json.loads(linea)
+                except ValueError:
+                    continue
+                nombre = evento.get('evento')
+                if nombre == 'reparto_inicio':
+                    inicio = (evento.get('semilla'), evento['t'])
+                elif nombre == 'fin' and evento.get('total'):
+                    if estadisticas is None:
+                        estadisticas = Estadisticas(evento['total'])
+                    if evento['total'] != estadisticas.num_cartas:
+                        continue  # Partida con otro número de barajas
+                    estadisticas.anotar(evento['volteadas'])
+                    if inicio is not None and inicio[0] == evento.get('semilla'):
+                        estadisticas.duracion.anotar(evento['t'] - inicio[1])
+                    inicio = None
+    return estadisticas or Estadisticas()
+
+
+def simular(partidas, semilla, num_mazos=NUM_MAZOS):
+    """
+    Juega partidas con mezclas uniformes y devuelve sus estadísticas. Es lo
+    que ejecuta cada proceso de "simular".
+    """
+    rng = random.Random(semilla)
+    valores = crear_valores(num_mazos)
+    estadisticas = Estadisticas(len(valores))
+    for _ in range(partidas):
+        rng.shuffle(valores)
+        estadisticas.anotar_partida(valores)
+    return estadisticas.a_bytes()
+
+
+def _guardar_o_mostrar(estadisticas, salida):
+    print(estadisticas.resumen())
+    if salida:
+        estadisticas.guardar(salida)
+        print(f"Guardadas en {salida} ({len(estadisticas.a_bytes())} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estadísticas de partidas en memoria constante")
+    sub = parser.add_subparsers(dest="orden", required=True)
+    p = sub.add_parser("simular", help="Simula partidas en varios procesos y combina sus estadísticas")
+    p.add_argument("--partidas", type=int, default=200_000)
+    p.add_argument("--procesos", type=int, default=None, help="Por defecto, uno por núcleo")
+    p.add_argument("--mazos", type=int, default=NUM_MAZOS)
+    p.add_argument("--semilla", type=int, default=None)
+    p.add_argument("--salida")
+    p = sub.add_parser("registro", help="Estadísticas de los registros de un quiosco")
+    p.add_argument("rutas", nargs="+")
+    p.add_argument("--salida")
+    p = sub.add_parser("combinar", help="Combina archivos de estadísticas")
+    p.add_argument("rutas", nargs="+")
+    p.add_argument("--salida")
+    p = sub.add_parser("mostrar", help="Muestra un archivo de estadísticas")
+    p.add_argument("ruta")
+    args = parser.parse_args()
+
+    if args.orden == "simular":
+        procesos = args.procesos or os.cpu_count() or 1
+        semilla = random.getrandbits(32) if args.semilla is None else args.semilla
+        # Trozos pequeños: cada proceso devuelve un blob, nunca las partidas
+        trozo = min(50_000, max(1, args.partidas // procesos))
+        trozos = [trozo] * (args.partidas // trozo) + ([args.partidas % trozo] if args.partidas % trozo else [])
+        total = Estadisticas(NUM_RANGOS * NUM_PALOS * args.mazos)
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(procesos) as ejecutor:
+            for blob in ejecutor.map(simular, trozos, [semilla + i for i in range(len(trozos))],
+                                     [args.mazos] * len(trozos)):
+                total.combinar(Estadisticas.desde_bytes(blob))
+        duracion = time.perf_counter() - inicio
+        print(f"{args.partidas} partidas en {duracion:.1f} s con {procesos} procesos (semilla {semilla})")
+        _guardar_o_mostrar(total, args.salida)
+    elif args.orden == "registro":
+        _guardar_o_mostrar(desde_registro(args.rutas), args.salida)
+    elif args.orden == "combinar":
+        total = Estadisticas.cargar(args.rutas[0])
+        for ruta in args.rutas[1:]:
+            total.combinar(Estadisticas.cargar(ruta))
+        _guardar_o_mostrar(total, args.salida)
+    else:
+        print(Estadisticas.cargar(args.ruta).resumen())
+
+
+if __name__ == "__main__":
+    main()
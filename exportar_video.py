@@ -0,0 +1,180 @@
+"""
+Exportación de partidas automáticas a vídeo sin ventana.
+
+Ejecuta el modo automático con el driver de vídeo "dummy" y un reloj
+virtual: cada fotograma avanza exactamente 1000/fps milisegundos, así que
+la exportación va más rápido que el tiempo real y no pierde fotogramas.
+Los píxeles de la pantalla se leen con Surface.get_view (BufferProxy) y se
+escriben directamente en la salida, sin copias por fotograma.
+
+Salidas:
+- ffmpeg: se envían los fotogramas a un proceso ffmpeg que codifica el vídeo.
+- raw: un único archivo con los fotogramas en bruto, uno tras otro.
+- png: una secuencia de imágenes frame_000000.png, frame_000001.png, ...
+
+Uso:
+    python exportar_video.py salida.mp4 [--fps 30] [--pregunta TEXTO] [--semilla N]
+    python exportar_video.py fotogramas.raw --formato raw
+    python exportar_video.py carpeta --formato png
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+
+
+def formato_pixeles_ffmpeg(superficie):
+    """
+    Devuelve el nombre del formato de píxel de ffmpeg (por ejemplo 'bgr0')
+    que corresponde a la memoria de una superficie de 32 bits.
+    """
+    if superficie.get_bytesize() != 4:
+        raise ValueError("La exportación necesita una pantalla de 32 bits")
+    letras = ['0'] * 4
+    for letra, mascara, desplazamiento in zip("rgba", superficie.get_masks(), superficie.get_shifts()):
+        if mascara:
+            byte = desplazamiento // 8
+            letras[byte if sys.byteorder == "little" else 3 - byte] = letra
+    return ''.join(letras)
+
+
+class SalidaFFmpeg:
+    def __init__(self, ruta, superficie, fps):
+        ancho, alto = superficie.get_size()
+        comando = [
+            "ffmpeg", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", formato_pixeles_ffmpeg(superficie),
+            "-s", f"{ancho}x{alto}", "-r", str(fps), "-i", "-",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", ruta,
+        ]
+        self.proceso = subprocess.Popen(comando, stdin=subprocess.PIPE)
+
+    def escribir(self, superficie, _indice):
+        _escribir_pixeles(self.proceso.stdin, superficie)
+
+    def cerrar(self):
+        self.proceso.stdin.close()
+        self.proceso.wait()
+
+
+class SalidaRaw:
+    def __init__(self, ruta, superficie, fps):
+        ancho, alto = superficie.get_size()
+        self.archivo = open(ruta, "wb")
+        print(f"Formato raw: {ancho}x{alto}, {formato_pixeles_ffmpeg(superficie)}, {fps} fps")
+
+    def escribir(self, superficie, _indice):
+        _escribir_pixeles(self.archivo, superficie)
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+class SalidaPNG:
+    def __init__(self, ruta, superficie, fps):
+        self.carpeta = ruta
+        os.makedirs(ruta, exist_ok=True)
+
+    def escribir(self, superficie, indice):
+        import pygame
+        pygame.image.save(superficie, os.path.join(self.carpeta, f"frame_{indice:06d}.png"))
+
+    def cerrar(self):
+        pass
+
+
+SALIDAS = {"ffmpeg": SalidaFFmpeg, "raw": SalidaRaw, "png": SalidaPNG}
+
+
+def _escribir_pixeles(archivo, superficie):
+    """
+    Escribe los píxeles de la superficie leyendo su memoria directamente.
+    La vista bloquea la superficie, así que se libera tras cada escritura.
+    """
+    if superficie.get_pitch() != superficie.get_width() * superficie.get_bytesize():
+        raise ValueError("La pantalla tiene relleno entre filas; no se puede escribir sin copiar")
+    vista = superficie.get_view('0')
+    try:
+        archivo.write(vista)
+    finally:
+        del vista
+
+
+def exportar(juego, pantalla, salida, fps, pregunta, caracteres_por_segundo=15, cola_ms=3000, max_ms=10 * 60 * 1000):
+    """
+    Juega una partida automática completa con reloj virtual y envía cada
+    fotograma a salida. Devuelve el número de fotogramas escritos.
+    """
+    import pygame
+
+    reloj = {'ms': 0}
+    juego.obtener_ticks = lambda: reloj['ms']
+
+    # Entrar en modo automático como si se pulsara el botón
+    juego.manejar_evento(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=juego.boton_auto.rect.center))
+    # La pregunta se escribe letra a letra y se confirma con ENTER
+    teclas = [pygame.event.Event(pygame.KEYDOWN, key=0, unicode=letra) for letra in pregunta]
+    teclas.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN, unicode='\r'))
+    ms_por_tecla = 1000 / caracteres_por_segundo
+
+    fotograma = 0
+    fin_ms = None
+    while reloj['ms'] < max_ms:
+        # Instante exacto del fotograma, sin acumular errores de redondeo
+        ms = round(fotograma * 1000 / fps)
+        dt = ms - reloj['ms']
+        reloj['ms'] = ms
+        while teclas and ms >= (len(pregunta) + 1 - len(teclas)) * ms_por_tecla:
+            juego.manejar_evento(teclas.pop(0))
+
+        juego.actualizar_animacion(dt)
+        juego.actualizar_reparto(dt)
+        juego.actualizar_automatico(ms)
+        juego.draw(pantalla)
+        salida.escribir(pantalla, fotograma)
+        fotograma += 1
+
+        if fin_ms is None and juego.mostrando_respuesta:
+            fin_ms = ms + cola_ms
+        if fin_ms is not None and ms >= fin_ms:
+            break
+    return fotograma
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta una partida automática a vídeo sin ventana")
+    parser.add_argument("salida", help="Archivo de vídeo, archivo raw o carpeta de PNG")
+    parser.add_argument("--formato", choices=sorted(SALIDAS), default="ffmpeg")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--pregunta", default="¿Tendré suerte hoy?")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla de la mezcla para repetir la misma partida")
+    parser.add_argument("--cola", type=float, default=3.0, help="Segundos a grabar tras mostrar el resultado")
+    args = parser.parse_args()
+
+    salida_ruta = os.path.abspath(args.salida)
+    # Sin ventana ni sonido real; las rutas de recursos son relativas al juego
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    import juegoBaraja
+
+    if args.semilla is not None:
+        random.seed(args.semilla)
+    juego = juegoBaraja.Juego()
+    pantalla = juegoBaraja.screen
+    salida = SALIDAS[args.formato](salida_ruta, pantalla, args.fps)
+    inicio = time.perf_counter()
+    try:
+        fotogramas = exportar(juego, pantalla, salida, args.fps, args.pregunta, cola_ms=int(args.cola * 1000))
+    finally:
+        salida.cerrar()
+    duracion = time.perf_counter() - inicio
+    segundos_video = fotogramas / args.fps
+    print(f"{fotogramas} fotogramas ({segundos_video:.1f} s de vídeo) en {duracion:.1f} s "
+          f"({segundos_video / duracion:.1f}x tiempo real)")
+
+
+if __name__ == "__main__":
+    main()
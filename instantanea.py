@@ -0,0 +1,304 @@
+"""
+Instantáneas binarias del estado completo de un Juego.
+
+capturar() serializa todo el estado de la partida (pilas, cartas volteadas,
+fase automática, colas de animación, botones, pregunta...) en un bloque de
+bytes pequeño que identifica las cartas por su id_carta, nunca por sus
+superficies. restaurar() reconstruye ese estado sobre un Juego que ya tiene
+sus recursos cargados, así que no vuelve a leer nada de disco.
+
+Sirve para que un quiosco retome la partida tras un cierre inesperado y
+para que las herramientas de análisis generen muchas variantes a partir de
+una misma posición.
+"""
+import os
+import struct
+from collections import deque
+
+import registro
+
+MAGICO = b'JCI'
+VERSION = 5
+NINGUNA = 0xFFFF  # id de carta ausente
+NINGUN_INDICE = 0xFF
+
+ESTADOS_ANIMACION = ('inicio', 'dividiendo', 'mezclando')
+FASES_AUTO = (None, 'pregunta', 'mezclar', 'repartir', 'esperando_reparto', 'jugar')
+BANDERAS = ('modo_automatico', 'jugando', 'animando_mezcla', 'animando_reparto', 'mostrando_input',
+            'mostrando_respuesta', 'mostrar_mascota', 'arrastrando', 'mezcla_fisica')
+BOTONES = ('boton_mezclar', 'boton_repartir', 'boton_jugar', 'boton_reiniciar')
+# Atributos que el juego crea y borra con hasattr/delattr: ausente, False o True
+OPCIONALES = ('_mezcla_realizada', '_mazo_barajado')
+
+_CABECERA = struct.Struct('<3sB')
+_ESCALARES = struct.Struct('<BHBBBBBBBddiIhhhhHHI')
+_MEZCLA = struct.Struct('<HBd')       # id, lado, progreso
+_REPARTO = struct.Struct('<HBd')      # id, pila destino, progreso
+_POSICION = struct.Struct('<dd')
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+_PASOS = struct.Struct('<HB')         # pasos de reparto, hay carta en vuelo
+_TRAYECTORIA = struct.Struct('<HHB')  # jugadas, siguiente jugada, victoria prevista
+_JUGADA = struct.Struct('<HBBH')      # id, pila origen, pila destino, índice en origen
+
+
+def _id(carta):
+    return NINGUNA if carta is None else carta.id_carta
+
+
+def _empaquetar_ids(cartas):
+    ids = [carta.id_carta for carta in cartas]
+    return struct.pack(f'<H{len(ids)}H', len(ids), *ids)
+
+
+def capturar(juego):
+    """
+    Devuelve el estado completo del juego como bytes.
+    """
+    from juegoBaraja import posiciones
+
+    fase = getattr(juego, '_auto_fase', NINGUN_INDICE)
+    banderas = sum(1 << i for i, nombre in enumerate(BANDERAS) if getattr(juego, nombre))
+    botones = sum(1 << i for i, nombre in enumerate(BOTONES) if getattr(juego, nombre).activo)
+    opcionales = 0
+    for i, nombre in enumerate(OPCIONALES):
+        if hasattr(juego, nombre):
+            opcionales |= (2 if getattr(juego, nombre) else 1) << (2 * i)
+    respuesta = 0
+    if juego.respuesta_img is not None:
+        respuesta = 1 if juego.respuesta_img is juego.img_si else 2
+    pos_arrastre = juego.pos_arrastre or (0, 0)
+
+    partes = [_CABECERA.pack(MAGICO, VERSION), _ESCALARES.pack(
+        juego.estado, banderas, botones, opcionales, respuesta,
+        juego.pila_actual,
+        NINGUN_INDICE if juego.pos_origen_index is None else juego.pos_origen_index,
+        NINGUN_INDICE if fase == NINGUN_INDICE else FASES_AUTO.index(fase),
+        ESTADOS_ANIMACION.index(juego.estado_animacion),
+        juego.tiempo_animacion, juego.tiempo_reparto,
+        juego.obtener_ticks() - juego._auto_last_action_time,  # Relativo: el reloj se reinicia
+        juego._auto_action_interval,
+        juego.boton_reiniciar.rect.centerx, juego.boton_reiniciar.rect.top,
+        int(pos_arrastre[0]), int(pos_arrastre[1]),
+        _id(juego.carta_arrastrada), _id(juego.carta_actual_juego),
+        juego.semilla,
+    )]
+
+    partes.append(_empaquetar_ids(juego.mazo))
+    for pos in posiciones:
+        partes.append(_empaquetar_ids(juego.cartas_por_posicion[pos]))
+    volteadas = bytearray((len(juego.cartas_por_id) + 7) // 8)
+    for carta in juego.cartas_volteadas:
+        volteadas[carta.id_carta // 8] |= 1 << (carta.id_carta % 8)
+    partes.append(bytes(volteadas))
+
+    # Animación de mezcla
+    partes.append(_empaquetar_ids(juego.cartas_mezcladas))
+    partes.append(_U16.pack(len(juego.grupos_mezcla)))
+    for grupo in juego.grupos_mezcla:
+        partes.append(_MEZCLA.pack(grupo['carta'].id_carta, grupo['lado'] == 'derecha', grupo['progreso']))
+    actual = juego.carta_actual
+    partes.append(_U8.pack(actual is not None))
+    if actual is not None:
+        partes.append(_MEZCLA.pack(actual['carta'].id_carta, actual['lado'] == 'derecha', actual['progreso']))
+        partes.append(_POSICION.pack(*actual['pos_actual']))
+
+    # Animación de reparto
+    partes.append(_empaquetar_ids(juego.cartas_por_repartir))
+    cola = list(juego.cartas_a_repartir)
+    if juego.carta_actual_reparto is not None:
+        cola.insert(0, juego.carta_actual_reparto)
+    partes.append(_PASOS.pack(len(cola), juego.carta_actual_reparto is not None))
+    for paso in cola:
+        partes.append(_REPARTO.pack(paso['carta'].id_carta, posiciones.index(paso['pos_destino']), paso['progreso']))
+
+    # Jugadas precalculadas al repartir
+    partes.append(_TRAYECTORIA.pack(len(juego.trayectoria), juego.paso_trayectoria, juego.victoria_prevista))
+    for carta, origen, destino, indice in juego.trayectoria:
+        partes.append(_JUGADA.pack(carta.id_carta, origen, destino, indice))
+
+    for texto in [juego.pregunta, *juego.cola_preguntas]:
+        texto = texto.encode('utf-8')
+        partes.append(_U16.pack(len(texto)) + texto)
+    return b''.join(partes)
+
+
+class _Lector:
+    def __init__(self, datos):
+        self.datos = memoryview(datos)
+        self.pos = 0
+
+    def leer(self, formato):
+        valores = formato.unpack_from(self.datos, self.pos)
+        self.pos += formato.size
+        return valores
+
+    def ids(self, cartas_por_id):
+        n, = _U16.unpack_from(self.datos, self.pos)
+        ids = struct.unpack_from(f'<{n}H', self.datos, self.pos + 2)
+        self.pos += 2 + 2 * n
+        return [cartas_por_id[i] for i in ids]
+
+    def terminado(self):
+        return self.pos >= len(self.datos)
+
+    def bytes(self, n):
+        if self.pos + n > len(self.datos):
+            raise struct.error("faltan datos")
+        valor = bytes(self.datos[self.pos:self.pos + n])
+        self.pos += n
+        return valor
+
+
+def restaurar(juego, datos):
+    """
+    Restaura sobre juego el estado guardado por capturar(). Usa las cartas
+    ya cargadas del juego (juego.cartas_por_id), sin volver a leer recursos.
+    Lanza ValueError si los datos no son una instantánea válida.
+    """
+    from juegoBaraja import posiciones
+
+    lector = _Lector(datos)
+    try:
+        magico, version = lector.leer(_CABECERA)
+    except struct.error:
+        raise ValueError("Instantánea demasiado corta")
+    if magico != MAGICO or version != VERSION:
+        raise ValueError("Instantánea no válida o de otra versión")
+    cartas = juego.cartas_por_id
+
+    try:
+        (estado, banderas, botones, opcionales, respuesta, pila_actual, origen, fase, estado_animacion,
+         tiempo_animacion, tiempo_reparto, desde_ultima_accion, intervalo,
+         reiniciar_x, reiniciar_y, arrastre_x, arrastre_y, arrastrada, actual_juego,
+         semilla) = lector.leer(_ESCALARES)
+
+        mazo = lector.ids(cartas)
+        pilas = [lector.ids(cartas) for _ in posiciones]
+        bitmap = lector.bytes((len(cartas) + 7) // 8)
+
+        cartas_mezcladas = lector.ids(cartas)
+        n_grupos, = lector.leer(_U16)
+        grupos = []
+        for _ in range(n_grupos):
+            id_carta, derecha, progreso = lector.leer(_MEZCLA)
+            grupos.append(_grupo_mezcla(juego, cartas[id_carta], derecha, progreso))
+        carta_actual = None
+        if lector.leer(_U8)[0]:
+            id_carta, derecha, progreso = lector.leer(_MEZCLA)
+            carta_actual = _grupo_mezcla(juego, cartas[id_carta], derecha, progreso)
+            carta_actual['pos_actual'] = lector.leer(_POSICION)
+
+        cartas_por_repartir = lector.ids(cartas)
+        n_pasos, hay_actual = lector.leer(_PASOS)
+        cola = []
+        for _ in range(n_pasos):
+            id_carta, pila, progreso = lector.leer(_REPARTO)
+            cola.append({'carta': cartas[id_carta], 'pos_destino': posiciones[pila], 'progreso': progreso})
+        n_jugadas, paso_trayectoria, victoria_prevista = lector.leer(_TRAYECTORIA)
+        trayectoria = []
+        for _ in range(n_jugadas):
+            id_carta, origen_jugada, destino_jugada, indice = lector.leer(_JUGADA)
+            trayectoria.append((cartas[id_carta], origen_jugada, destino_jugada, indice))
+        preguntas = []
+        while not lector.terminado():
+            largo, = lector.leer(_U16)
+            preguntas.append(lector.bytes(largo).decode('utf-8'))
+        pregunta = preguntas.pop(0)
+    except (struct.error, IndexError, UnicodeDecodeError) as error:
+        raise ValueError(f"Instantánea dañada: {error}")
+
+    juego.detener_todos_sonidos()
+    juego.sembrar(semilla)  # Los eventos registrados siguen con la semilla de la partida
+    juego.estado = estado
+    for i, nombre in enumerate(BANDERAS):
+        setattr(juego, nombre, bool(banderas & (1 << i)))
+    for i, nombre in enumerate(BOTONES):
+        getattr(juego, nombre).activo = bool(botones & (1 << i))
+    for i, nombre in enumerate(OPCIONALES):
+        valor = (opcionales >> (2 * i)) & 3
+        if valor:
+            setattr(juego, nombre, valor == 2)
+        elif hasattr(juego, nombre):
+            delattr(juego, nombre)
+    juego.respuesta_img = (None, juego.img_si, juego.img_no)[respuesta]
+    juego.pila_actual = pila_actual
+    juego.pos_origen_index = None if origen == NINGUN_INDICE else origen
+    juego.pos_origen = None if origen == NINGUN_INDICE else posiciones[origen]
+    if fase == NINGUN_INDICE:
+        if hasattr(juego, '_auto_fase'):
+            del juego._auto_fase
+    else:
+        juego._auto_fase = FASES_AUTO[fase]
+    juego.estado_animacion = ESTADOS_ANIMACION[estado_animacion]
+    juego.tiempo_animacion = tiempo_animacion
+    juego.tiempo_reparto = tiempo_reparto
+    juego._auto_last_action_time = juego.obtener_ticks() - desde_ultima_accion
+    juego._auto_action_interval = intervalo
+    juego.boton_reiniciar.rect.centerx = reiniciar_x
+    juego.boton_reiniciar.rect.top = reiniciar_y
+    juego.carta_arrastrada = None if arrastrada == NINGUNA else cartas[arrastrada]
+    juego.pos_arrastre = (arrastre_x, arrastre_y) if juego.arrastrando else None
+    juego.carta_actual_juego = None if actual_juego == NINGUNA else cartas[actual_juego]
+
+    juego.mazo = mazo
+    juego.cartas_por_posicion = {pos: pila for pos, pila in zip(posiciones, pilas)}
+    juego.cartas_volteadas = {carta for carta in cartas if bitmap[carta.id_carta // 8] & (1 << (carta.id_carta % 8))}
+    juego.cartas_mezcladas = cartas_mezcladas
+    juego.grupos_mezcla = deque(grupos)
+    juego.carta_actual = carta_actual
+    juego.cartas_por_repartir = cartas_por_repartir
+    juego.carta_actual_reparto = cola.pop(0) if hay_actual else None
+    juego.cartas_a_repartir = deque(cola)
+    juego.trayectoria = trayectoria
+    juego.paso_trayectoria = paso_trayectoria
+    juego.victoria_prevista = bool(victoria_prevista)
+    juego.pregunta = pregunta
+    # El reparto preparado de la cola se vuelve a calcular cuando haga falta
+    juego.cola_preguntas = deque(preguntas)
+    juego.pregunta_en_espera = ""
+    juego.reparto_preparado = None
+    juego._jugadas_preparadas = None
+
+    # El sonido de barajar se reanuda si la mezcla estaba en marcha
+    if juego.audio_disponible and juego.animando_mezcla and juego.estado_animacion == 'mezclando':
+        juego.sonido_barajar.play(-1)
+        juego.barajando_sonando = True
+
+
+def _grupo_mezcla(juego, carta, derecha, progreso):
+    lado = 'derecha' if derecha else 'izquierda'
+    return {
+        'carta': carta,
+        'lado': lado,
+        'pos_actual': juego.pos_inicial_der if derecha else juego.pos_inicial_izq,
+        'progreso': progreso,
+    }
+
+
+def guardar_archivo(datos, ruta):
+    """
+    Escribe una instantánea en disco de forma atómica: o queda la nueva
+    completa o la anterior intacta, aunque el proceso muera a mitad.
+    """
+    temporal = ruta + '.tmp'
+    with open(temporal, 'wb') as f:
+        f.write(datos)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+def cargar_archivo(juego, ruta):
+    """
+    Restaura el juego desde una instantánea en disco. Devuelve True si se
+    restauró y False si no existe o no es válida.
+    """
+    try:
+        with open(ruta, 'rb') as f:
+            restaurar(juego, f.read())
+    except (OSError, ValueError) as error:
+        if os.path.exists(ruta):
+            registro.evento('instantanea_no_restaurada', juego.semilla, ruta, str(error))
+        return False
+    return True
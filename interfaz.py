@@ -0,0 +1,174 @@
+"""
+Botones compartidos por juegoBaraja.py y botones.py.
+
+Cada Button dibuja una sola vez, al crearse, sus cuatro estados (normal,
+hover, presionado y desactivado) en superficies convertidas al formato de
+pantalla; en cada fotograma solo se copia la superficie del estado actual.
+Un ContenedorBotones agrupa los botones de una pantalla, decide a qué botón
+va cada clic y llama a su acción, en lugar de comparar textos o recorrer
+los botones uno a uno en cada pantalla.
+"""
+import os
+from functools import lru_cache
+
+import pygame
+
+import paquete
+from superficies import optimizar_superficie
+
+RUTA_FUENTE = os.path.join("recursos", "JandaEverydayCasual.ttf")
+TAMANO_FUENTE = 28
+
+COLOR_TEXTO = (0, 0, 0)
+COLOR_BORDE = (0, 0, 0)
+COLOR_DESACTIVADO = (128, 128, 128)
+RADIO_BORDE = 20
+
+NORMAL = 'normal'
+HOVER = 'hover'
+PRESIONADO = 'presionado'
+DESACTIVADO = 'desactivado'
+
+MOUSEMOTION = getattr(pygame, 'MOUSEMOTION', 1024)
+MOUSEBUTTONDOWN = getattr(pygame, 'MOUSEBUTTONDOWN', 1025)
+MOUSEBUTTONUP = getattr(pygame, 'MOUSEBUTTONUP', 1026)
+
+
+@lru_cache(maxsize=None)
+def fuente(ruta=RUTA_FUENTE, tamano=TAMANO_FUENTE):
+    """
+    Devuelve la fuente de la ruta y tamaño indicados, cargándola una sola vez
+    (del paquete de recursos si está en él). Si la ruta no existe se usa la
+    fuente por defecto de Pygame.
+    """
+    if ruta is None or not paquete.existe(ruta):
+        return pygame.font.Font(None, tamano)
+    return pygame.font.Font(paquete.abrir(ruta), tamano)
+
+
+def _aclarar(color, cantidad=40):
+    return tuple(min(255, c + cantidad) for c in color)
+
+
+def _oscurecer(color):
+    return tuple(c * 3 // 4 for c in color)
+
+
+# CLASE Button: Botón gráfico con texto, color y acción
+class Button:
+    def __init__(self, x, y, width, height, text, color=(0, 200, 0), accion=None, font=None):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.text = text
+        self.color = color
+        self.accion = accion  # Función sin argumentos que se llama al pulsar
+        self.activo = True
+        self.visible = True
+        self.hover = False
+        self.presionado = False
+        self.font = font or fuente()
+        self.text_surface = self.font.render(text, True, COLOR_TEXTO)
+        self.superficies = {
+            NORMAL: self._renderizar(color),
+            HOVER: self._renderizar(_aclarar(color)),
+            PRESIONADO: self._renderizar(_oscurecer(color)),
+            DESACTIVADO: self._renderizar(COLOR_DESACTIVADO),
+        }
+
+    def _renderizar(self, color):
+        """
+        Dibuja el botón con el color de fondo indicado en una superficie propia.
+        """
+        superficie = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        caja = superficie.get_rect()
+        pygame.draw.rect(superficie, color, caja, border_radius=RADIO_BORDE)
+        pygame.draw.rect(superficie, COLOR_BORDE, caja, 2, border_radius=RADIO_BORDE)
+        superficie.blit(self.text_surface, self.text_surface.get_rect(center=caja.center))
+        if pygame.display.get_surface() is not None:  # convert() necesita una pantalla
+            superficie, _ = optimizar_superficie(superficie)
+        return superficie
+
+    @property
+    def estado(self):
+        if not self.activo:
+            return DESACTIVADO
+        if self.presionado:
+            return PRESIONADO
+        if self.hover:
+            return HOVER
+        return NORMAL
+
+    def draw(self, surface):
+        """
+        Dibuja el botón en la superficie indicada con el estado actual.
+        """
+        surface.blit(self.superficies[self.estado], self.rect)
+
+    def is_clicked(self, pos):
+        """
+        Devuelve True si el punto (pos) está dentro del botón.
+        """
+        return self.rect.collidepoint(pos)
+
+
+# CLASE ContenedorBotones: Botones de una pantalla y reparto de los clics
+class ContenedorBotones:
+    def __init__(self, botones=()):
+        self.botones = list(botones)
+
+    def agregar(self, boton):
+        self.botones.append(boton)
+        return boton
+
+    def boton_en(self, pos):
+        """
+        Devuelve el botón visible que hay en pos, o None. Si se solapan gana
+        el último, que es el que se dibuja encima.
+        """
+        for boton in reversed(self.botones):
+            if boton.visible and boton.rect.collidepoint(pos):
+                return boton
+        return None
+
+    def seguir_puntero(self, event):
+        """
+        Actualiza hover y presionado con el movimiento y la suelta del ratón,
+        sin pulsar ningún botón. Sirve para pantallas que no están a la vista.
+        """
+        if event.type == MOUSEMOTION:
+            encima = self.boton_en(event.pos)
+            for boton in self.botones:
+                boton.hover = boton is encima
+        elif event.type == MOUSEBUTTONUP and event.button == 1:
+            for boton in self.botones:
+                boton.presionado = False
+
+    def manejar_evento(self, event):
+        """
+        Procesa un evento de ratón: sigue el puntero y atiende los clics.
+        Devuelve el botón pulsado o None.
+        """
+        self.seguir_puntero(event)
+        return self.pulsar(event)
+
+    def pulsar(self, event):
+        """
+        Si el evento es un clic izquierdo sobre un botón visible y activo,
+        llama a su acción y devuelve el botón; si no, devuelve None.
+        """
+        if event.type != MOUSEBUTTONDOWN or event.button != 1:
+            return None
+        boton = self.boton_en(event.pos)
+        if boton is None or not boton.activo:
+            return None
+        boton.presionado = True
+        if boton.accion is not None:
+            boton.accion()
+        return boton
+
+    def draw(self, surface):
+        """
+        Dibuja todos los botones visibles.
+        """
+        for boton in self.botones:
+            if boton.visible:
+                boton.draw(surface)
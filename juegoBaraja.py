@@ -1,6 +1,26 @@
 import pygame
 import os
 import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from reglas import valor_de_nombre, siguiente_pila, calcular_trayectoria
+from riffle import paquetes_riffle, paquetes_gsr
+from superficies import optimizar_superficie
+from interfaz import Button, ContenedorBotones, RUTA_FUENTE, fuente
+from cargador import CargadorImagenes, decodificar
+from caras import CarasPerezosas
+import paquete
+import instantanea
+import registro
+import metricas
+import texturas
+import perfilador
+import transmision
+import repartos
+import recarga
+import latencia
 
 pygame.init()  # Inicializa todos los módulos de Pygame
 
@@ -24,6 +44,79 @@ BUTTON_WIDTH, BUTTON_HEIGHT = 120, 40  # Tamaño de los botones
 CARD_OFFSET_H = 20  # Desplazamiento horizontal para el efecto "escalerita" de cartas
 CARD_OFFSET_V = 2   # Desplazamiento vertical para el mazo
 
+# Mezcla física: el orden del mazo sale solo de riffles de Gilbert-Shannon-Reeds
+# (sin random.shuffle). Cada mezcla hace RIFFLES_MEZCLA_FISICA riffles y anima
+# el último; 8 es lo que mide "python benchmark.py riffle --modelo gsr".
+MEZCLA_FISICA = False
+RIFFLES_MEZCLA_FISICA = 8
+
+# Barajas completas que se mezclan juntas. Hay una pila por rango, así que
+# con 2 barajas cada pila recibe 8 cartas (pruebas de carga del motor).
+NUM_MAZOS = 1
+
+# Cola de preguntas en modo automático: durante una partida se pueden escribir
+# las siguientes preguntas, y al terminar empieza sola la próxima, con su
+# reparto ya barajado y resuelto en segundo plano mientras se jugaba.
+COLA_PREGUNTAS = True
+PAUSA_RESULTADO = 3000  # milisegundos que se ve el resultado antes de la siguiente
+
+# Motor de dibujo: "superficies" (blit de software sobre la ventana de
+# set_mode) o "texturas" (pygame._sdl2.video: cada imagen se sube una vez
+# como textura y la mesa se dibuja con copias de texturas por lotes).
+# RENDERER_SOFTWARE usa el renderer de software de SDL, para máquinas sin GPU.
+MOTOR_DIBUJO = "superficies"
+RENDERER_SOFTWARE = False
+
+# Hilos que decodifican y escalan las imágenes al cargar (None: uno por núcleo)
+HILOS_CARGA = None
+
+# Paquete de recursos creado con "python paquete.py". Si existe, imágenes,
+# fuente y sonidos salen de él; si no, se leen de img/ y recursos/.
+RUTA_PAQUETE = "recursos.pak"
+
+# Instantánea del estado para retomar la partida tras un cierre inesperado
+# (por ejemplo "partida.bin" en los quioscos). None la desactiva.
+RUTA_INSTANTANEA = None
+INTERVALO_INSTANTANEA = 1000  # milisegundos entre comprobaciones
+
+# Registro de eventos (modo, pregunta, mezcla, reparto, jugadas y resultado)
+# en líneas JSON, escrito por un hilo aparte y rotado. None lo desactiva.
+RUTA_REGISTRO = "registro.jsonl"
+
+# Métricas de Prometheus para vigilar los quioscos: un puerto sirve
+# http://127.0.0.1:<puerto>/metrics y una ruta se reescribe cada
+# INTERVALO_METRICAS segundos (textfile collector). None desactiva cada uno.
+PUERTO_METRICAS = None
+RUTA_METRICAS = None
+INTERVALO_METRICAS = 15
+
+# Captura de perfiles bajo demanda: la tecla o la señal (kill -USR1 <pid>)
+# activan cProfile durante los siguientes FOTOGRAMAS_PERFIL fotogramas o
+# SEGUNDOS_PERFIL segundos y escriben un .pstats y un informe junto al
+# registro. None desactiva cada una.
+TECLA_PERFIL = 'K_F9'
+SENAL_PERFIL = 'SIGUSR1'
+FOTOGRAMAS_PERFIL = 300
+SEGUNDOS_PERFIL = 10
+
+# Transmisión de la mesa a espectadores (espectador.py) por TCP: cada
+# reparto, jugada, fase y resultado sale como un mensaje binario de pocos
+# bytes. "0.0.0.0" la abre a la red local. None la desactiva.
+PUERTO_TRANSMISION = None
+HOST_TRANSMISION = "127.0.0.1"
+
+# Traza la latencia del ratón al arrastrar en modo manual (cola, manejo,
+# espera del fotograma y dibujo), la añade a las métricas y la resume al salir
+TRAZA_LATENCIA = False
+
+# Caras de cartas que se decodifican en segundo plano antes de que toque
+# voltearlas, siguiendo el orden de juego que fija el reparto
+PRECARGA_CARAS = 8
+
+# Modo de desarrollo para el equipo de arte: vigila img/ y recursos/ y, si
+# cambia una imagen, la vuelve a cargar y la cambia en el juego en marcha.
+RECARGA_IMAGENES = False
+
 # Coordenadas de las 13 pilas en la mesa 
 posiciones = [
     (WIDTH // 2 - 350, 80),    # Pila 1
@@ -42,80 +135,59 @@ posiciones = [
 ]
 
 
+def preparar_reparto(valores_por_id, semilla, mezcla_fisica=False):
+    """
+    Baraja los ids de las cartas con la semilla igual que mezclar_hojeo y
+    resuelve la partida que sale. Solo usa enteros, así que se puede llamar
+    desde otro hilo. Devuelve (mazo barajado, caídas del riffle animado,
+    jugadas, victoria), con las cartas como ids.
+    """
+    rng = random.Random(semilla)
+    mazo = list(range(len(valores_por_id)))
+    if mezcla_fisica:
+        for _ in range(RIFFLES_MEZCLA_FISICA - 1):
+            mazo = [id_carta for id_carta, _ in paquetes_gsr(mazo, rng)]
+        caidas = paquetes_gsr(mazo, rng)
+    else:
+        rng.shuffle(mazo)
+        mitad = len(mazo) // 2
+        caidas = paquetes_riffle(mazo[:mitad], mazo[mitad:], rng)
+    jugadas, victoria = calcular_trayectoria([valores_por_id[id_carta] for id_carta, _ in caidas])
+    return mazo, caidas, jugadas, victoria
+
+
 # CLASE Carta: Representa una carta individual             
 class Carta:
-    def __init__(self, imagen_frontal, imagen_reverso, nombre_archivo):
-        self.imagen_frontal = imagen_frontal
+    def __init__(self, caras, imagen_reverso, nombre_archivo):
+        self.caras = caras  # CarasPerezosas compartidas por todo el mazo
         self.imagen_reverso = imagen_reverso
         self.nombre_archivo = nombre_archivo
-        self.rect = imagen_frontal.get_rect()
+        self.rect = imagen_reverso.get_rect()
+        self.id_carta = None  # Lo asigna Juego.cargar_cartas
+
+    @property
+    def imagen_frontal(self):
+        """
+        Cara de la carta; se decodifica la primera vez que se pide.
+        """
+        return self.caras.obtener(self.nombre_archivo)
         
     def obtener_valor(self):
         """
         Devuelve el valor numérico de la carta según su nombre de archivo.
         A=1, J=11, Q=12, K=13, números según corresponda.
         """
-        # Obtener el valor del inicio del nombre del archivo
-        nombre = self.nombre_archivo.lower()  # Convertir a minúsculas para manejar mejor
-        
-        # Manejar casos especiales primero
-        if nombre.startswith('a'):
-            return 1
-        elif nombre.startswith('j'):
-            return 11
-        elif nombre.startswith('q'):
-            return 12
-        elif nombre.startswith('k'):
-            return 13
-        else:
-            # Para números del 2-10, tomar los dígitos del inicio
-            valor = ''
-            for char in nombre:
-                if char.isdigit():
-                    valor += char
-                else:
-                    break
-            return int(valor) if valor else 0
+        return valor_de_nombre(self.nombre_archivo)
 
     def obtener_siguiente_posicion(self, carta):
         """
         Dado un objeto carta, devuelve el índice de la pila destino según el valor.
         """
         # Usar el nombre del archivo para determinar el valor
-        valor = carta.obtener_valor()
-        if valor == 13:  # K
-            return 12  # índice 12 corresponde a posición 13 (centro)
-        return valor - 1  # índice 0-11 corresponde a posiciones 1-12
+        return siguiente_pila(carta.obtener_valor())
         
 
 
-# CLASE Button: Botón gráfico con texto y color            
-class Button:
-    def __init__(self, x, y, width, height, text, color=(0, 200, 0)):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.text = text
-        self.color = color
-        self.activo = True
-        self.font = pygame.font.Font(os.path.join("recursos", "JandaEverydayCasual.ttf"), 28) if os.path.exists(os.path.join("recursos", "JandaEverydayCasual.ttf")) else pygame.font.Font(None, 28)
-        self.text_surface = self.font.render(text, True, (0, 0, 0))
-
-    def draw(self, surface):
-        """
-        Dibuja el botón en la superficie indicada.
-        """
-        color = self.color if self.activo else (128, 128, 128)
-        pygame.draw.rect(surface, color, self.rect, border_radius=20)
-        pygame.draw.rect(surface, (0, 0, 0), self.rect, 2, border_radius=20)
-        text_rect = self.text_surface.get_rect(center=self.rect.center)
-        surface.blit(self.text_surface, text_rect)
-
-    def is_clicked(self, pos):
-        """
-        Devuelve True si el punto (pos) está dentro del botón.
-        """
-        return self.rect.collidepoint(pos)
-
-
 ###########################################################
 # CLASE Juego: Lógica principal del juego de cartas        #
 ###########################################################
@@ -125,33 +197,50 @@ class Juego:
     ESTADO_JUEGO = 2
     ESTADO_AUTO = 3
 
-    def __init__(self):
+    def __init__(self, progreso_carga=None):
         """
-        Inicializa todos los atributos y estados del juego.
+        Inicializa todos los atributos y estados del juego. progreso_carga,
+        si se indica, se llama como progreso_carga(hechas, total, ruta) a
+        medida que se cargan las imágenes.
         """
+        # Abrir el paquete de recursos antes de cargar fuentes, imágenes o sonidos
+        self.paquete = paquete.cargar(RUTA_PAQUETE)
+        self.sembrar()
+
         # Atributos para la animación
         self.animando_mezcla = False
         self.tiempo_animacion = 0
         self.duracion_animacion = 120  # Tiempo de animación de la MEZCLA (milisegundos por paso)
         self.cartas_mezcladas = []
-        self.grupos_mezcla = []
+        self.grupos_mezcla = deque()
         self.carta_actual = None
         self.pos_central = (WIDTH // 2 - 100, HEIGHT // 2 - 100)  # Más arriba y a la izquierda
         self.pos_inicial_izq = (WIDTH // 2 - 250, HEIGHT // 2 - 100)  # Más separado a la izquierda
         self.pos_inicial_der = (WIDTH // 2 + 50, HEIGHT // 2 - 100)   # Más separado a la derecha
         self.estado_animacion = 'inicio'
+        self.mezcla_fisica = MEZCLA_FISICA
+        self.num_mazos = NUM_MAZOS
 
         # Variables para automatización del modo automático
         self._auto_fase = None
         self._auto_last_action_time = 0
-        self._auto_action_interval = 1000  # milisegundos (1 segundo)
+        self._auto_action_interval = 2500  # milisegundos (2.5 segundos)
+        # Cola de preguntas: las siguientes preguntas y el reparto de la próxima
+        # partida, (semilla, Future de preparar_reparto), que se calcula en otro hilo
+        self.cola_preguntas = deque()
+        self.pregunta_en_espera = ""  # Lo que se está escribiendo durante la partida
+        self.reparto_preparado = None
+        self._jugadas_preparadas = None
+        self._preparador = None
+        # Reloj del juego en milisegundos; la exportación de vídeo lo sustituye por uno virtual
+        self.obtener_ticks = pygame.time.get_ticks
 
         self.tiempo_reparto = 0
         # Asegurarnos de que no haya cartas fantasma
         self.animando_reparto = False
         self.carta_actual_reparto = None
         self.cartas_por_repartir = []
-        self.cartas_a_repartir = []
+        self.cartas_a_repartir = deque()
         self.posicion_destino = None
         self.duracion_reparto_carta = 35  # Tiempo de animación de REPARTO de cada carta (milisegundos)
 
@@ -167,19 +256,30 @@ class Juego:
         alto = 60
         total_ancho = ancho_auto + ancho_manual + espacio_entre
         inicio_x = WIDTH//2 - total_ancho//2
-        self.boton_auto = Button(inicio_x, botones_y, ancho_auto, alto, "Modo Automático", color=(0, 200, 0))
-        self.boton_manual = Button(inicio_x + ancho_auto + espacio_entre, botones_y, ancho_manual, alto, "Modo Manual", color=(0, 200, 0))
-        self.boton_instrucciones = Button(WIDTH//2 - 100, botones_y + alto + 40, 200, 50, "Instrucciones", color=(0, 150, 200))
+        self.boton_auto = Button(inicio_x, botones_y, ancho_auto, alto, "Modo Automático", color=(0, 200, 0),
+                                 accion=self.accion_modo_automatico)
+        self.boton_manual = Button(inicio_x + ancho_auto + espacio_entre, botones_y, ancho_manual, alto, "Modo Manual", color=(0, 200, 0),
+                                   accion=self.accion_modo_manual)
+        self.boton_instrucciones = Button(WIDTH//2 - 100, botones_y + alto + 40, 200, 50, "Instrucciones", color=(0, 150, 200),
+                                          accion=self.accion_instrucciones)
+        self.botones_inicio = ContenedorBotones([self.boton_auto, self.boton_manual, self.boton_instrucciones])
 
         # Botones de juego
-        self.boton_mezclar = Button(WIDTH-150, 100, BUTTON_WIDTH, BUTTON_HEIGHT, "Mezclar", color=(200, 200, 0))
-        self.boton_repartir = Button(WIDTH-150, 200, BUTTON_WIDTH, BUTTON_HEIGHT, "Repartir", color=(0, 150, 200))
-        self.boton_jugar = Button(WIDTH-150, 300, BUTTON_WIDTH, BUTTON_HEIGHT, "Jugar", color=(0, 200, 0))
-        self.boton_reiniciar = Button(WIDTH-150, 400, BUTTON_WIDTH, BUTTON_HEIGHT, "Reiniciar", color=(200, 0, 0))
+        self.boton_mezclar = Button(WIDTH-150, 100, BUTTON_WIDTH, BUTTON_HEIGHT, "Mezclar", color=(200, 200, 0),
+                                    accion=self.accion_mezclar)
+        self.boton_repartir = Button(WIDTH-150, 200, BUTTON_WIDTH, BUTTON_HEIGHT, "Repartir", color=(0, 150, 200),
+                                     accion=self.accion_repartir)
+        self.boton_jugar = Button(WIDTH-150, 300, BUTTON_WIDTH, BUTTON_HEIGHT, "Jugar", color=(0, 200, 0),
+                                  accion=self.accion_jugar)
+        self.botones_mesa = ContenedorBotones([self.boton_mezclar, self.boton_repartir, self.boton_jugar])
+        # Reiniciar solo aparece, y solo se puede pulsar, sobre el resultado de la partida
+        self.boton_reiniciar = Button(WIDTH-150, 400, BUTTON_WIDTH, BUTTON_HEIGHT, "Reiniciar", color=(200, 0, 0),
+                                      accion=self.accion_reiniciar)
+        self.botones_resultado = ContenedorBotones([self.boton_reiniciar])
 
         # Fuente grande para títulos
-        self.font_titulo = pygame.font.Font(os.path.join("recursos", "JandaEverydayCasual.ttf"), 48) if os.path.exists(os.path.join("recursos", "JandaEverydayCasual.ttf")) else pygame.font.Font(None, 48)
-        self.font_btn = pygame.font.Font(os.path.join("recursos", "JandaEverydayCasual.ttf"), 28) if os.path.exists(os.path.join("recursos", "JandaEverydayCasual.ttf")) else pygame.font.Font(None, 28)
+        self.font_titulo = fuente(RUTA_FUENTE, 48)
+        self.font_btn = fuente(RUTA_FUENTE, 28)
 
         # Texto de instrucciones
         self.texto_instrucciones = [
@@ -191,11 +291,30 @@ class Juego:
             "- Pulsa ESC para volver al menú principal."
         ]
 
-        # Cargar imágenes
-        self.fondo = self.cargar_imagen(os.path.join("recursos", "fondo.png"), (WIDTH, HEIGHT))
-        self.reverso_base = self.cargar_imagen(os.path.join("recursos", "reversoo.png"), (CARD_WIDTH, CARD_HEIGHT))
+        # Cargar imágenes en paralelo (ruta -> (tamaño, formato elegido por cargar_imagen))
+        self.imagenes_cargadas = {}
+        self.rutas_recargadas = set()  # Cambiadas en caliente: el paquete tiene la versión vieja
+        self.cargador = CargadorImagenes(HILOS_CARGA)
+        self.progreso_carga = progreso_carga
+        imagenes = [
+            ('fondo', os.path.join("recursos", "fondo.png"), (WIDTH, HEIGHT)),
+            ('reverso_base', os.path.join("recursos", "reversoo.png"), (CARD_WIDTH, CARD_HEIGHT)),
+            ('img_si', os.path.join("recursos", "respSI.png"), (480, 300)),      # Imágenes de respuesta
+            ('img_no', os.path.join("recursos", "respNO.png"), (480, 300)),
+            ('img_pregunta', os.path.join("recursos", "pregunta.png"), (600, 200)),
+            ('img_mascota', os.path.join("recursos", "mascota.png"), (150, 150)),     # Imagen meditando
+        ]
+        # Atributo que guarda cada imagen, para cambiarla en caliente (reemplazar_imagen)
+        self.atributos_imagen = {ruta: atributo for atributo, ruta, _ in imagenes}
+        cargadas = self.cargar_imagenes([(ruta, size) for _, ruta, size in imagenes])
+        for (atributo, _, _), imagen in zip(imagenes, cargadas):
+            setattr(self, atributo, imagen)
          
-        # Cargar mazo
+        # Cargar mazo: las caras no se decodifican hasta que se ven
+        nombres = self.paquete.listar("img") if self.paquete else os.listdir("img")
+        self.caras = CarasPerezosas({carta: (os.path.join("img", carta), (CARD_WIDTH, CARD_HEIGHT))
+                                     for carta in nombres if carta.endswith(".png")},
+                                    self._decodificar_imagen, self._enviar_imagen, self._convertir_imagen)
         self.mazo = self.cargar_cartas()
         self.mazo_pos = (50, HEIGHT//2 - CARD_HEIGHT//2)
         self.cartas_por_posicion = {pos: [] for pos in posiciones}
@@ -236,6 +355,12 @@ class Juego:
         self.cartas_volteadas = set()
         self.pila_actual = 12  # Empezamos en la pila central
         self.total_cartas = 52
+
+        # Jugadas precalculadas al repartir: (carta, pila_origen, pila_destino, indice_en_origen)
+        self.trayectoria = []
+        self.paso_trayectoria = 0  # Índice de la siguiente jugada
+        self.victoria_prevista = False
+        self._progreso_cache = (None, None)  # (cartas restantes, texto renderizado)
         
         # Variables para arrastrar cartas
         self.arrastrando = False
@@ -244,10 +369,6 @@ class Juego:
         self.pos_origen = None
         self.pos_origen_index = None
 
-        # Cargar imágenes de respuesta
-        self.img_si = self.cargar_imagen(os.path.join("recursos", "respSI.png"), (480, 300))
-        self.img_no = self.cargar_imagen(os.path.join("recursos", "respNO.png"), (480, 300))
-        
         # Variables para el cuadro de texto
         self.pregunta = ""
         self.mostrando_input = False
@@ -262,21 +383,18 @@ class Juego:
         self.respuesta_img = None
         self.tiempo_respuesta = 0
 
-        # Cargar imagen de pregunta
-        self.img_pregunta = self.cargar_imagen(os.path.join("recursos", "pregunta.png"), (600, 200))
-        
         # Cargar la fuente personalizada
         try:
-            self.font = pygame.font.Font(os.path.join("recursos", "JandaEverydayCasual.ttf"), 18)
-        except Exception:
-            print("No se pudo cargar la fuente personalizada, usando fuente por defecto")
+            self.font = fuente(RUTA_FUENTE, 18)
+        except Exception as error:
+            registro.evento('fuente_no_disponible', self.semilla, str(error))
             self.font = pygame.font.Font(None, 20)  # Fuente por defecto si falla la carga
         
 
         # Variables para el cuadro de texto
         self.pregunta = ""
         self.mostrando_input = False
-        self.font = pygame.font.Font(os.path.join("recursos", "JandaEverydayCasual.ttf"), 18)
+        self.font = fuente(RUTA_FUENTE, 18)
         
         # Definir el área de texto dentro de la imagen
         self.area_texto = {
@@ -286,34 +404,32 @@ class Juego:
             'offset_y': 60     # Ajusta según necesites
         }
         self.margen_texto = 10
-        self.font = pygame.font.Font(os.path.join("recursos", "JandaEverydayCasual.ttf"), 18) 
+        self.font = fuente(RUTA_FUENTE, 18)
 
-        # Cargar imagen meditando
-        self.img_mascota = self.cargar_imagen(os.path.join("recursos", "mascota.png"), (150, 150))  # Ajusta el tamaño según necesites
         self.mostrar_mascota = True  # Variable para controlar cuando se muestra la imagen
 
         # Inicializar sistema de audio con manejo de errores
         try:
             pygame.mixer.init()
             # Cargar efectos de sonido y música
-            self.sonido_click = pygame.mixer.Sound(os.path.join("recursos", "click.mp3"))
+            self.sonido_click = pygame.mixer.Sound(paquete.abrir(os.path.join("recursos", "click.mp3")))
             
             # Configurar y reproducir música de fondo
-            pygame.mixer.music.load(os.path.join("recursos", "jazz.mp3"))
+            pygame.mixer.music.load(paquete.abrir(os.path.join("recursos", "jazz.mp3")))
             pygame.mixer.music.set_volume(0.3)  # Volumen al 30%
             pygame.mixer.music.play(-1)  # -1 significa loop infinito
             
-            self.sonido_error = pygame.mixer.Sound(os.path.join("recursos", "error.mp3"))
-            self.sonido_tomar = pygame.mixer.Sound(os.path.join("recursos", "cartaTomada.mp3"))
-            self.sonido_soltar = pygame.mixer.Sound(os.path.join("recursos", "cartaSoltada.mp3"))
-            self.sonido_barajar = pygame.mixer.Sound(os.path.join("recursos", "barajada.mp3"))
+            self.sonido_error = pygame.mixer.Sound(paquete.abrir(os.path.join("recursos", "error.mp3")))
+            self.sonido_tomar = pygame.mixer.Sound(paquete.abrir(os.path.join("recursos", "cartaTomada.mp3")))
+            self.sonido_soltar = pygame.mixer.Sound(paquete.abrir(os.path.join("recursos", "cartaSoltada.mp3")))
+            self.sonido_barajar = pygame.mixer.Sound(paquete.abrir(os.path.join("recursos", "barajada.mp3")))
             self.sonido_barajar.set_volume(0.5)
             self.sonido_error.set_volume(0.5)
             
             self.audio_disponible = True
             self.barajando_sonando = False
-        except Exception:
-            print("No se pudo inicializar el sistema de audio")
+        except Exception as error:
+            registro.evento('audio_no_disponible', self.semilla, str(error))
             self.audio_disponible = False
         
         self.duracion_reparto_carta = 100  # Originalmente era más alto, ajusta este valor según necesites
@@ -362,17 +478,86 @@ class Juego:
         except Exception:
             pass
     
+    def sembrar(self, semilla=None):
+        """
+        Fija la semilla de las mezclas de la partida. Sin semilla se saca una
+        nueva del generador global; con la de un registro se repite la partida.
+        """
+        self.semilla = random.getrandbits(32) if semilla is None else semilla
+        self.rng = random.Random(self.semilla)
+
+    def preparar_siguiente_reparto(self, semilla=None):
+        """
+        Empieza a barajar y resolver en otro hilo el reparto de la próxima
+        partida, si no hay ya uno en marcha. Sin semilla se saca una nueva.
+        """
+        if self.reparto_preparado is not None:
+            return
+        if self._preparador is None:
+            self._preparador = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preparador")
+        if semilla is None:
+            semilla = random.getrandbits(32)
+        valores = [carta.obtener_valor() for carta in self.cartas_por_id]
+        self.reparto_preparado = (semilla, self._preparador.submit(preparar_reparto, valores, semilla, self.mezcla_fisica))
+
+    def encolar_pregunta(self, texto):
+        """
+        Añade una pregunta a la cola del modo automático. Si la partida ya
+        terminó, la siguiente empieza tras PAUSA_RESULTADO.
+        """
+        self.cola_preguntas.append(texto)
+        registro.evento('pregunta_en_cola', self.semilla, texto, len(self.cola_preguntas))
+        self.preparar_siguiente_reparto()
+
+    def siguiente_partida(self):
+        """
+        Empieza la primera pregunta de la cola sin pasar por reiniciar_juego:
+        recoge las mismas cartas, sin volver a cargarlas, y va directa a la
+        mezcla, que usa el reparto ya preparado.
+        """
+        self.detener_todos_sonidos()
+        if self.reparto_preparado is None:
+            self.preparar_siguiente_reparto()
+        self.sembrar(self.reparto_preparado[0])
+        self.mazo = list(self.cartas_por_id)
+        self.cartas_por_posicion = {pos: [] for pos in posiciones}
+        self.cartas_volteadas = set()
+        transmision.evento('recoger')
+        self.trayectoria = []
+        self.paso_trayectoria = 0
+        self.carta_actual_juego = None
+        self.mostrando_respuesta = False
+        self.respuesta_img = None
+        self.mostrar_mascota = True
+        for attr in ('_mezcla_realizada', '_mazo_barajado'):
+            if hasattr(self, attr):
+                delattr(self, attr)
+        self.boton_mezclar.activo = True
+        self.boton_repartir.activo = True
+        self.boton_reiniciar.activo = False
+        self.pregunta = self.cola_preguntas.popleft()
+        registro.evento('pregunta', self.semilla, self.pregunta)
+        transmision.evento('pregunta', self.pregunta)
+        self._auto_fase = 'mezclar'
+        self._auto_last_action_time = self.obtener_ticks()
+        if self.audio_disponible:
+            pygame.mixer.music.play(-1)
+
     def reiniciar_juego(self):
         """
         Restaura todos los estados y variables para comenzar una nueva partida.
         """
         self.detener_todos_sonidos()
+        self.sembrar()
 
         # Reiniciar variables del juego
         self.jugando = False
         self.mazo = self.cargar_cartas()
         self.cartas_por_posicion = {pos: [] for pos in posiciones}
         self.cartas_volteadas = set()
+        transmision.evento('recoger')
+        self.trayectoria = []
+        self.paso_trayectoria = 0
         self.carta_arrastrada = None
         self.arrastrando = False
         self.mostrando_respuesta = False
@@ -380,6 +565,10 @@ class Juego:
         self.pregunta = ""
         self.mostrando_input = False
         self._auto_fase = None
+        self.cola_preguntas.clear()
+        self.pregunta_en_espera = ""
+        self.reparto_preparado = None
+        self._jugadas_preparadas = None
         if hasattr(self, '_mezcla_realizada'):
             del self._mezcla_realizada
         if hasattr(self, '_mazo_barajado'):
@@ -391,7 +580,7 @@ class Juego:
         self.boton_jugar.activo = False
         self.boton_reiniciar.activo = False
         # Reiniciar música
-        pygame.mixer.music.load(os.path.join("recursos", "jazz.mp3"))
+        pygame.mixer.music.load(paquete.abrir(os.path.join("recursos", "jazz.mp3")))
         pygame.mixer.music.set_volume(0.3)
         pygame.mixer.music.play(-1)
         self.mostrar_mascota = True  # Mostrar mascota al reiniciar
@@ -453,10 +642,7 @@ class Juego:
         Devuelve el índice de la pila destino para la carta dada.
         """
         # Usar el nombre del archivo para determinar el valor
-        valor = carta.obtener_valor()
-        if valor == 13:  # K
-            return 12  # índice 12 corresponde a posición 13 (centro)
-        return valor - 1  # índice 0-11 corresponde a posiciones 1-12
+        return siguiente_pila(carta.obtener_valor())
 
     def terminar_juego(self, victoria):
         """
@@ -464,8 +650,9 @@ class Juego:
         """
         self.detener_todos_sonidos()
         self.jugando = False
-        mensaje = "¡Ganaste!" if victoria else "Perdiste"
-        print(mensaje)
+        registro.evento('fin', self.semilla, victoria, len(self.cartas_volteadas), getattr(self, 'total_cartas', 0))
+        transmision.evento('fin', victoria, len(self.cartas_volteadas), getattr(self, 'total_cartas', 0))
+        metricas.partida_terminada('automatico' if self.modo_automatico else 'manual', victoria)
         
         # Mostrar imagen de respuesta
         self.mostrando_respuesta = True
@@ -478,6 +665,17 @@ class Juego:
         self.boton_reiniciar.activo = True
         
         pygame.mixer.music.stop()
+
+    def transmitir_mesa(self):
+        """
+        Envía a los espectadores una foto completa de la mesa, para cuando
+        cambia sin pasar por reparto y jugadas (al restaurar una instantánea).
+        """
+        pilas = [[carta.id_carta | transmision.VOLTEADA if carta in self.cartas_volteadas else carta.id_carta
+                  for carta in self.cartas_por_posicion[pos]] for pos in posiciones]
+        resultado = self.respuesta_img is self.img_si if self.mostrando_respuesta else None
+        transmision.evento('foto', self.semilla, self.estado, getattr(self, '_auto_fase', None),
+                           resultado, pilas, self.pregunta)
         
     def obtener_pila_clickeada(self, pos_mouse):
         """
@@ -493,27 +691,127 @@ class Juego:
         
     def cargar_imagen(self, ruta, size=None):
         """
-        Carga una imagen desde disco y la escala si se indica.
+        Carga una imagen desde disco, la escala si se indica y la convierte
+        al formato de blit más rápido según su canal alfa.
+        """
+        return self._convertir_imagen(ruta, size, decodificar(ruta, size))
+
+    def cargar_imagenes(self, peticiones):
+        """
+        Carga una lista de (ruta, size) como cargar_imagen, pero decodifica y
+        escala en los hilos del cargador; solo la conversión al formato de
+        pantalla ocurre en este hilo. Devuelve las imágenes en el mismo orden.
         """
-        imagen = pygame.image.load(ruta).convert_alpha()
-        if size:
-            imagen = pygame.transform.scale(imagen, size)
+        peticiones = list(peticiones)
+        resultado = [None] * len(peticiones)
+        # Las imágenes del paquete ya están escaladas: solo falta convertirlas
+        pendientes = []
+        for i, (ruta, size) in enumerate(peticiones):
+            imagen = self.paquete.imagen(ruta, size) if self.paquete else None
+            if imagen is None:
+                pendientes.append(i)
+                continue
+            resultado[i] = self._convertir_imagen(ruta, size, imagen)
+            if self.progreso_carga:
+                self.progreso_carga(i + 1 - len(pendientes), len(peticiones), ruta)
+        if pendientes:
+            hechas = len(peticiones) - len(pendientes)
+            progreso = None
+            if self.progreso_carga:
+                progreso = lambda n, _, ruta: self.progreso_carga(hechas + n, len(peticiones), ruta)
+            decodificadas = self.cargador.cargar([peticiones[i] for i in pendientes],
+                                                 convertir=self._convertir_imagen, progreso=progreso)
+            for i, imagen in zip(pendientes, decodificadas):
+                resultado[i] = imagen
+        return resultado
+
+    def _convertir_imagen(self, ruta, size, imagen):
+        imagen, formato = optimizar_superficie(imagen.convert_alpha())
+        self.imagenes_cargadas[ruta] = (size, formato)
         return imagen
+
+    def _en_paquete(self, ruta):
+        return self.paquete is not None and ruta not in self.rutas_recargadas and self.paquete.contiene(ruta)
+
+    def _decodificar_imagen(self, ruta, size):
+        imagen = self.paquete.imagen(ruta, size) if self._en_paquete(ruta) else None
+        return imagen if imagen is not None else decodificar(ruta, size)
+
+    def _enviar_imagen(self, ruta, size):
+        # Las del paquete ya están escaladas: no hay nada que adelantar
+        if self._en_paquete(ruta):
+            return None
+        return self.cargador.enviar(ruta, size)
+
+    def rutas_imagenes(self):
+        """
+        Ruta -> tamaño de todas las imágenes del juego, también de las caras
+        que aún no se han cargado.
+        """
+        rutas = {ruta: datos[0] for ruta, datos in self.imagenes_cargadas.items()}
+        rutas.update(self.caras.rutas.values())
+        return rutas
+
+    def precargar_caras(self):
+        """
+        Adelanta en segundo plano las caras de las próximas PRECARGA_CARAS
+        jugadas y las de las cartas ya volteadas (al restaurar una partida).
+        """
+        siguientes = self.trayectoria[self.paso_trayectoria:self.paso_trayectoria + PRECARGA_CARAS]
+        self.caras.precargar(carta.nombre_archivo for carta, _, _, _ in siguientes)
+        self.caras.precargar(carta.nombre_archivo for carta in self.cartas_volteadas
+                             if carta.nombre_archivo not in self.caras)
         
     def cargar_cartas(self):
         """
-        Carga todas las cartas desde la carpeta 'img' y las devuelve como objetos Carta.
+        Crea las cartas de la carpeta 'img' y las devuelve como objetos Carta,
+        ordenadas por id. Las caras no se leen aquí: se cargan al verlas y
+        duran entre partidas.
         """
         mazo = []
-        for carta in os.listdir("img"):
-            if carta.endswith(".png"):
-                ruta_carta = os.path.join("img", carta)
-                imagen_frontal = self.cargar_imagen(ruta_carta, (CARD_WIDTH, CARD_HEIGHT))
+        for carta in self.caras.rutas:
+            # Las barajas extra comparten la cara
+            for _ in range(self.num_mazos):
                 # Crear una copia del reverso para cada carta
                 imagen_reverso = self.reverso_base.copy()
-                mazo.append(Carta(imagen_frontal, imagen_reverso, carta))
-        return mazo
+                mazo.append(Carta(self.caras, imagen_reverso, carta))
+        # Identificador estable de cada carta: su posición por nombre de archivo
+        self.cartas_por_id = sorted(mazo, key=lambda c: c.nombre_archivo)
+        for id_carta, carta in enumerate(self.cartas_por_id):
+            carta.id_carta = id_carta
+        # El mazo sin barajar va siempre por id, no en el orden de os.listdir o del
+        # paquete: así una semilla da el mismo reparto en cualquier máquina y
+        # el mismo que preparar_reparto
+        return list(self.cartas_por_id)
         
+    def reemplazar_imagen(self, ruta, imagen):
+        """
+        Cambia en caliente la imagen cargada de ruta por imagen (ya escalada,
+        sin convertir), en todas las cartas o atributos que la usan. Desde
+        entonces esa ruta se lee del disco aunque esté en el paquete.
+        """
+        self.rutas_recargadas.add(ruta)
+        if os.path.dirname(ruta) == "img":
+            self.caras.reemplazar(os.path.basename(ruta), imagen)
+            return
+        imagen = self._convertir_imagen(ruta, self.imagenes_cargadas[ruta][0], imagen)
+        atributo = self.atributos_imagen[ruta]
+        anterior = getattr(self, atributo)
+        setattr(self, atributo, imagen)
+        if atributo == 'reverso_base':
+            for carta in self.cartas_por_id:
+                carta.imagen_reverso = imagen.copy()
+        if self.respuesta_img is anterior:
+            self.respuesta_img = imagen
+
+    def superficies_cartas(self):
+        """
+        Reverso y caras de todas las cartas, para el atlas del motor de texturas.
+        Carga las caras que falten.
+        """
+        caras = self.caras.todas()
+        return [self.reverso_base] + [caras[carta.nombre_archivo] for carta in self.cartas_por_id]
+
     def mezclar_hojeo(self):
         """
         Realiza la animación y lógica de mezcla del mazo (mezcla tipo riffle).
@@ -521,11 +819,29 @@ class Juego:
         if self.animando_mezcla or not self.boton_mezclar.activo:
             return
 
+        preparado = None
+        if self.reparto_preparado is not None:
+            # Cola de preguntas: el mazo ya viene barajado y la partida resuelta
+            semilla, futuro = self.reparto_preparado
+            self.reparto_preparado = None
+            orden, caidas_ids, jugadas, victoria = preparado = futuro.result()
+            if semilla != self.semilla:
+                self.sembrar(semilla)
+            self.mazo = [self.cartas_por_id[id_carta] for id_carta in orden]
+            self._mazo_barajado = True
+            self._jugadas_preparadas = (jugadas, victoria)
+            if self.cola_preguntas:
+                self.preparar_siguiente_reparto()  # La siguiente se baraja mientras se juega esta
+        elif self.mezcla_fisica:
+            # Mezcla física: los riffles previos se aplican al instante y el último se anima
+            for _ in range(RIFFLES_MEZCLA_FISICA - 1):
+                self.mazo = [carta for carta, _ in paquetes_gsr(self.mazo, self.rng)]
         # Mezcla real del mazo antes de la animación (solo una vez)
         # Solo barajar si no hay cartas_mezcladas de una mezcla previa
-        if not hasattr(self, '_mazo_barajado') or not self._mazo_barajado:
-            random.shuffle(self.mazo)
+        elif not hasattr(self, '_mazo_barajado') or not self._mazo_barajado:
+            self.rng.shuffle(self.mazo)
             self._mazo_barajado = True
+        registro.evento('mezcla_inicio', self.semilla, self.mezcla_fisica, len(self.mazo))
 
         self.animando_mezcla = True
         self.cartas_mezcladas = []
@@ -536,36 +852,24 @@ class Juego:
         self.boton_repartir.activo = False
         mazo_temp = self.mazo.copy()
 
-        # Dividir el mazo en dos mitades
-        mitad = len(mazo_temp) // 2
-        mazo_izquierdo = mazo_temp[:mitad]
-        mazo_derecho = mazo_temp[mitad:]
+        if preparado is not None:
+            caidas = [(self.cartas_por_id[id_carta], lado) for id_carta, lado in caidas_ids]
+        elif self.mezcla_fisica:
+            caidas = paquetes_gsr(mazo_temp, self.rng)
+        else:
+            # Dividir el mazo en dos mitades e intercalar paquetes de 1 a 3 cartas
+            mitad = len(mazo_temp) // 2
+            caidas = paquetes_riffle(mazo_temp[:mitad], mazo_temp[mitad:], self.rng)
 
         # Crear grupos de cartas para la mezcla
-        self.grupos_mezcla = []
-        while mazo_izquierdo or mazo_derecho:
-            if mazo_izquierdo:
-                cant = random.randint(1, min(3, len(mazo_izquierdo)))
-                cartas = mazo_izquierdo[:cant]
-                del mazo_izquierdo[:cant]
-                for carta in cartas:
-                    self.grupos_mezcla.append({
-                        'carta': carta,
-                        'lado': 'izquierda',
-                        'pos_actual': self.pos_inicial_izq,
-                        'progreso': 0
-                    })
-            if mazo_derecho:
-                cant = random.randint(1, min(3, len(mazo_derecho)))
-                cartas = mazo_derecho[:cant]
-                del mazo_derecho[:cant]
-                for carta in cartas:
-                    self.grupos_mezcla.append({
-                        'carta': carta,
-                        'lado': 'derecha',
-                        'pos_actual': self.pos_inicial_der,
-                        'progreso': 0
-                    })
+        self.grupos_mezcla = deque()
+        for carta, lado in caidas:
+            self.grupos_mezcla.append({
+                'carta': carta,
+                'lado': lado,
+                'pos_actual': self.pos_inicial_izq if lado == 'izquierda' else self.pos_inicial_der,
+                'progreso': 0
+            })
     
     def detener_todos_sonidos(self):
         """
@@ -619,7 +923,7 @@ class Juego:
             # Mover cartas una por una
             # Aquí se usa 100ms por carta para la animación de mezcla (ajustable)
             if self.carta_actual is None and self.grupos_mezcla:
-                self.carta_actual = self.grupos_mezcla.pop(0)
+                self.carta_actual = self.grupos_mezcla.popleft()
                 self.carta_actual['progreso'] = 0
 
             if self.carta_actual:
@@ -644,6 +948,7 @@ class Juego:
             self.mazo = self.cartas_mezcladas.copy()
             self.detener_todos_sonidos()
             self.boton_repartir.activo = True
+            registro.evento('mezcla_fin', self.semilla)
 
 
     def repartir(self):
@@ -665,17 +970,39 @@ class Juego:
 
         # Usar el mazo ya barajado (NO volver a barajar ni cambiar el orden)
         self.cartas_por_repartir = self.mazo.copy()
-        self.cartas_a_repartir = []
-
-        for _ in range(4):
-            for pos_index in range(13):
-                if self.cartas_por_repartir:
-                    carta = self.cartas_por_repartir.pop(0)
-                    self.cartas_a_repartir.append({
-                        'carta': carta,
-                        'pos_destino': posiciones[pos_index],
-                        'progreso': 0
-                    })
+        self.cartas_a_repartir = deque()  # Colas: con mazos grandes pop(0) de una lista es cuadrático
+
+        # La carta i va a la pila i % 13, ronda tras ronda
+        for i, carta in enumerate(self.cartas_por_repartir):
+            self.cartas_a_repartir.append({
+                'carta': carta,
+                'pos_destino': posiciones[i % len(posiciones)],
+                'progreso': 0
+            })
+        self.cartas_por_repartir = []
+        self.total_cartas = len(self.cartas_a_repartir)
+
+        # El reparto determina toda la partida: calcular ya todas las jugadas
+        orden_reparto = [paso['carta'] for paso in self.cartas_a_repartir]
+        if self._jugadas_preparadas is not None:
+            # Ya resuelta en segundo plano (cola de preguntas)
+            jugadas, self.victoria_prevista = self._jugadas_preparadas
+            self._jugadas_preparadas = None
+        else:
+            jugadas, self.victoria_prevista = calcular_trayectoria([c.obtener_valor() for c in orden_reparto])
+        # La carta de la ronda r ocupa siempre el índice r de su pila: las de
+        # debajo no se mueven y las volteadas se apilan encima
+        self.trayectoria = [(orden_reparto[i], origen, destino, i // len(posiciones))
+                            for i, origen, destino in jugadas]
+        self.paso_trayectoria = 0
+        self.precargar_caras()
+        self.pila_actual = 12  # Empezamos en la pila central
+        codigo = None  # Índice de permutación del reparto, para deduplicar y reproducir
+        if self.total_cartas == repartos.NUM_CARTAS:
+            codigo = repartos.a_bytes([repartos.id_canonico(c.nombre_archivo) for c in orden_reparto]).hex()
+        registro.evento('reparto_inicio', self.semilla, self.total_cartas, self.victoria_prevista, codigo)
+        transmision.evento('reparto', self.semilla, [carta.id_carta for carta in orden_reparto])
+        metricas.partida_iniciada('automatico' if self.modo_automatico else 'manual')
 
         # Activar input de pregunta al terminar el reparto (por si el estado previo lo dejó desactivado)
         self.mostrando_input = False  # Se activará al terminar el reparto
@@ -691,7 +1018,7 @@ class Juego:
         self.tiempo_reparto += dt
         
         if self.carta_actual_reparto is None and self.cartas_a_repartir:
-            self.carta_actual_reparto = self.cartas_a_repartir.pop(0)
+            self.carta_actual_reparto = self.cartas_a_repartir.popleft()
             self.carta_actual_reparto['progreso'] = 0
             # Remover la carta del mazo cuando comienza a moverse
             if len(self.mazo) > 0:
@@ -719,6 +1046,7 @@ class Juego:
         
         if not self.carta_actual_reparto and not self.cartas_a_repartir:
             self.animando_reparto = False
+            registro.evento('reparto_fin', self.semilla)
             if self.estado != Juego.ESTADO_AUTO:
                 self.mostrando_input = True
                 self.mostrar_mascota = False
@@ -735,10 +1063,68 @@ class Juego:
                 return carta
         return None
         
+    # Acciones de los botones
+
+    def accion_modo_automatico(self):
+        self.modo_automatico = True
+        self.estado = Juego.ESTADO_AUTO
+        self.reiniciar_juego()
+        registro.evento('modo', self.semilla, 'automatico')
+        self.boton_jugar.activo = False
+        self.boton_repartir.activo = True
+        # Mostrar input de pregunta y esperar ENTER
+        self.mostrando_input = True
+        self.pregunta = ""
+        self._auto_fase = 'pregunta'
+        self._auto_last_action_time = self.obtener_ticks()
+
+    def accion_modo_manual(self):
+        self.modo_automatico = False
+        self.estado = Juego.ESTADO_JUEGO
+        self.reiniciar_juego()
+        registro.evento('modo', self.semilla, 'manual')
+        self.boton_jugar.activo = False
+        self.boton_repartir.activo = True
+
+    def accion_instrucciones(self):
+        self.estado = Juego.ESTADO_INSTRUCCIONES
+
+    def accion_mezclar(self):
+        if self.audio_disponible:
+            self.sonido_click.play()
+        self.mezclar_hojeo()
+
+    def accion_repartir(self):
+        if self.audio_disponible:
+            self.sonido_click.play()
+        self.repartir()
+
+    def accion_jugar(self):
+        if self.audio_disponible:
+            self.sonido_click.play()
+        self.detener_todos_sonidos()  # Asegurarse de que no haya sonidos activos
+        self.iniciar_juego()
+
+    def accion_reiniciar(self):
+        if self.audio_disponible:
+            self.sonido_click.play()
+        self.reiniciar_juego()
+        # Siempre volver al menú principal y limpiar variables automáticas
+        self.estado = Juego.ESTADO_INICIO
+        self.modo_automatico = False
+        # Limpiar todas las variables automáticas posibles
+        for attr in ['_auto_fase', '_auto_jugada_timer', '_reparto_pendiente', '_pregunta_mostrada', '_mezcla_realizada', '_mazo_barajado', '_auto_anim_carta']:
+            if hasattr(self, attr):
+                delattr(self, attr)
+
     def manejar_evento(self, event):
         """
         Maneja todos los eventos de teclado y ratón del juego.
         """
+        # Hover y suelta del ratón en todos los botones, estén o no a la vista
+        for contenedor in (self.botones_inicio, self.botones_mesa, self.botones_resultado):
+            contenedor.seguir_puntero(event)
+
         # Manejar entrada de texto primero, sin importar el estado
         if self.mostrando_input:
             KEYDOWN = getattr(pygame, 'KEYDOWN', 768)
@@ -747,13 +1133,16 @@ class Juego:
             if event.type == KEYDOWN:
                 # Solo aceptar caracteres imprimibles y teclas relevantes
                 if event.key == K_RETURN and self.pregunta:
-                    print(f"Pregunta realizada: {self.pregunta}")
+                    registro.evento('pregunta', self.semilla, self.pregunta)
+                    transmision.evento('pregunta', self.pregunta)
                     self.mostrando_input = False
                     self.boton_jugar.activo = True
                     self.mostrar_mascota = True
                     # En modo automático, avanzar a la fase de mezclar tras la pregunta
                     if self.estado == Juego.ESTADO_AUTO:
                         self._auto_fase = 'mezclar'
+                        if COLA_PREGUNTAS:
+                            self.preparar_siguiente_reparto(self.semilla)
                 elif event.key == K_BACKSPACE:
                     self.pregunta = self.pregunta[:-1]
                 elif hasattr(event, 'unicode') and event.unicode and event.unicode.isprintable():
@@ -761,27 +1150,7 @@ class Juego:
                 return
         # --- PANTALLA DE INICIO ---
         if self.estado == Juego.ESTADO_INICIO:
-            MOUSEBUTTONDOWN = getattr(pygame, 'MOUSEBUTTONDOWN', 1025)
-            if event.type == MOUSEBUTTONDOWN and event.button == 1:
-                if self.boton_auto.rect.collidepoint(event.pos):
-                    self.modo_automatico = True
-                    self.estado = Juego.ESTADO_AUTO
-                    self.reiniciar_juego()
-                    self.boton_jugar.activo = False
-                    self.boton_repartir.activo = True
-                    # Mostrar input de pregunta y esperar ENTER
-                    self.mostrando_input = True
-                    self.pregunta = ""
-                    self._auto_fase = 'pregunta'
-                    self._auto_last_action_time = pygame.time.get_ticks()
-                elif self.boton_manual.rect.collidepoint(event.pos):
-                    self.modo_automatico = False
-                    self.estado = Juego.ESTADO_JUEGO
-                    self.reiniciar_juego()
-                    self.boton_jugar.activo = False
-                    self.boton_repartir.activo = True
-                elif self.boton_instrucciones.rect.collidepoint(event.pos):
-                    self.estado = Juego.ESTADO_INSTRUCCIONES
+            self.botones_inicio.pulsar(event)
             return
         # --- INSTRUCCIONES ---
         if self.estado == Juego.ESTADO_INSTRUCCIONES:
@@ -808,7 +1177,8 @@ class Juego:
                 K_BACKSPACE = getattr(pygame, 'K_BACKSPACE', 8)
                 if event.type == KEYDOWN:
                     if event.key == K_RETURN and self.pregunta:
-                        print(f"Pregunta realizada: {self.pregunta}")
+                        registro.evento('pregunta', self.semilla, self.pregunta)
+                        transmision.evento('pregunta', self.pregunta)
                         self.mostrando_input = False
                         self.boton_jugar.activo = True
                         self.mostrar_mascota = True
@@ -820,6 +1190,17 @@ class Juego:
                     elif hasattr(event, 'unicode') and event.unicode and event.unicode.isprintable():
                         self.pregunta += event.unicode
                 return
+            # Cola de preguntas: durante la partida se escriben las siguientes
+            if COLA_PREGUNTAS and event.type == KEYDOWN:
+                K_RETURN = getattr(pygame, 'K_RETURN', 13)
+                K_BACKSPACE = getattr(pygame, 'K_BACKSPACE', 8)
+                if event.key == K_RETURN and self.pregunta_en_espera:
+                    self.encolar_pregunta(self.pregunta_en_espera)
+                    self.pregunta_en_espera = ""
+                elif event.key == K_BACKSPACE:
+                    self.pregunta_en_espera = self.pregunta_en_espera[:-1]
+                elif hasattr(event, 'unicode') and event.unicode and event.unicode.isprintable():
+                    self.pregunta_en_espera += event.unicode
             # No procesar eventos de mouse en modo automático
             return
         if self.estado == Juego.ESTADO_JUEGO:
@@ -834,48 +1215,19 @@ class Juego:
         MOUSEBUTTONDOWN = getattr(pygame, 'MOUSEBUTTONDOWN', 1025)
         MOUSEBUTTONUP = getattr(pygame, 'MOUSEBUTTONUP', 1026)
         MOUSEMOTION = getattr(pygame, 'MOUSEMOTION', 1024)
+        # Permitir reiniciar desde la pantalla de resultado
+        if self.mostrando_respuesta and self.botones_resultado.pulsar(event):
+            return
+        # Los botones de la mesa solo responden cuando no estamos jugando
+        if not self.jugando and self.botones_mesa.pulsar(event):
+            return
         if event.type == MOUSEBUTTONDOWN and event.button == 1:  # Click izquierdo
-            mouse_pos = event.pos
-            # Permitir reiniciar desde la pantalla de resultado
-            if self.mostrando_respuesta and self.boton_reiniciar.rect.collidepoint(mouse_pos) and self.boton_reiniciar.activo:
-                if self.audio_disponible:
-                    self.sonido_click.play()
-                self.reiniciar_juego()
-                # Siempre volver al menú principal y limpiar variables automáticas
-                self.estado = Juego.ESTADO_INICIO
-                self.modo_automatico = False
-                # Limpiar todas las variables automáticas posibles
-                for attr in ['_auto_fase', '_auto_jugada_timer', '_reparto_pendiente', '_pregunta_mostrada', '_mezcla_realizada', '_mazo_barajado', '_auto_anim_carta']:
-                    if hasattr(self, attr):
-                        delattr(self, attr)
-                return
-            if not self.jugando:
-                # Manejar clicks en botones cuando no estamos jugando
-                if self.boton_mezclar.rect.collidepoint(mouse_pos) and self.boton_mezclar.activo:
-                    if self.audio_disponible:
-                        self.sonido_click.play()
-                    self.mezclar_hojeo()
-                elif self.boton_repartir.rect.collidepoint(mouse_pos) and self.boton_repartir.activo:
-                    if self.audio_disponible:
-                        self.sonido_click.play()
-                    self.repartir()
-                elif self.boton_jugar.rect.collidepoint(mouse_pos) and self.boton_jugar.activo:
-                    if self.audio_disponible:
-                        self.sonido_click.play()
-                    self.detener_todos_sonidos()  # Asegurarse de que no haya sonidos activos
-                    self.iniciar_juego()
-                elif self.boton_reiniciar.rect.collidepoint(mouse_pos) and self.boton_reiniciar.activo:
-                    if self.audio_disponible:
-                        self.sonido_click.play()
-                    self.reiniciar_juego()
-                    self.estado = Juego.ESTADO_INICIO
-            else:
+            if self.jugando:
                 # Intentar agarrar una carta de la pila actual
                 if not self.arrastrando:  # Solo si no estamos arrastrando ya
                     pila_clickeada = self.obtener_pila_clickeada(event.pos)
                     if pila_clickeada == self.pila_actual:
-                        pila = self.cartas_por_posicion[posiciones[self.pila_actual]]
-                        carta = self.obtener_ultima_carta_no_volteada(pila)
+                        carta = self.siguiente_jugada()[0]
                         if carta:
                             self.reproducir_sonido(self.sonido_tomar)
                             self.arrastrando = True
@@ -887,27 +1239,11 @@ class Juego:
         elif event.type == MOUSEBUTTONUP and event.button == 1:  # Soltar click izquierdo
             if self.arrastrando:
                 pila_destino = self.obtener_pila_clickeada(event.pos)
-                siguiente_pos = self.obtener_siguiente_posicion(self.carta_arrastrada)
+                siguiente_pos = self.siguiente_jugada()[2]
                 
                 if pila_destino is not None and pila_destino == siguiente_pos:
                     self.reproducir_sonido(self.sonido_soltar)
-                    
-                    pila_origen = self.cartas_por_posicion[posiciones[self.pos_origen_index]]
-                    if self.carta_arrastrada in pila_origen:
-                        pila_origen.remove(self.carta_arrastrada)
-                    
-                    pila_destino_cartas = self.cartas_por_posicion[posiciones[siguiente_pos]]
-                    pila_destino_cartas.append(self.carta_arrastrada)
-                    self.cartas_volteadas.add(self.carta_arrastrada)
-                    self.pila_actual = siguiente_pos
-                    
-                    # Verificar victoria/derrota
-                    if len(self.cartas_volteadas) == self.total_cartas:
-                        self.terminar_juego(True)
-                    else:
-                        nueva_pila = self.cartas_por_posicion[posiciones[self.pila_actual]]
-                        if not self.obtener_ultima_carta_no_volteada(nueva_pila):
-                            self.terminar_juego(False)
+                    self.aplicar_jugada()
                 else:
                     if self.audio_disponible:
                         self.reproducir_sonido(self.sonido_error)
@@ -928,32 +1264,29 @@ class Juego:
         """
         # --- PANTALLA DE INICIO ---
         if self.estado == Juego.ESTADO_INICIO:
-            screen.fill((20, 60, 20))
+            surface.fill((20, 60, 20))
             # Logo/mascota
             if hasattr(self, 'img_mascota'):
-                screen.blit(self.img_mascota, (WIDTH//2 - 75, 80))
+                surface.blit(self.img_mascota, (WIDTH//2 - 75, 80))
             # Título
             titulo = self.font_titulo.render("JUEGO CARTAS", True, (255, 215, 0))
-            screen.blit(titulo, (WIDTH//2 - titulo.get_width()//2, 250))
+            surface.blit(titulo, (WIDTH//2 - titulo.get_width()//2, 250))
             # Texto de instrucción para usabilidad
-            font_instr = pygame.font.Font(os.path.join("recursos", "JandaEverydayCasual.ttf"), 28) if os.path.exists(os.path.join("recursos", "JandaEverydayCasual.ttf")) else pygame.font.Font(None, 28)
-            texto_instr = font_instr.render("Seleccione el modo de juego:", True, (255,255,255))
-            screen.blit(texto_instr, (WIDTH//2 - texto_instr.get_width()//2, 320))
+            texto_instr = self.font_btn.render("Seleccione el modo de juego:", True, (255,255,255))
+            surface.blit(texto_instr, (WIDTH//2 - texto_instr.get_width()//2, 320))
             # Botones
-            self.boton_auto.draw(screen)
-            self.boton_manual.draw(screen)
-            self.boton_instrucciones.draw(screen)
+            self.botones_inicio.draw(surface)
             return
         # --- INSTRUCCIONES ---
         if self.estado == Juego.ESTADO_INSTRUCCIONES:
-            screen.fill((30, 30, 60))
+            surface.fill((30, 30, 60))
             y = 120
             for linea in self.texto_instrucciones:
                 txt = self.font_btn.render(linea, True, (255,255,255))
-                screen.blit(txt, (WIDTH//2 - txt.get_width()//2, y))
+                surface.blit(txt, (WIDTH//2 - txt.get_width()//2, y))
                 y += 50
             txt_esc = self.font_btn.render("Pulsa ESC para volver", True, (255,255,0))
-            screen.blit(txt_esc, (WIDTH//2 - txt_esc.get_width()//2, y+30))
+            surface.blit(txt_esc, (WIDTH//2 - txt_esc.get_width()//2, y+30))
             return
         # --- MODO AUTOMÁTICO ---
         if self.estado == Juego.ESTADO_AUTO:
@@ -963,6 +1296,8 @@ class Juego:
             self.draw_juego(surface)
             txt = self.font_btn.render("Modo Automático (ESC para menú)", True, (255,255,255))
             surface.blit(txt, (20, 20))
+            if COLA_PREGUNTAS and not self.mostrando_input:
+                self.draw_cola(surface)
             return
         # --- MODO MANUAL ---
         if self.estado == Juego.ESTADO_JUEGO:
@@ -1027,24 +1362,25 @@ class Juego:
                 if carta == self.carta_arrastrada:
                     continue  # No dibujar la carta que se está arrastrando
                 if carta in self.cartas_volteadas:
-                    screen.blit(carta.imagen_frontal, 
+                    surface.blit(carta.imagen_frontal, 
                             (pos[0] + i * self.CARD_OFFSET_H, 
                             pos[1]))
                 else:
-                    screen.blit(carta.imagen_reverso, 
+                    surface.blit(carta.imagen_reverso, 
                             (pos[0] + i * self.CARD_OFFSET_H, 
                             pos[1]))
 
         # Si estamos jugando, resaltar la pila actual y la pila destino válida
         if self.jugando:
             pos_actual = posiciones[self.pila_actual]
-            pygame.draw.rect(surface, (255, 255, 0), 
+            texturas.rectangulo(surface, (255, 255, 0), 
                            (pos_actual[0], pos_actual[1], CARD_WIDTH, CARD_HEIGHT), 2)
             if self.arrastrando:
-                siguiente_pos = self.obtener_siguiente_posicion(self.carta_arrastrada)
+                siguiente_pos = self.siguiente_jugada()[2]
                 pos_destino = posiciones[siguiente_pos]
-                pygame.draw.rect(surface, (0, 255, 0), 
+                texturas.rectangulo(surface, (0, 255, 0), 
                                (pos_destino[0], pos_destino[1], CARD_WIDTH, CARD_HEIGHT), 2)
+            self.draw_progreso(surface)
 
         if self.arrastrando and self.carta_arrastrada:
             surface.blit(self.carta_arrastrada.imagen_frontal, 
@@ -1056,9 +1392,7 @@ class Juego:
             pos_y = HEIGHT//2 - self.respuesta_img.get_height()//2
             surface.blit(self.respuesta_img, (pos_x, pos_y))
 
-        self.boton_mezclar.draw(surface)
-        self.boton_repartir.draw(surface)
-        self.boton_jugar.draw(surface)
+        self.botones_mesa.draw(surface)
 
         if self.mostrando_respuesta and self.respuesta_img:
             pos_x = WIDTH//2 - self.respuesta_img.get_width()//2
@@ -1066,7 +1400,7 @@ class Juego:
             surface.blit(self.respuesta_img, (pos_x, pos_y))
             self.boton_reiniciar.rect.centerx = WIDTH//2
             self.boton_reiniciar.rect.top = pos_y + self.respuesta_img.get_height() + 20
-            self.boton_reiniciar.draw(surface)
+            self.botones_resultado.draw(surface)
 
         if self.mostrando_input:
             # Centrar la imagen de pregunta
@@ -1079,7 +1413,7 @@ class Juego:
             marco_alto = 40
             marco_x = pos_x + (self.img_pregunta.get_width() - marco_ancho)//2
             marco_y = pos_y + self.img_pregunta.get_height()//2 + 10
-            pygame.draw.rect(surface, (255, 255, 255), (
+            texturas.rectangulo(surface, (255, 255, 255), (
                 marco_x,
                 marco_y,
                 marco_ancho,
@@ -1087,7 +1421,7 @@ class Juego:
             ), 2, border_radius=12)
 
             # Renderizar el texto centrado vertical y horizontalmente
-            font_input = pygame.font.Font(os.path.join("recursos", "JandaEverydayCasual.ttf"), 22) if os.path.exists(os.path.join("recursos", "JandaEverydayCasual.ttf")) else pygame.font.Font(None, 22)
+            font_input = fuente(RUTA_FUENTE, 22)
             texto_mostrado = self.pregunta[:60]
             text_surface = font_input.render(texto_mostrado, True, (0, 0, 0))
             text_rect = text_surface.get_rect()
@@ -1105,14 +1439,28 @@ class Juego:
             surface.blit(text_surface, text_rect)
 
             # Cursor parpadeante al final del texto
-            if pygame.time.get_ticks() % 1000 < 500:
+            if self.obtener_ticks() % 1000 < 500:
                 cursor_x = text_rect.x + text_rect.width + 2
                 cursor_y = text_rect.y
                 cursor_h = text_rect.height
                 if cursor_x < marco_x + marco_ancho - 8:
-                    pygame.draw.line(surface, (0, 0, 0),
+                    texturas.linea(surface, (0, 0, 0),
                                    (cursor_x, cursor_y),
                                    (cursor_x, cursor_y + cursor_h), 2)
+    def draw_cola(self, surface):
+        """
+        Dibuja abajo a la izquierda las preguntas en cola y la que se está escribiendo.
+        """
+        font_cola = fuente(RUTA_FUENTE, 22)
+        if self.pregunta_en_espera:
+            texto = f"Siguiente pregunta: {self.pregunta_en_espera[-40:]}"
+        else:
+            texto = "Escribe otra pregunta y pulsa ENTER para ponerla en cola"
+        if self.cola_preguntas:
+            texto = f"En cola: {len(self.cola_preguntas)}   {texto}"
+        txt = font_cola.render(texto, True, (255, 255, 255))
+        surface.blit(txt, (20, HEIGHT - 20 - txt.get_height()))
+
     def jugada_automatica(self):
         """
         Realiza una jugada automática (modo automático): mueve la carta a la pila destino.
@@ -1120,92 +1468,299 @@ class Juego:
         # 100% automático: mueve la carta de la pila actual a la pila destino sin interacción de mouse
         if not self.jugando:
             return
-        pila = self.cartas_por_posicion[posiciones[self.pila_actual]]
-        carta = self.obtener_ultima_carta_no_volteada(pila)
-        if carta:
-            siguiente_pos = self.obtener_siguiente_posicion(carta)
-            pila_origen = self.cartas_por_posicion[posiciones[self.pila_actual]]
-            pila_destino = self.cartas_por_posicion[posiciones[siguiente_pos]]
-            if carta in pila_origen:
-                pila_origen.remove(carta)
-            pila_destino.append(carta)
-            self.cartas_volteadas.add(carta)
-            self.pila_actual = siguiente_pos
-            # Verificar victoria/derrota
-            if len(self.cartas_volteadas) == self.total_cartas:
-                self.terminar_juego(True)
-            else:
-                nueva_pila = self.cartas_por_posicion[posiciones[self.pila_actual]]
-                if not self.obtener_ultima_carta_no_volteada(nueva_pila):
-                    self.terminar_juego(False)
+        self.aplicar_jugada()
+
+    def draw_progreso(self, surface):
+        """
+        Dibuja las cartas que faltan por voltear y una barra con las ya volteadas.
+        Cuenta cartas boca abajo, no jugadas pendientes: eso revelaría antes
+        de tiempo si la partida acaba en victoria.
+        """
+        restantes = self.total_cartas - len(self.cartas_volteadas)
+        # El texto solo cambia tras cada jugada: se renderiza una vez por paso
+        if self._progreso_cache[0] != restantes:
+            self._progreso_cache = (restantes, self.font.render(f"Cartas por voltear: {restantes}", True, (255, 255, 255)))
+        texto = self._progreso_cache[1]
+        x = WIDTH // 2 - texto.get_width() // 2
+        surface.blit(texto, (x, 10))
+        barra = pygame.Rect(WIDTH // 2 - 100, 14 + texto.get_height(), 200, 8)
+        texturas.rectangulo(surface, (60, 60, 60), barra)
+        if self.total_cartas:
+            avance = barra.width * len(self.cartas_volteadas) // self.total_cartas
+            texturas.rectangulo(surface, (255, 255, 0), (barra.x, barra.y, avance, barra.height))
+
+    def siguiente_jugada(self):
+        """
+        Devuelve la siguiente jugada precalculada (carta, pila_origen, pila_destino,
+        indice_en_origen), o una tupla de None si la partida ya no tiene más jugadas.
+        """
+        if self.paso_trayectoria >= len(self.trayectoria):
+            return None, None, None, None
+        return self.trayectoria[self.paso_trayectoria]
+
+    def aplicar_jugada(self):
+        """
+        Mueve la siguiente carta de la trayectoria a su pila destino y termina
+        la partida cuando se agotan las jugadas.
+        """
+        carta, origen, destino, indice = self.siguiente_jugada()
+        if carta is None:
+            return
+        # Por índice: remove() recorre la pila y con mazos grandes crece cuadráticamente
+        pila_origen = self.cartas_por_posicion[posiciones[origen]]
+        if indice < len(pila_origen) and pila_origen[indice] is carta:
+            pila_origen.pop(indice)
+        elif carta in pila_origen:
+            pila_origen.remove(carta)
+        self.cartas_por_posicion[posiciones[destino]].append(carta)
+        self.cartas_volteadas.add(carta)
+        self.pila_actual = destino
+        self.paso_trayectoria += 1
+        self.precargar_caras()
+        registro.evento('jugada', self.semilla, self.paso_trayectoria, carta.nombre_archivo, origen, destino)
+        transmision.evento('jugada', carta.id_carta, origen, destino)
+        # Victoria si se voltearon todas las cartas; si no, la pila destino quedó vacía
+        if self.paso_trayectoria == len(self.trayectoria):
+            self.terminar_juego(self.victoria_prevista)
+
+    def actualizar_automatico(self, current_time):
+        """
+        Avanza las fases del modo automático (mezclar, repartir, esperar el
+        reparto y jugar) según el instante current_time en milisegundos.
+        """
+        if self.estado != Juego.ESTADO_AUTO:
+            return
+        # Fase: mezclar
+        if getattr(self, '_auto_fase', None) == 'mezclar':
+            # Solo iniciar la mezcla si no está animando
+            if not self.animando_mezcla:
+                if not hasattr(self, '_mezcla_realizada') or not self._mezcla_realizada:
+                    self.mezclar_hojeo()
+                    self._mezcla_realizada = True
+                else:
+                    # Si la animación ya terminó y la mezcla ya se hizo, pasar a repartir
+                    self._auto_fase = 'repartir'
+                    self._auto_last_action_time = current_time
+        # Fase: repartir
+        elif getattr(self, '_auto_fase', None) == 'repartir':
+            # Solo iniciar el reparto si la mezcla terminó y el botón repartir está activo
+            if not self.animando_reparto and self.boton_repartir.activo:
+                self.repartir()
+                self._auto_fase = 'esperando_reparto'
+                self._auto_last_action_time = current_time
+        # Nueva fase: esperar a que termine el reparto antes de jugar
+        elif getattr(self, '_auto_fase', None) == 'esperando_reparto':
+            if not self.animando_reparto:
+                self.jugando = True
+                self._auto_fase = 'jugar'
+                self._auto_last_action_time = current_time
+        # Fase: pregunta (esperar input del usuario)
+        elif getattr(self, '_auto_fase', None) == 'pregunta':
+            # Esperar a que el usuario escriba la pregunta y presione ENTER
+            pass
+        # Fase: jugar (jugadas automáticas)
+        elif getattr(self, '_auto_fase', None) == 'jugar' and self.jugando:
+            if current_time - self._auto_last_action_time > self._auto_action_interval:
+                self.jugada_automatica()
+                self._auto_last_action_time = current_time
+        # Partida terminada con preguntas en cola: tras ver el resultado, la siguiente
+        elif getattr(self, '_auto_fase', None) == 'jugar' and self.mostrando_respuesta and self.cola_preguntas:
+            if current_time - self._auto_last_action_time > PAUSA_RESULTADO:
+                self.siguiente_partida()
+
+    def ms_hasta_siguiente_cambio(self, current_time):
+        """
+        Milisegundos hasta que la pantalla vuelva a cambiar sin que llegue
+        ningún evento: 0 si algo se está animando, el tiempo hasta la próxima
+        jugada automática o el próximo parpadeo del cursor, o None si la
+        pantalla está quieta hasta que el usuario haga algo.
+        """
+        if self.animando_mezcla or self.animando_reparto or self.arrastrando:
+            return 0
+        espera = None
+        if self.estado == Juego.ESTADO_AUTO:
+            fase = getattr(self, '_auto_fase', None)
+            if fase in ('mezclar', 'repartir', 'esperando_reparto'):
+                return 0
+            if fase == 'jugar' and self.jugando:
+                # actualizar_automatico juega cuando se supera el intervalo
+                espera = max(0, self._auto_last_action_time + self._auto_action_interval + 1 - current_time)
+            elif fase == 'jugar' and self.mostrando_respuesta and self.cola_preguntas:
+                espera = max(0, self._auto_last_action_time + PAUSA_RESULTADO + 1 - current_time)
+        if self.mostrando_input:
+            # El cursor cambia cada 500 ms
+            parpadeo = 500 - current_time % 500
+            espera = parpadeo if espera is None else min(espera, parpadeo)
+        return espera
+
+def crear_pantalla_texturas(juego, acelerado=True):
+    """
+    Crea la ventana del motor de texturas y sube el atlas de las cartas. La
+    ventana de set_mode queda oculta: solo da el formato para convert().
+    """
+    pygame.display.set_mode((WIDTH, HEIGHT), pygame.HIDDEN)
+    pantalla = texturas.PantallaTexturas((WIDTH, HEIGHT), "Juego de Cartas", acelerado)
+    pantalla.registrar_atlas(juego.superficies_cartas())
+    return pantalla
+
 
 ###########################################################
 # FUNCIÓN PRINCIPAL: Bucle de juego y automatización       #
 ###########################################################
 def main():
 
+    registro.iniciar(RUTA_REGISTRO)  # Antes del juego, para registrar si falta el audio
+    t0 = time.perf_counter()
     juego = Juego()  # Instancia principal del juego
+    metricas.recursos_cargados(time.perf_counter() - t0, juego.audio_disponible)
+    try:
+        metricas.servir(PUERTO_METRICAS)
+    except OSError as error:  # Puerto ocupado: el juego sigue sin métricas
+        registro.evento('metricas_no_disponibles', juego.semilla, str(error))
+    metricas.escribir_periodicamente(RUTA_METRICAS, INTERVALO_METRICAS)
+    try:
+        transmision.iniciar(PUERTO_TRANSMISION, [carta.nombre_archivo for carta in juego.cartas_por_id],
+                            HOST_TRANSMISION)
+    except OSError as error:  # Puerto ocupado: el juego sigue sin espectadores
+        registro.evento('transmision_no_disponible', juego.semilla, str(error))
+    perfilador.configurar(os.path.dirname(RUTA_REGISTRO or ""), FOTOGRAMAS_PERFIL, SEGUNDOS_PERFIL)
+    senal_perfil = bool(SENAL_PERFIL) and perfilador.instalar_senal(SENAL_PERFIL)
+    tecla_perfil = getattr(pygame, TECLA_PERFIL, None) if TECLA_PERFIL else None
+
+    pantalla, presentar = screen, pygame.display.flip
+    if MOTOR_DIBUJO == "texturas":
+        if texturas.disponible():
+            pantalla = crear_pantalla_texturas(juego, acelerado=not RENDERER_SOFTWARE)
+            presentar = pantalla.flip
+        else:
+            registro.evento('texturas_no_disponibles', juego.semilla)
+    if TRAZA_LATENCIA:
+        latencia.activar()
+    vigilante = recarga.Vigilante(juego.rutas_imagenes(), juego.cargador) if RECARGA_IMAGENES else None
     running = True
     clock = pygame.time.Clock()
     QUIT = getattr(pygame, 'QUIT', 256)
+    WINDOWCLOSE = getattr(pygame, 'WINDOWCLOSE', QUIT)
+    NOEVENT = getattr(pygame, 'NOEVENT', 0)
+    KEYDOWN = getattr(pygame, 'KEYDOWN', 768)
+
+    # Retomar la partida guardada, si la hay
+    ultima_instantanea = None
+    if RUTA_INSTANTANEA and instantanea.cargar_archivo(juego, RUTA_INSTANTANEA):
+        juego.transmitir_mesa()  # Sin esto los espectadores ven la mesa vacía hasta el próximo reparto
+    ultimo_guardado = juego.obtener_ticks()
 
-    # Variables de automatización como atributos del juego
-    juego._auto_last_action_time = 0
-    juego._auto_action_interval = 2500  # milisegundos (2.5 segundos)
+    # Tiempo dormido esperando eventos y en el límite de FPS, para el informe de espera
+    inicio = time.perf_counter()
+    espera_eventos = espera_fps = 0.0
+    ultimo_sondeo = inicio  # Última lectura de la cola de eventos, para la latencia
 
     # Bucle principal del juego
     while running:
-        dt = clock.tick(100)  # Controla los FPS
-        current_time = pygame.time.get_ticks()
-        for event in pygame.event.get():
-            if event.type == QUIT:
+        inicio_vuelta = time.perf_counter()
+        estado_vuelta = juego.estado
+        eventos = []
+        espera = juego.ms_hasta_siguiente_cambio(juego.obtener_ticks())
+        if espera != 0:
+            # Nada se anima: dormir hasta el próximo evento o temporizador
+            if RUTA_INSTANTANEA:
+                espera = INTERVALO_INSTANTANEA if espera is None else min(espera, INTERVALO_INSTANTANEA)
+            if PUERTO_METRICAS or RUTA_METRICAS or senal_perfil:
+                # Que el tiempo por pantalla no se quede atrás y la señal se atienda
+                espera = 1000 if espera is None else min(espera, 1000)
+            if vigilante:  # Revisar las imágenes aunque no pase nada
+                restante = vigilante.ms_hasta_revision()
+                espera = restante if espera is None else min(espera, restante)
+            if perfilador.pendiente or perfilador.captura:  # La captura termina a su hora
+                restante = perfilador.ms_restantes()
+                espera = restante if espera is None else min(espera, restante)
+            t0 = time.perf_counter()
+            evento = pygame.event.wait() if espera is None else pygame.event.wait(espera)
+            ultimo_sondeo = time.perf_counter()  # Última vez que se miró la cola
+            espera_eventos += ultimo_sondeo - t0
+            if evento.type != NOEVENT:
+                eventos.append(evento)
+            clock.tick()  # El tiempo dormido no debe avanzar las animaciones
+            dt = 0
+        else:
+            t0 = time.perf_counter()
+            dt = clock.tick(100)  # Controla los FPS
+            espera_fps += time.perf_counter() - t0
+        inicio_trabajo = time.perf_counter()
+        current_time = juego.obtener_ticks()
+        eventos.extend(pygame.event.get())
+        if latencia.activa:
+            latencia.recibidos(eventos, ultimo_sondeo)
+            ultimo_sondeo = time.perf_counter()
+        for event in eventos:
+            if event.type in (QUIT, WINDOWCLOSE):
                 running = False
+            elif event.type == KEYDOWN and event.key == tecla_perfil:
+                perfilador.solicitar()
             # Delegar el manejo de eventos a la clase Juego
-            juego.manejar_evento(event)
+            if latencia.activa:
+                latencia.manejar(juego, event)
+            else:
+                juego.manejar_evento(event)
         # Actualizar animaciones
         juego.actualizar_animacion(dt)
         juego.actualizar_reparto(dt)
 
-        # --- Automatización del modo automático ---
-        if getattr(juego, 'estado', None) == Juego.ESTADO_AUTO:
-            # Fase: mezclar
-            if getattr(juego, '_auto_fase', None) == 'mezclar':
-                # Solo iniciar la mezcla si no está animando
-                if not juego.animando_mezcla:
-                    if not hasattr(juego, '_mezcla_realizada') or not juego._mezcla_realizada:
-                        juego.mezclar_hojeo()
-                        juego._mezcla_realizada = True
-                    else:
-                        # Si la animación ya terminó y la mezcla ya se hizo, pasar a repartir
-                        juego._auto_fase = 'repartir'
-                        juego._auto_last_action_time = current_time
-            # Fase: repartir
-            elif getattr(juego, '_auto_fase', None) == 'repartir':
-                # Solo iniciar el reparto si la mezcla terminó y el botón repartir está activo
-                if not juego.animando_reparto and juego.boton_repartir.activo:
-                    juego.repartir()
-                    juego._auto_fase = 'esperando_reparto'
-                    juego._auto_last_action_time = current_time
-            # Nueva fase: esperar a que termine el reparto antes de jugar
-            elif getattr(juego, '_auto_fase', None) == 'esperando_reparto':
-                if not juego.animando_reparto:
-                    juego.jugando = True
-                    juego._auto_fase = 'jugar'
-                    juego._auto_last_action_time = current_time
-            # Fase: pregunta (esperar input del usuario)
-            elif getattr(juego, '_auto_fase', None) == 'pregunta':
-                # Esperar a que el usuario escriba la pregunta y presione ENTER
-                pass
-            # Fase: jugar (jugadas automáticas)
-            elif getattr(juego, '_auto_fase', None) == 'jugar' and juego.jugando:
-                if current_time - juego._auto_last_action_time > juego._auto_action_interval:
-                    juego.jugada_automatica()
-                    juego._auto_last_action_time = current_time
+        # Automatización del modo automático
+        juego.actualizar_automatico(current_time)
+        transmision.fase(juego.estado, getattr(juego, '_auto_fase', None))
+
+        # Guardar el estado solo si cambió desde la última instantánea
+        if RUTA_INSTANTANEA and current_time - ultimo_guardado >= INTERVALO_INSTANTANEA:
+            ultimo_guardado = current_time
+            datos = instantanea.capturar(juego)
+            if datos != ultima_instantanea:
+                instantanea.guardar_archivo(datos, RUTA_INSTANTANEA)
+                ultima_instantanea = datos
+
+        # Convertir las caras adelantadas que ya estén decodificadas
+        juego.caras.recoger()
+
+        # Cambiar las imágenes editadas que ya estén decodificadas
+        if vigilante:
+            vigilante.revisar()
+            for ruta, imagen, error in vigilante.listas():
+                if imagen is None:
+                    registro.evento('imagen_no_recargada', juego.semilla, ruta, error)
+                else:
+                    juego.reemplazar_imagen(ruta, imagen)
+                    registro.evento('imagen_recargada', juego.semilla, ruta)
 
         # Dibuja la pantalla actual
-        juego.draw(screen)
-        pygame.display.flip()
+        if latencia.activa:
+            latencia.dibujando()
+        juego.draw(pantalla)
+        presentar()
+        if latencia.activa:
+            latencia.presentado()
+        t0 = time.perf_counter()
         clock.tick(60)
+        fin_vuelta = time.perf_counter()
+        espera_fps += fin_vuelta - t0
+        metricas.fotograma(t0 - inicio_trabajo, estado_vuelta, fin_vuelta - inicio_vuelta)
+        if perfilador.pendiente or perfilador.captura:
+            try:
+                ruta_perfil = perfilador.fotograma(juego.estado, getattr(juego, '_auto_fase', None))
+            except OSError as error:
+                registro.evento('perfil_no_guardado', juego.semilla, str(error))
+            else:
+                if ruta_perfil:
+                    registro.evento('perfil', juego.semilla, ruta_perfil)
+
+    total = time.perf_counter() - inicio
+    if total > 0:
+        print(f"Tiempo en espera: {(espera_eventos + espera_fps) / total:.1%} "
+              f"(eventos {espera_eventos / total:.1%}, límite de FPS {espera_fps / total:.1%})")
+    if latencia.activa:
+        print(latencia.informe())
+    registro.cerrar()
+    metricas.detener()
+    transmision.detener()
     # Al salir del bucle, cerrar Pygame
     if hasattr(pygame, 'quit'):
         pygame.quit()
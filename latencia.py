@@ -0,0 +1,188 @@
+"""
+Latencia de la entrada en el modo manual: del ratón a la pantalla.
+
+Para cada MOUSEBUTTONDOWN, MOUSEMOTION y MOUSEBUTTONUP que cambia lo que se
+ve al arrastrar (la carta tomada en carta_arrastrada, su posición, la carta
+soltada en una pila o devuelta a la suya) se anotan cuatro tramos hasta el
+display.flip del fotograma que muestra el cambio:
+
+- cola: desde que llegó el evento hasta que empieza manejar_evento.
+- manejo: manejar_evento de ese evento.
+- espera: desde que termina el manejo hasta que empieza el dibujo (los
+  demás eventos, animaciones y modo automático de la vuelta).
+- dibujo: Juego.draw y la presentación en pantalla.
+
+Los eventos de pygame no traen la hora de llegada: se toma la última vez
+que el bucle miró la cola (al despertar de pygame.event.wait o en el
+pygame.event.get anterior). El evento pudo llegar después, así que la cola
+es una cota superior; es justo lo que alargan los dos clock.tick del bucle.
+
+Cada tramo y el total van a un histograma por clase de evento (tomar,
+arrastrar, soltar). Sin activar(), el bucle no llama a nada de esto.
+
+Uso:
+    latencia.activar()
+    latencia.recibidos(eventos, sondeo_anterior)
+    latencia.manejar(juego, evento)        # en lugar de juego.manejar_evento
+    latencia.dibujando(); juego.draw(pantalla); presentar(); latencia.presentado()
+    print(latencia.informe())
+"""
+import bisect
+import time
+
+import pygame
+
+CLASES = ('tomar', 'arrastrar', 'soltar')
+TRAMOS = ('cola', 'manejo', 'espera', 'dibujo', 'total')
+# Límites superiores (milisegundos) de los cubos de los histogramas
+LIMITES = (0.25, 0.5, 1, 2, 3, 4, 6, 8, 12, 16, 24, 33, 50, 66, 100, 133, 200, 500, 1000)
+
+activa = False
+sin_efecto = 0  # Eventos de ratón que no cambiaron nada visible
+# (clase, tramo) -> [cubos..., +Inf], y suma y máximo en milisegundos
+cubos = {(clase, tramo): [0] * (len(LIMITES) + 1) for clase in CLASES for tramo in TRAMOS}
+sumas = dict.fromkeys(cubos, 0.0)
+maximos = dict.fromkeys(cubos, 0.0)
+
+_llegadas = {}    # id(evento) -> instante de llegada estimado
+_pendientes = []  # (clase, llegada, inicio, fin) manejados y aún sin mostrar
+_inicio_dibujo = None
+
+
+def activar():
+    global activa
+    activa = True
+
+
+def _clase(evento, antes, despues):
+    """
+    Qué hizo el evento a lo que se ve del arrastre, o None si nada.
+    """
+    if antes == despues:
+        return None
+    if evento.type == pygame.MOUSEBUTTONDOWN:
+        return 'tomar' if despues[0] is not None else None
+    if evento.type == pygame.MOUSEMOTION:
+        return 'arrastrar'
+    if evento.type == pygame.MOUSEBUTTONUP:
+        return 'soltar'
+    return None
+
+
+def _estado(juego):
+    # Lo que dibuja el arrastre: la carta en la mano, dónde y cuántas jugadas van
+    return (juego.carta_arrastrada if juego.arrastrando else None,
+            juego.pos_arrastre if juego.arrastrando else None,
+            juego.paso_trayectoria)
+
+
+def recibidos(eventos, sondeo_anterior):
+    """
+    Anota como llegada de los eventos de ratón de la vuelta la última vez
+    que se miró la cola antes de recogerlos.
+    """
+    for evento in eventos:
+        if evento.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP):
+            _llegadas[id(evento)] = sondeo_anterior
+
+
+def manejar(juego, evento):
+    """
+    juego.manejar_evento(evento), anotando la cola y el manejo si el evento
+    cambia lo que se ve del arrastre.
+    """
+    global sin_efecto
+    llegada = _llegadas.pop(id(evento), None)
+    if llegada is None:
+        juego.manejar_evento(evento)
+        return
+    antes = _estado(juego)
+    inicio = time.perf_counter()
+    juego.manejar_evento(evento)
+    fin = time.perf_counter()
+    clase = _clase(evento, antes, _estado(juego))
+    if clase is None:
+        sin_efecto += 1
+    else:
+        _pendientes.append((clase, llegada, inicio, fin))
+
+
+def dibujando():
+    global _inicio_dibujo
+    _inicio_dibujo = time.perf_counter()
+
+
+def presentado():
+    """
+    Se llama tras display.flip: cierra los eventos manejados antes de este
+    fotograma, que es el primero que muestra su efecto.
+    """
+    if not _pendientes:
+        return
+    fin_dibujo = time.perf_counter()
+    for clase, llegada, inicio, fin in _pendientes:
+        for tramo, segundos in (('cola', inicio - llegada), ('manejo', fin - inicio),
+                                ('espera', _inicio_dibujo - fin), ('dibujo', fin_dibujo - _inicio_dibujo),
+                                ('total', fin_dibujo - llegada)):
+            _anotar(clase, tramo, max(0.0, segundos) * 1000)
+    _pendientes.clear()
+
+
+def _anotar(clase, tramo, ms):
+    clave = clase, tramo
+    cubos[clave][bisect.bisect_left(LIMITES, ms)] += 1
+    sumas[clave] += ms
+    maximos[clave] = max(maximos[clave], ms)
+
+
+def cuantil(clase, tramo, q):
+    """
+    Límite superior (ms) del cubo donde cae el cuantil q, sin pasar del
+    máximo visto, o None sin muestras.
+    """
+    conteos = cubos[clase, tramo]
+    total = sum(conteos)
+    if not total:
+        return None
+    objetivo = q * total
+    acumulado = 0
+    for limite, n in zip(LIMITES, conteos):
+        acumulado += n
+        if acumulado >= objetivo:
+            return min(limite, maximos[clase, tramo])
+    return maximos[clase, tramo]
+
+
+def informe():
+    """
+    Tabla con muestras, media y percentiles 50, 90 y 99 de cada tramo.
+    """
+    lineas = [f"Latencia de entrada (ms; cola es cota superior); {sin_efecto} eventos sin efecto visible",
+              f"{'evento':<10}{'tramo':<8}{'n':>7}{'media':>8}{'p50':>7}{'p90':>7}{'p99':>7}{'máx':>8}"]
+    for clase in CLASES:
+        n = sum(cubos[clase, 'total'])
+        if not n:
+            continue
+        for tramo in TRAMOS:
+            p50, p90, p99 = (cuantil(clase, tramo, q) for q in (0.5, 0.9, 0.99))
+            lineas.append(f"{clase:<10}{tramo:<8}{n:>7}{sumas[clase, tramo] / n:>8.2f}"
+                          f"{p50:>7.2f}{p90:>7.2f}{p99:>7.2f}{maximos[clase, tramo]:>8.2f}")
+    return "\n".join(lineas)
+
+
+def texto():
+    """
+    Los histogramas en formato de Prometheus, para metricas.texto().
+    """
+    lineas = ["# HELP juego_latencia_entrada_segundos Del evento de ratón al fotograma que lo muestra, por tramo.",
+              "# TYPE juego_latencia_entrada_segundos histogram"]
+    for (clase, tramo), conteos in cubos.items():
+        etiquetas = f'evento="{clase}",tramo="{tramo}"'
+        acumulado = 0
+        for limite, n in zip(LIMITES + ('+Inf',), conteos):
+            acumulado += n
+            le = limite if limite == '+Inf' else limite / 1000
+            lineas.append(f'juego_latencia_entrada_segundos_bucket{{{etiquetas},le="{le}"}} {acumulado}')
+        lineas.append(f'juego_latencia_entrada_segundos_sum{{{etiquetas}}} {sumas[clase, tramo] / 1000}')
+        lineas.append(f'juego_latencia_entrada_segundos_count{{{etiquetas}}} {acumulado}')
+    return "\n".join(lineas) + "\n"
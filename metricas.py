@@ -0,0 +1,196 @@
+"""
+Métricas del juego en formato de texto de Prometheus, para vigilar quioscos.
+
+El bucle principal y terminar_juego solo suman a contadores en memoria;
+un hilo de fondo los sirve en http://127.0.0.1:<puerto>/metrics o los
+escribe cada cierto tiempo en un archivo (para el "textfile collector" de
+node_exporter), así una consulta nunca toca el bucle de dibujo.
+
+Uso:
+    metricas.servir(9108)                          # y/o:
+    metricas.escribir_periodicamente("juego.prom", 15)
+    metricas.partida_iniciada('manual')
+    metricas.fotograma(0.004, Juego.ESTADO_JUEGO, 0.016)
+    metricas.detener()
+"""
+import bisect
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import latencia
+
+MODOS = ('automatico', 'manual')
+RESULTADOS = ('victoria', 'derrota')
+# Nombres de los estados de la pantalla, en el orden de Juego.ESTADO_*
+ESTADOS = ('inicio', 'instrucciones', 'juego', 'automatico')
+# Límites superiores (segundos) de los cubos del histograma de fotogramas
+LIMITES_FOTOGRAMA = (0.002, 0.004, 0.008, 0.016, 0.033, 0.066, 0.133, 0.5)
+
+# Todas las claves existen desde el principio: el hilo que sirve las
+# métricas puede leerlas mientras el juego suma sin que cambien de tamaño
+partidas_iniciadas = dict.fromkeys(MODOS, 0)
+partidas_terminadas = {(modo, resultado): 0 for modo in MODOS for resultado in RESULTADOS}
+segundos_por_estado = [0.0] * len(ESTADOS)
+cubos_fotograma = [0] * (len(LIMITES_FOTOGRAMA) + 1)  # El último es +Inf
+suma_fotograma = 0.0
+carga_recursos = None    # Segundos que tardó en crearse el Juego
+audio_disponible = None
+
+_servidor = None
+_hilo_servidor = None   # serve_forever del servidor HTTP
+_hilo_escritor = None   # Escritura periódica del archivo; independiente del servidor
+_parar = threading.Event()
+
+
+def partida_iniciada(modo):
+    partidas_iniciadas[modo] += 1
+
+
+def partida_terminada(modo, victoria):
+    partidas_terminadas[modo, 'victoria' if victoria else 'derrota'] += 1
+
+
+def recursos_cargados(segundos, hay_audio):
+    global carga_recursos, audio_disponible
+    carga_recursos = segundos
+    audio_disponible = hay_audio
+
+
+def fotograma(trabajo, estado, transcurrido):
+    """
+    Anota un fotograma: trabajo es lo que tardó en actualizarse y dibujarse
+    (sin las esperas) y transcurrido el tiempo total que pasó en estado.
+    """
+    global suma_fotograma
+    cubos_fotograma[bisect.bisect_left(LIMITES_FOTOGRAMA, trabajo)] += 1
+    suma_fotograma += trabajo
+    segundos_por_estado[estado] += transcurrido
+
+
+def texto():
+    """
+    Devuelve todas las métricas en el formato de exposición de Prometheus.
+    """
+    lineas = []
+
+    def metrica(nombre, tipo, ayuda, muestras):
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+        for etiquetas, valor in muestras:
+            lineas.append(f"{nombre}{etiquetas} {valor}")
+
+    iniciadas = dict(partidas_iniciadas)
+    terminadas = dict(partidas_terminadas)
+    metrica("juego_partidas_iniciadas_total", "counter", "Partidas repartidas por modo.",
+            [(f'{{modo="{modo}"}}', iniciadas[modo]) for modo in MODOS])
+    metrica("juego_partidas_terminadas_total", "counter", "Partidas terminadas por modo y resultado.",
+            [(f'{{modo="{modo}",resultado="{resultado}"}}', n) for (modo, resultado), n in terminadas.items()])
+    tasas = []
+    for modo in MODOS:
+        total = terminadas[modo, 'victoria'] + terminadas[modo, 'derrota']
+        if total:
+            tasas.append((f'{{modo="{modo}"}}', terminadas[modo, 'victoria'] / total))
+    metrica("juego_tasa_victorias", "gauge", "Fracción de partidas terminadas que se ganaron.", tasas)
+
+    cubos = list(cubos_fotograma)
+    acumulado = 0
+    muestras = []
+    for limite, n in zip(LIMITES_FOTOGRAMA + ('+Inf',), cubos):
+        acumulado += n
+        muestras.append((f'_bucket{{le="{limite}"}}', acumulado))
+    muestras += [('_sum', suma_fotograma), ('_count', acumulado)]
+    metrica("juego_fotograma_segundos", "histogram", "Tiempo de actualizar y dibujar cada fotograma.", muestras)
+
+    metrica("juego_estado_segundos_total", "counter", "Tiempo pasado en cada pantalla.",
+            [(f'{{estado="{nombre}"}}', segundos) for nombre, segundos in zip(ESTADOS, segundos_por_estado)])
+    if carga_recursos is not None:
+        metrica("juego_carga_recursos_segundos", "gauge", "Tiempo de carga de imágenes, fuentes y sonidos.",
+                [('', carga_recursos)])
+    if audio_disponible is not None:
+        metrica("juego_audio_disponible", "gauge", "1 si se pudo inicializar el audio.",
+                [('', int(audio_disponible))])
+    if latencia.activa:
+        lineas.append(latencia.texto().rstrip("\n"))
+    return "\n".join(lineas) + "\n"
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        cuerpo = texto().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass  # Sin una línea en la consola por cada consulta
+
+
+def servir(puerto, host="127.0.0.1"):
+    """
+    Sirve las métricas por HTTP en un hilo de fondo. Sin puerto no hace nada.
+    """
+    global _servidor, _hilo_servidor
+    if not puerto or _hilo_servidor is not None:
+        return
+    _servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    _servidor.daemon_threads = True
+    _hilo_servidor = threading.Thread(target=_servidor.serve_forever, name="metricas", daemon=True)
+    _hilo_servidor.start()
+
+
+def escribir_archivo(ruta):
+    """
+    Escribe las métricas en ruta de golpe (archivo temporal y os.replace),
+    para que quien lo lea nunca vea un archivo a medias.
+    """
+    temporal = ruta + ".tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write(texto())
+    os.replace(temporal, ruta)
+
+
+def escribir_periodicamente(ruta, intervalo):
+    """
+    Escribe las métricas en ruta cada intervalo segundos desde un hilo de fondo.
+    """
+    global _hilo_escritor
+    if not ruta or _hilo_escritor is not None:
+        return
+    _parar.clear()
+
+    def ejecutar():
+        while True:
+            try:
+                escribir_archivo(ruta)
+            except OSError:
+                pass  # Se reintenta en la siguiente vuelta
+            if _parar.is_set():
+                break
+            _parar.wait(intervalo)
+
+    _hilo_escritor = threading.Thread(target=ejecutar, name="metricas-archivo", daemon=True)
+    _hilo_escritor.start()
+
+
+def detener():
+    """
+    Para el servidor y el hilo de escritura (que deja escrito el último valor).
+    """
+    global _servidor, _hilo_servidor, _hilo_escritor
+    if _servidor is not None:
+        _servidor.shutdown()
+        _servidor.server_close()
+        _servidor = None
+    if _hilo_servidor is not None:
+        _hilo_servidor.join()
+        _hilo_servidor = None
+    _parar.set()
+    if _hilo_escritor is not None:
+        _hilo_escritor.join()
+        _hilo_escritor = None
@@ -0,0 +1,202 @@
+"""
+Paquete único de recursos con índice, leído con mmap.
+
+"python paquete.py" hornea en un solo archivo todo lo que el juego carga de
+img/ y recursos/: las imágenes ya escaladas a su tamaño final como píxeles
+RGBA en bruto, la fuente, los sonidos y un índice JSON con la posición de
+cada recurso. Al arrancar, el juego mapea el archivo en memoria y crea las
+superficies con pygame.image.frombuffer directamente sobre el mapa, sin
+decodificar PNG ni copiar píxeles (la única copia es la conversión al
+formato de pantalla). En lugar de abrir unos 65 archivos se abre uno.
+
+Formato: cabecera (mágico, versión, longitud del índice), índice JSON y
+los datos de cada recurso alineados a ALINEACION bytes.
+
+Uso:
+    python paquete.py [recursos.pak]
+"""
+import argparse
+import io
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+import registro
+
+MAGICO = b'JCPK'
+VERSION = 1
+ALINEACION = 64
+FORMATO_PIXELES = 'RGBA'
+EXTENSIONES_ARCHIVO = ('.ttf', '.otf', '.mp3', '.ogg', '.wav')
+_CABECERA = struct.Struct('<4sII')  # mágico, versión, longitud del índice
+
+_activo = None  # Paquete del que salen los recursos, si hay uno
+
+
+def _clave(ruta):
+    """
+    Nombre de un recurso en el índice: la ruta relativa con '/'.
+    """
+    return os.path.normpath(ruta).replace(os.sep, '/')
+
+
+class PaqueteRecursos:
+    def __init__(self, ruta):
+        with open(ruta, 'rb') as f:
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._vista = memoryview(self._mapa)
+        try:
+            magico, version, largo = _CABECERA.unpack_from(self._vista, 0)
+        except struct.error:
+            raise ValueError(f"{ruta}: paquete demasiado corto")
+        if magico != MAGICO or version != VERSION:
+            raise ValueError(f"{ruta}: no es un paquete de recursos válido o es de otra versión")
+        self.indice = json.loads(bytes(self._vista[_CABECERA.size:_CABECERA.size + largo]))
+        # Un paquete truncado pasa las comprobaciones de arriba: sin esto fallaría
+        # al crear la primera superficie, en vez de volver a los archivos sueltos
+        for clave, entrada in self.indice.items():
+            if entrada['offset'] + entrada['tamano'] > len(self._mapa):
+                raise ValueError(f"{ruta}: paquete truncado, falta {clave}")
+            if entrada['tipo'] == 'imagen':
+                ancho, alto = entrada['size']
+                if entrada['tamano'] != ancho * alto * len(entrada['formato']):
+                    raise ValueError(f"{ruta}: {clave} no tiene el tamaño de su imagen")
+
+    def _datos(self, entrada):
+        return self._vista[entrada['offset']:entrada['offset'] + entrada['tamano']]
+
+    def contiene(self, ruta):
+        return _clave(ruta) in self.indice
+
+    def listar(self, carpeta):
+        """
+        Nombres de los recursos guardados directamente en la carpeta indicada.
+        """
+        prefijo = _clave(carpeta) + '/'
+        return [clave[len(prefijo):] for clave in self.indice
+                if clave.startswith(prefijo) and '/' not in clave[len(prefijo):]]
+
+    def imagen(self, ruta, size=None):
+        """
+        Devuelve una superficie que usa directamente los píxeles del paquete,
+        o None si la imagen no está o se guardó con otro tamaño.
+        """
+        entrada = self.indice.get(_clave(ruta))
+        if entrada is None or entrada['tipo'] != 'imagen':
+            return None
+        if size and tuple(size) != tuple(entrada['size']):
+            return None
+        return pygame.image.frombuffer(self._datos(entrada), tuple(entrada['size']), entrada['formato'])
+
+    def archivo(self, ruta):
+        """
+        Devuelve el contenido de un archivo guardado (fuente, sonido) como
+        un objeto de archivo que aceptan pygame.font.Font y pygame.mixer.
+        """
+        return io.BytesIO(self._datos(self.indice[_clave(ruta)]))
+
+
+def activar(paquete):
+    global _activo
+    _activo = paquete
+
+
+def cargar(ruta):
+    """
+    Abre el paquete de la ruta y lo activa. Devuelve None, sin activar
+    nada, si no existe o no es válido; entonces los recursos se leen de disco.
+    """
+    if not ruta or not os.path.exists(ruta):
+        return None
+    try:
+        paquete = PaqueteRecursos(ruta)
+    except (OSError, ValueError) as error:
+        registro.evento('paquete_no_disponible', None, ruta, str(error))  # Aún no hay partida ni semilla
+        return None
+    activar(paquete)
+    return paquete
+
+
+def abrir(ruta):
+    """
+    Devuelve el recurso como archivo del paquete activo si está en él, o la
+    ruta en disco si no. Ambos valen para pygame.font.Font y pygame.mixer.
+    """
+    if _activo is not None and _activo.contiene(ruta):
+        return _activo.archivo(ruta)
+    return ruta
+
+
+def existe(ruta):
+    return (_activo is not None and _activo.contiene(ruta)) or os.path.exists(ruta)
+
+
+def empaquetar(salida, imagenes, archivos):
+    """
+    Escribe el paquete. imagenes es una lista de (ruta, superficie ya
+    escalada) y archivos una lista de rutas que se copian tal cual.
+    """
+    datos = []
+    for ruta, superficie in imagenes:
+        datos.append((ruta, {'tipo': 'imagen', 'size': list(superficie.get_size()), 'formato': FORMATO_PIXELES},
+                      pygame.image.tobytes(superficie, FORMATO_PIXELES)))
+    for ruta in archivos:
+        with open(ruta, 'rb') as f:
+            datos.append((ruta, {'tipo': 'archivo'}, f.read()))
+
+    # El índice guarda posiciones absolutas, que dependen de su propia longitud:
+    # se calcula con posiciones provisionales y se repite hasta que no cambia
+    largo_indice = 0
+    while True:
+        posicion = _alinear(_CABECERA.size + largo_indice)
+        indice = {}
+        for ruta, entrada, contenido in datos:
+            indice[_clave(ruta)] = dict(entrada, offset=posicion, tamano=len(contenido))
+            posicion = _alinear(posicion + len(contenido))
+        texto = json.dumps(indice, separators=(',', ':')).encode('utf-8')
+        if len(texto) == largo_indice:
+            break
+        largo_indice = len(texto)
+
+    with open(salida, 'wb') as f:
+        f.write(_CABECERA.pack(MAGICO, VERSION, len(texto)))
+        f.write(texto)
+        for ruta, _, contenido in datos:
+            f.write(b'\0' * (indice[_clave(ruta)]['offset'] - f.tell()))
+            f.write(contenido)
+    return indice
+
+
+def _alinear(posicion):
+    return (posicion + ALINEACION - 1) // ALINEACION * ALINEACION
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crea el paquete de recursos del juego")
+    parser.add_argument("salida", nargs="?", default="recursos.pak", help="Archivo del paquete (por defecto recursos.pak)")
+    args = parser.parse_args()
+
+    salida = os.path.abspath(args.salida)
+    # Sin ventana ni sonido real; las rutas de recursos son relativas al juego
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    import juegoBaraja
+    from cargador import decodificar
+
+    # Un juego cargado desde disco dice qué imágenes usa y a qué tamaño
+    juegoBaraja.RUTA_PAQUETE = None
+    juego = juegoBaraja.Juego()
+    imagenes = [(ruta, decodificar(ruta, size)) for ruta, size in sorted(juego.rutas_imagenes().items())]
+    archivos = sorted(os.path.join("recursos", nombre) for nombre in os.listdir("recursos")
+                      if nombre.lower().endswith(EXTENSIONES_ARCHIVO))
+    indice = empaquetar(salida, imagenes, archivos)
+    print(f"{len(indice)} recursos ({len(imagenes)} imágenes, {len(archivos)} archivos) en {salida}: "
+          f"{os.path.getsize(salida) / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
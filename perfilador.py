@@ -0,0 +1,147 @@
+"""
+Captura de perfiles bajo demanda, para ver por qué se traba un quiosco.
+
+Una tecla (TECLA_PERFIL en juegoBaraja.py) o una señal POSIX (SIGUSR1 por
+defecto, "kill -USR1 <pid>") piden una captura: el bucle principal activa
+cProfile durante los FOTOGRAMAS siguientes o SEGUNDOS, lo que llegue antes,
+y luego escribe junto al registro un archivo .pstats y un informe de texto
+con las funciones más caras. Ambos llevan en el nombre y en la cabecera la
+pantalla (estado) y la fase del modo automático en que se capturó.
+
+Mientras no hay captura, el único coste es comprobar un atributo por
+fotograma: cProfile no está activo y la señal solo cambia una bandera.
+
+Uso:
+    perfilador.configurar(carpeta="registros")
+    perfilador.instalar_senal()
+    perfilador.solicitar()                         # desde la tecla
+    if perfilador.pendiente or perfilador.captura:
+        perfilador.fotograma(juego.estado, juego._auto_fase)
+"""
+import cProfile
+import io
+import os
+import pstats
+import signal
+import time
+from collections import Counter
+
+from metricas import ESTADOS
+
+FOTOGRAMAS = 300   # Fotogramas que dura una captura...
+SEGUNDOS = 10.0    # ...o segundos, lo que llegue antes
+TOP = 30           # Funciones en el informe de texto
+ORDEN = 'tottime'  # Criterio del informe ('tottime' o 'cumulative')
+
+pendiente = False  # Alguien pidió una captura que aún no empezó
+captura = None     # Captura en curso, o None
+
+_carpeta = "."
+_fotogramas = FOTOGRAMAS
+_segundos = SEGUNDOS
+
+
+def configurar(carpeta=None, fotogramas=FOTOGRAMAS, segundos=SEGUNDOS):
+    """
+    Carpeta donde se guardan las capturas (por defecto la actual) y cuánto dura cada una.
+    """
+    global _carpeta, _fotogramas, _segundos
+    _carpeta = carpeta or "."
+    _fotogramas = fotogramas
+    _segundos = segundos
+
+
+def solicitar(*_):
+    """
+    Pide una captura. Sirve como manejador de señal: solo cambia una bandera,
+    la captura empieza al final del fotograma en curso.
+    """
+    global pendiente
+    if captura is None:
+        pendiente = True
+
+
+def instalar_senal(nombre='SIGUSR1'):
+    """
+    Hace que la señal indicada pida una captura. Devuelve False si el sistema
+    no la tiene (Windows) o si no se llama desde el hilo principal.
+    """
+    numero = getattr(signal, nombre, None)
+    if numero is None:
+        return False
+    try:
+        signal.signal(numero, solicitar)
+    except ValueError:
+        return False
+    return True
+
+
+def fotograma(estado, fase):
+    """
+    Se llama al final de cada fotograma mientras haya una captura pedida o
+    en curso. Empieza la captura pedida o cuenta el fotograma y, si ya
+    duró bastante, la termina y devuelve la ruta del archivo .pstats.
+    """
+    global pendiente, captura
+    if captura is None:
+        pendiente = False
+        captura = _Captura(estado, fase)
+        return None
+    captura.anotar(estado, fase)
+    if captura.fotogramas >= _fotogramas or time.perf_counter() - captura.inicio >= _segundos:
+        terminada, captura = captura, None
+        return terminada.guardar(_carpeta)
+    return None
+
+
+def ms_restantes():
+    """
+    Milisegundos que le quedan a la captura en curso, para que el bucle no
+    se duerma esperando eventos más allá de su final (nunca 0, que para
+    pygame.event.wait es esperar sin límite). None si no hay captura.
+    """
+    if captura is None:
+        return 1 if pendiente else None
+    return max(1, int((_segundos - (time.perf_counter() - captura.inicio)) * 1000))
+
+
+def _etiqueta(estado, fase):
+    nombre = ESTADOS[estado] if 0 <= estado < len(ESTADOS) else str(estado)
+    return f"{nombre}-{fase}" if fase else nombre
+
+
+class _Captura:
+    def __init__(self, estado, fase):
+        self.etiqueta = _etiqueta(estado, fase)
+        self.fotogramas = 0
+        self.por_etiqueta = Counter()  # Fotogramas en cada pantalla y fase
+        self.instante = time.time()
+        self.inicio = time.perf_counter()
+        self.perfil = cProfile.Profile()
+        self.perfil.enable()
+
+    def anotar(self, estado, fase):
+        self.fotogramas += 1
+        self.por_etiqueta[_etiqueta(estado, fase)] += 1
+
+    def guardar(self, carpeta):
+        """
+        Detiene cProfile y escribe el .pstats y el informe .txt.
+        """
+        self.perfil.disable()
+        duracion = time.perf_counter() - self.inicio
+        base = os.path.join(carpeta, "perfil-{}-{}".format(
+            time.strftime("%Y%m%d-%H%M%S", time.localtime(self.instante)), self.etiqueta))
+        os.makedirs(carpeta, exist_ok=True)
+        self.perfil.dump_stats(base + ".pstats")
+
+        salida = io.StringIO()
+        salida.write(f"Captura iniciada en {self.etiqueta}: {self.fotogramas} fotogramas en {duracion:.2f} s\n")
+        for etiqueta, n in self.por_etiqueta.most_common():
+            salida.write(f"  {etiqueta}: {n} fotogramas\n")
+        salida.write("\n")
+        estadisticas = pstats.Stats(self.perfil, stream=salida)
+        estadisticas.strip_dirs().sort_stats(ORDEN).print_stats(TOP)
+        with open(base + ".txt", 'w', encoding='utf-8') as f:
+            f.write(salida.getvalue())
+        return base + ".pstats"
@@ -0,0 +1,163 @@
+"""
+Cálculo exacto de la probabilidad de ganar el juego del Reloj.
+
+Se combinan dos métodos independientes y se comparan entre sí:
+
+- Enumeración exhaustiva sobre barajas reducidas (menos rangos o palos),
+  jugando cada orden posible con reglas.simular_partida.
+- Programación dinámica con memoización sobre el conteo de cartas que
+  quedan por voltear. Como el jugador nunca mira una carta boca abajo,
+  cada carta volteada es una extracción uniforme de las cartas restantes,
+  así que el estado (cartas restantes por rango, rango actual) basta.
+  Esto permite resolver la baraja completa de 52 cartas.
+
+Todos los resultados son fracciones exactas (fractions.Fraction).
+
+Uso:
+    python probabilidad_exacta.py [--max-rangos N] [--max-palos M]
+"""
+import argparse
+from fractions import Fraction
+from functools import lru_cache
+from math import factorial
+
+from reglas import NUM_RANGOS, NUM_PALOS, simular_partida
+
+
+# PROGRAMACIÓN DINÁMICA (baraja completa)
+
+def probabilidad_victoria(num_rangos=NUM_RANGOS, num_palos=NUM_PALOS):
+    """
+    Devuelve la probabilidad exacta de ganar con num_rangos pilas de
+    num_palos cartas, como Fraction.
+    """
+    otros = (num_palos,) * (num_rangos - 1)
+    # Al empezar, la pila actual es la central (la del rango K)
+    return _probabilidad(num_palos, None, otros)
+
+
+@lru_cache(maxsize=None)
+def _probabilidad(restantes_k, restantes_actual, otros):
+    """
+    Probabilidad de ganar desde un estado canónico.
+
+    restantes_k: cartas K sin voltear.
+    restantes_actual: cartas restantes del rango de la pila actual, o None
+        si la pila actual es la central.
+    otros: conteos restantes del resto de rangos (no K), ordenados. Los
+        rangos distintos de K son intercambiables, así que solo importa el
+        multiconjunto de conteos (reducción por simetría).
+
+    Al llegar a la pila de un rango r distinto de K quedan en ella tantas
+    cartas boca abajo como cartas de rango r sin voltear, más una. En la
+    pila central quedan tantas como cartas K sin voltear. No hace falta
+    guardar las pilas.
+    """
+    total = restantes_k + (restantes_actual or 0) + sum(otros)
+    if total == 0:
+        return Fraction(1)
+    boca_abajo = restantes_k if restantes_actual is None else restantes_actual + 1
+    if boca_abajo == 0:
+        return Fraction(0)
+
+    resultado = Fraction(0)
+    if restantes_k:
+        siguientes = otros if restantes_actual is None else tuple(sorted(otros + (restantes_actual,)))
+        resultado += Fraction(restantes_k, total) * _probabilidad(restantes_k - 1, None, siguientes)
+    if restantes_actual:
+        resultado += Fraction(restantes_actual, total) * _probabilidad(restantes_k, restantes_actual - 1, otros)
+    # Agrupar los rangos con el mismo conteo: llevan al mismo estado canónico
+    for conteo in sorted(set(otros)):
+        if conteo == 0:
+            continue
+        repeticiones = otros.count(conteo)
+        resto = list(otros)
+        resto.remove(conteo)
+        if restantes_actual is not None:
+            resto.append(restantes_actual)
+        peso = Fraction(conteo * repeticiones, total)
+        resultado += peso * _probabilidad(restantes_k, conteo - 1, tuple(sorted(resto)))
+    return resultado
+
+
+# ENUMERACIÓN EXHAUSTIVA (barajas reducidas)
+
+def enumerar_victorias(num_rangos, num_palos):
+    """
+    Juega todos los órdenes de una baraja reducida y devuelve la
+    probabilidad exacta de ganar como Fraction.
+
+    Solo se enumeran secuencias de rangos (los palos no afectan al
+    resultado) y, entre ellas, las canónicas: los rangos distintos de K
+    aparecen por primera vez en orden creciente. Cada secuencia canónica
+    representa (num_rangos - 1)! secuencias reales.
+    """
+    ganadas = 0
+    canonicas = 0
+    for valores in _secuencias_canonicas(num_rangos, num_palos):
+        canonicas += 1
+        if simular_partida(valores, num_rangos)[0]:
+            ganadas += 1
+    total = factorial(num_rangos * num_palos) // factorial(num_palos) ** num_rangos
+    assert canonicas * factorial(num_rangos - 1) == total
+    return Fraction(ganadas, canonicas)
+
+
+def _secuencias_canonicas(num_rangos, num_palos):
+    """
+    Genera las secuencias de valores canónicas bajo permutación de los
+    rangos distintos de K (el rango num_rangos).
+    """
+    n = num_rangos * num_palos
+    restantes = [num_palos] * (num_rangos + 1)
+    restantes[0] = 0
+    secuencia = []
+
+    def generar(siguiente_nuevo):
+        if len(secuencia) == n:
+            yield list(secuencia)
+            return
+        candidatos = list(range(1, siguiente_nuevo))
+        if siguiente_nuevo < num_rangos:
+            candidatos.append(siguiente_nuevo)
+        candidatos.append(num_rangos)
+        for valor in candidatos:
+            if not restantes[valor]:
+                continue
+            restantes[valor] -= 1
+            secuencia.append(valor)
+            es_nuevo = valor == siguiente_nuevo and valor < num_rangos
+            yield from generar(siguiente_nuevo + 1 if es_nuevo else siguiente_nuevo)
+            secuencia.pop()
+            restantes[valor] += 1
+
+    yield from generar(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probabilidad exacta de victoria del juego del Reloj")
+    parser.add_argument("--max-rangos", type=int, default=4, help="Rangos máximos a enumerar (por defecto 4)")
+    parser.add_argument("--max-palos", type=int, default=3, help="Palos máximos a enumerar (por defecto 3)")
+    args = parser.parse_args()
+
+    print("Enumeración exhaustiva en barajas reducidas:")
+    print(f"{'rangos':>6} {'palos':>5} {'enumeración':>12} {'dinámica':>10} {'1/rangos':>9}")
+    correcto = True
+    for num_rangos in range(2, args.max_rangos + 1):
+        for num_palos in range(1, args.max_palos + 1):
+            enumerada = enumerar_victorias(num_rangos, num_palos)
+            dinamica = probabilidad_victoria(num_rangos, num_palos)
+            cerrada = Fraction(1, num_rangos)
+            correcto &= enumerada == dinamica == cerrada
+            print(f"{num_rangos:>6} {num_palos:>5} {str(enumerada):>12} {str(dinamica):>10} {str(cerrada):>9}")
+
+    completa = probabilidad_victoria(NUM_RANGOS, NUM_PALOS)
+    correcto &= completa == Fraction(1, NUM_RANGOS)
+    print()
+    print(f"Baraja completa ({NUM_RANGOS} pilas de {NUM_PALOS}): P(victoria) = {completa} = {float(completa):.10f}")
+    print("Verificación:", "OK" if correcto else "DISCREPANCIA")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,430 @@
+"""
+Prueba de resistencia del modo automático, sin ventana y durante horas.
+
+Lleva el Juego real por el mismo ciclo que un quiosco: menú, modo
+automático, pregunta escrita letra a letra, mezcla, reparto, partida,
+resultado, ESC al menú (el modo automático no atiende al ratón) y otra
+vez el botón Modo Automático, que recoge la mesa con reiniciar_juego. A
+veces escribe preguntas para la cola durante la partida, de modo que la
+siguiente empieza sola (siguiente_partida). El reloj es virtual y cada
+fotograma avanza --escala veces lo normal, así que las animaciones y las
+pausas del modo automático pasan más deprisa que en tiempo real.
+
+Para provocar los fallos que solo salen tras miles de partidas mete
+tormentas de eventos aleatorios (ratón y teclado) y pulsa ESC en fases
+arbitrarias, y vigila:
+
+- el tiempo de cada fotograma (actualizar y dibujar): percentiles y
+  tirones por encima de --tiron milisegundos, con la pantalla y fase;
+- estados en que el juego se queda quieto más de --atasco segundos
+  virtuales sin avanzar, y estados imposibles, como una fase automática
+  (_auto_fase) que sobrevive fuera del modo automático, animaciones en
+  el menú o cartas repetidas en las pilas;
+- cada --muestreo partidas, la memoria residente, las superficies que
+  cuelgan del juego y los objetos de Python, y si crecen tras el
+  calentamiento más de lo admitido.
+
+Cada incidencia se cuenta una vez por tipo con el momento en que apareció
+por primera vez. Termina con código 1 si hubo alguna.
+
+Uso:
+    python prueba_resistencia.py [--partidas N] [--horas H] [--escala 8] [--semilla S]
+    python prueba_resistencia.py --horas 12 --serie resistencia.csv
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import traceback
+
+import pygame
+
+PALABRAS = ("me", "irá", "bien", "en", "el", "trabajo", "amor", "viaje", "examen", "mañana",
+            "este", "año", "saldrá", "todo", "la", "mudanza", "suerte", "hoy", "¿", "?")
+FPS = 60
+PAUSA_RESULTADO = 3000   # ms virtuales mirando el resultado antes de volver al menú
+MAX_COLA = 50            # Preguntas en cola a partir de las que se considera una fuga
+
+
+class Incidencias:
+    """
+    Incidencias agrupadas por tipo y descripción, con su primera aparición.
+    """
+    def __init__(self):
+        self.por_clave = {}
+
+    def anotar(self, tipo, descripcion, momento):
+        clave = tipo, descripcion
+        if clave in self.por_clave:
+            self.por_clave[clave][0] += 1
+        else:
+            self.por_clave[clave] = [1, momento]
+            print(f"  ! {tipo}: {descripcion} ({momento})", flush=True)
+
+    def __bool__(self):
+        return bool(self.por_clave)
+
+    def informe(self):
+        lineas = []
+        for (tipo, descripcion), (veces, momento) in sorted(self.por_clave.items()):
+            lineas.append(f"  {tipo}: {descripcion} - {veces} veces, la primera {momento}")
+        return "\n".join(lineas)
+
+
+def superficies_del_juego(juego):
+    """
+    Superficies distintas alcanzables desde el juego (atributos, listas,
+    diccionarios, cartas, botones...). Las superficies de pygame no las
+    sigue el recolector, así que gc no sirve para contarlas.
+    """
+    vistas, superficies = set(), 0
+    pendientes = [juego]
+    while pendientes:
+        objeto = pendientes.pop()
+        if id(objeto) in vistas:
+            continue
+        vistas.add(id(objeto))
+        if isinstance(objeto, pygame.Surface):
+            superficies += 1
+        elif isinstance(objeto, dict):
+            pendientes.extend(objeto.keys())
+            pendientes.extend(objeto.values())
+        elif isinstance(objeto, (list, tuple, set, frozenset)) or type(objeto).__name__ == 'deque':
+            pendientes.extend(objeto)
+        elif hasattr(objeto, '__dict__') and type(objeto).__module__ not in ('builtins', 'pygame'):
+            if not isinstance(objeto, type) and not callable(objeto):
+                pendientes.extend(vars(objeto).values())
+    return superficies
+
+
+def _firma(juego):
+    # Cambia siempre que el juego avanza: si se repite mucho tiempo, está atascado
+    return (juego.estado, getattr(juego, '_auto_fase', 'ausente'), juego.animando_mezcla,
+            len(juego.cartas_mezcladas), juego.animando_reparto, len(juego.cartas_a_repartir),
+            juego.paso_trayectoria, juego.mostrando_respuesta, juego.mostrando_input, juego.pregunta)
+
+
+def estados_imposibles(juego):
+    """
+    Devuelve la lista de incoherencias del estado actual.
+    """
+    from juegoBaraja import Juego
+    problemas = []
+    fase = getattr(juego, '_auto_fase', None)
+    if juego.estado != Juego.ESTADO_AUTO and fase is not None:
+        problemas.append(f"_auto_fase='{fase}' fuera del modo automático")
+    if juego.estado == Juego.ESTADO_AUTO and not hasattr(juego, '_auto_fase'):
+        problemas.append("modo automático sin _auto_fase")
+    if juego.estado in (Juego.ESTADO_INICIO, Juego.ESTADO_INSTRUCCIONES):
+        activos = [nombre for nombre in ('jugando', 'animando_mezcla', 'animando_reparto', 'arrastrando')
+                   if getattr(juego, nombre)]
+        if activos:
+            problemas.append(f"{', '.join(activos)} en el menú")
+    if juego.animando_mezcla and juego.animando_reparto:
+        problemas.append("mezcla y reparto animándose a la vez")
+    en_pilas = [carta for pila in juego.cartas_por_posicion.values() for carta in pila]
+    if len(en_pilas) != len(set(map(id, en_pilas))):
+        problemas.append("cartas repetidas en las pilas")
+    if len(en_pilas) > len(juego.cartas_por_id):
+        problemas.append("más cartas en las pilas que en el mazo")
+    if len(juego.cola_preguntas) > MAX_COLA:
+        problemas.append(f"más de {MAX_COLA} preguntas en cola")
+    return problemas
+
+
+class Conductor:
+    """
+    Decide en cada fotograma qué eventos recibe el juego: el guion de un
+    quiosco más tormentas aleatorias y ESC inesperados.
+    """
+    def __init__(self, juego, rng, args):
+        self.juego = juego
+        self.rng = rng
+        self.args = args
+        self.por_escribir = []      # Teclas pendientes de la pregunta
+        self.resultado_desde = None
+        self.esc_en = None          # Fotograma en que se pulsará un ESC programado
+        self.cola_pedida = False    # Ya se escribió una pregunta para la cola en esta partida
+        self.fase_anterior = None
+
+    def evento(self, tipo, **atributos):
+        return pygame.event.Event(tipo, **atributos)
+
+    def clic(self, boton):
+        return [self.evento(pygame.MOUSEBUTTONDOWN, button=1, pos=boton.rect.center),
+                self.evento(pygame.MOUSEBUTTONUP, button=1, pos=boton.rect.center)]
+
+    def tecla(self, letra=None, key=0):
+        return self.evento(pygame.KEYDOWN, key=key, unicode=letra or '', mod=0)
+
+    def _pregunta(self):
+        texto = " ".join(self.rng.choice(PALABRAS) for _ in range(self.rng.randint(2, 7)))
+        return [self.tecla(letra) for letra in texto] + [self.tecla('\r', pygame.K_RETURN)]
+
+    def tormenta(self):
+        from juegoBaraja import WIDTH, HEIGHT
+        eventos = []
+        for _ in range(self.rng.randint(20, 200)):
+            pos = (self.rng.randrange(WIDTH), self.rng.randrange(HEIGHT))
+            tipo = self.rng.random()
+            if tipo < 0.5:
+                eventos.append(self.evento(pygame.MOUSEMOTION, pos=pos, rel=(0, 0),
+                                            buttons=(self.rng.randint(0, 1), 0, 0)))
+            elif tipo < 0.8:
+                boton = self.rng.choice((1, 1, 1, 3))
+                eventos.append(self.evento(pygame.MOUSEBUTTONDOWN, button=boton, pos=pos))
+                eventos.append(self.evento(pygame.MOUSEBUTTONUP, button=boton, pos=pos))
+            else:
+                eleccion = self.rng.random()
+                if eleccion < 0.1:
+                    eventos.append(self.tecla('\r', pygame.K_RETURN))
+                elif eleccion < 0.2:
+                    eventos.append(self.tecla('\b', pygame.K_BACKSPACE))
+                else:
+                    eventos.append(self.tecla(self.rng.choice("abcdefghijklmnñopqrstuvwxyz ¿?")))
+        return eventos
+
+    def eventos(self, fotograma, ms):
+        """
+        Eventos para este fotograma (ms es el reloj virtual).
+        """
+        from juegoBaraja import Juego, COLA_PREGUNTAS
+        juego, rng = self.juego, self.rng
+        eventos = []
+
+        if rng.random() < self.args.prob_tormenta:
+            eventos += self.tormenta()
+
+        # ESC en un momento cualquiera de una fase recién empezada
+        fase = (juego.estado, getattr(juego, '_auto_fase', None), juego.animando_mezcla, juego.animando_reparto)
+        if fase != self.fase_anterior:
+            self.fase_anterior = fase
+            if juego.estado == Juego.ESTADO_AUTO and rng.random() < self.args.prob_esc:
+                self.esc_en = fotograma + rng.randint(0, 60)
+        if self.esc_en is not None and fotograma >= self.esc_en:
+            self.esc_en = None
+            self.por_escribir = []
+            return eventos + [self.tecla(key=pygame.K_ESCAPE)]
+
+        if juego.estado == Juego.ESTADO_INICIO:
+            self.resultado_desde = None
+            self.cola_pedida = False
+            return eventos + self.clic(juego.boton_auto)
+        if juego.estado in (Juego.ESTADO_INSTRUCCIONES, Juego.ESTADO_JUEGO):
+            # Llegó aquí por una tormenta: de vuelta al menú
+            return eventos + [self.tecla(key=pygame.K_ESCAPE)]
+
+        # Modo automático: escribir la pregunta, una letra por fotograma
+        if juego.mostrando_input:
+            if not self.por_escribir:
+                self.por_escribir = self._pregunta()
+            return eventos + [self.por_escribir.pop(0)]
+        self.por_escribir = []
+
+        # A veces, una pregunta para la cola mientras se juega
+        if (COLA_PREGUNTAS and juego.jugando and not self.cola_pedida
+                and rng.random() < self.args.prob_cola / 60):
+            self.cola_pedida = True
+            eventos += self._pregunta()
+
+        if juego.mostrando_respuesta and not juego.cola_preguntas:
+            if self.resultado_desde is None:
+                self.resultado_desde = ms
+            elif ms - self.resultado_desde >= PAUSA_RESULTADO:
+                self.resultado_desde = None
+                eventos.append(self.tecla(key=pygame.K_ESCAPE))
+        elif not juego.mostrando_respuesta:
+            self.resultado_desde = None
+            self.cola_pedida = self.cola_pedida and juego.jugando
+        return eventos
+
+
+def _momento(partidas, ms):
+    return f"partida {partidas}, {ms / 3600000:.2f} h virtuales"
+
+
+def ejecutar(juego, pantalla, args):
+    from diagnostico_memoria import rss_actual
+    from estadisticas import Histograma
+    from metricas import ESTADOS
+
+    rng = random.Random(args.semilla)
+    reloj = {'ms': 0}
+    juego.obtener_ticks = lambda: reloj['ms']
+    conductor = Conductor(juego, rng, args)
+    incidencias = Incidencias()
+    tiempos = Histograma(20000)   # Décimas de milisegundo, hasta 2 s
+    peor = (0.0, None)
+    paso = 1000 / FPS * args.escala
+
+    serie = open(args.serie, 'w', encoding='utf-8') if args.serie else None
+    if serie:
+        serie.write("segundos_reales,horas_virtuales,partidas,reinicios,rss_mib,superficies,objetos,p99_ms\n")
+    muestras = []
+
+    inicio = time.perf_counter()
+    fotograma = partidas = reinicios = 0
+    ultima_firma, firma_desde, atascos_seguidos = None, 0, 0
+    terminada = False
+    siguiente_muestra = 0
+
+    def muestrear():
+        gc.collect()
+        muestra = (partidas, rss_actual() / 2**20, superficies_del_juego(juego), len(gc.get_objects()),
+                   len(juego.caras.rutas) - len(juego.caras.cargadas()))
+        muestras.append(muestra)
+        p99 = tiempos.cuantil(0.99) / 10 if tiempos.total() else 0
+        horas = reloj['ms'] / 3600000
+        print(f"{time.perf_counter() - inicio:>8.0f} s  {horas:>7.2f} h virt  "
+              f"partidas {partidas:>6}  reinicios {reinicios:>6}  RSS {muestra[1]:>7.1f} MiB  "
+              f"superficies {muestra[2]:>5}  objetos {muestra[3]:>8}  p99 {p99:.1f} ms", flush=True)
+        if serie:
+            serie.write(f"{time.perf_counter() - inicio:.1f},{horas:.4f},{partidas},{reinicios},"
+                        f"{muestra[1]:.2f},{muestra[2]},{muestra[3]},{p99:.2f}\n")
+            serie.flush()
+
+    while True:
+        if args.partidas and partidas >= args.partidas:
+            break
+        if args.horas and time.perf_counter() - inicio >= args.horas * 3600:
+            break
+        fotograma += 1
+        ms = round(fotograma * paso)
+        dt = ms - reloj['ms']
+        reloj['ms'] = ms
+        estado_antes = juego.estado
+
+        t0 = time.perf_counter()
+        try:
+            for evento in conductor.eventos(fotograma, ms):
+                juego.manejar_evento(evento)
+            juego.actualizar_animacion(dt)
+            juego.actualizar_reparto(dt)
+            juego.actualizar_automatico(ms)
+            juego.caras.recoger()
+            juego.draw(pantalla)
+        except Exception:
+            incidencias.anotar("excepción", traceback.format_exc().strip().splitlines()[-1], _momento(partidas, ms))
+            traceback.print_exc()
+            juego.accion_reiniciar()
+            continue
+        trabajo = (time.perf_counter() - t0) * 1000
+        tiempos.anotar(min(int(trabajo * 10), len(tiempos.conteos) - 1))
+        if trabajo > peor[0]:
+            peor = (trabajo, f"{ESTADOS[juego.estado]}/{getattr(juego, '_auto_fase', None)}")
+        if trabajo > args.tiron:
+            incidencias.anotar("tirón", f"fotograma de más de {args.tiron:g} ms en "
+                               f"{ESTADOS[juego.estado]}/{getattr(juego, '_auto_fase', None)}",
+                               _momento(partidas, ms))
+
+        if juego.mostrando_respuesta and not terminada:
+            partidas += 1
+        terminada = juego.mostrando_respuesta
+        if estado_antes != juego.estado and juego.estado == juego.ESTADO_INICIO:
+            reinicios += 1
+
+        for problema in estados_imposibles(juego):
+            incidencias.anotar("estado", problema, _momento(partidas, ms))
+
+        # Quieto demasiado tiempo: ESC y, si se repite, Reiniciar
+        firma = _firma(juego)
+        if firma != ultima_firma:
+            ultima_firma, firma_desde, atascos_seguidos = firma, ms, 0
+        elif ms - firma_desde > args.atasco * 1000:
+            incidencias.anotar("atasco", f"sin avanzar en {ESTADOS[juego.estado]}/"
+                               f"{getattr(juego, '_auto_fase', None)}", _momento(partidas, ms))
+            atascos_seguidos += 1
+            firma_desde = ms
+            if atascos_seguidos == 1:
+                juego.manejar_evento(conductor.tecla(key=pygame.K_ESCAPE))
+            else:
+                juego.accion_reiniciar()
+
+        if partidas >= siguiente_muestra:
+            siguiente_muestra = partidas + args.muestreo
+            muestrear()
+
+    if not muestras or muestras[-1][0] != partidas:
+        muestrear()  # Una última muestra para comparar con el calentamiento
+    if serie:
+        serie.close()
+    duracion = time.perf_counter() - inicio
+    crecimiento(muestras, args, incidencias, _momento(partidas, reloj['ms']))
+
+    print()
+    print(f"{partidas} partidas y {reinicios} vueltas al menú en {duracion:.0f} s reales "
+          f"({reloj['ms'] / 3600000:.2f} h virtuales, {fotograma} fotogramas)")
+    print("Fotograma (ms): " + "  ".join(f"p{q * 100:g} {tiempos.cuantil(q) / 10:.1f}"
+                                         for q in (0.5, 0.9, 0.99, 0.999))
+          + f"  máx {peor[0]:.1f} ({peor[1]})")
+    if muestras:
+        primera, ultima = muestras[0], muestras[-1]
+        print(f"Memoria: RSS {primera[1]:.1f} -> {ultima[1]:.1f} MiB, superficies {primera[2]} -> {ultima[2]}, "
+              f"objetos {primera[3]} -> {ultima[3]}")
+    if incidencias:
+        print("Incidencias:")
+        print(incidencias.informe())
+    else:
+        print("Sin incidencias")
+    return incidencias
+
+
+def crecimiento(muestras, args, incidencias, momento):
+    """
+    Compara la última muestra con la primera tras el calentamiento.
+    """
+    base = next((m for m in muestras if m[0] >= args.calentamiento), None)
+    if base is None or base is muestras[-1]:
+        return
+    ultima = muestras[-1]
+    if ultima[1] - base[1] > args.max_rss:
+        incidencias.anotar("memoria", f"RSS creció {ultima[1] - base[1]:.1f} MiB desde la partida {base[0]}", momento)
+    # Las caras que aún no se habían pedido pueden cargarse después
+    if ultima[2] - base[2] > base[4]:
+        incidencias.anotar("memoria", f"superficies del juego {base[2]} -> {ultima[2]} desde la partida {base[0]}",
+                           momento)
+    if ultima[3] > base[3] * (1 + args.max_objetos):
+        incidencias.anotar("memoria", f"objetos de Python {base[3]} -> {ultima[3]} desde la partida {base[0]}",
+                           momento)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de resistencia del modo automático sin ventana")
+    parser.add_argument("--partidas", type=int, default=200, help="Partidas a jugar (0: sin límite)")
+    parser.add_argument("--horas", type=float, default=None, help="Horas reales como máximo")
+    parser.add_argument("--escala", type=float, default=8, help="Veces más rápido que el tiempo real (por defecto 8)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--prob-tormenta", type=float, default=0.002,
+                        help="Probabilidad por fotograma de una tormenta de eventos aleatorios")
+    parser.add_argument("--prob-esc", type=float, default=0.03, help="Probabilidad de un ESC en cada fase")
+    parser.add_argument("--prob-cola", type=float, default=0.05,
+                        help="Probabilidad por segundo de escribir una pregunta para la cola durante la partida")
+    parser.add_argument("--tiron", type=float, default=100, help="Milisegundos de un fotograma que cuentan como tirón")
+    parser.add_argument("--atasco", type=float, default=60,
+                        help="Segundos virtuales sin avanzar que cuentan como atasco")
+    parser.add_argument("--muestreo", type=int, default=20, help="Partidas entre muestras de memoria")
+    parser.add_argument("--calentamiento", type=int, default=20, help="Partidas antes de medir el crecimiento")
+    parser.add_argument("--max-rss", type=float, default=32, help="MiB de crecimiento del RSS admitidos")
+    parser.add_argument("--max-objetos", type=float, default=0.2,
+                        help="Fracción de crecimiento de los objetos de Python admitida")
+    parser.add_argument("--serie", help="CSV donde escribir cada muestra")
+    args = parser.parse_args()
+    if args.serie:
+        args.serie = os.path.abspath(args.serie)
+
+    # Sin ventana ni sonido real; las rutas de recursos son relativas al juego
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    import juegoBaraja
+
+    random.seed(args.semilla)  # Las semillas de las mezclas salen del generador global
+    juego = juegoBaraja.Juego()
+    incidencias = ejecutar(juego, juegoBaraja.screen, args)
+    sys.exit(1 if incidencias else 0)
+
+
+if __name__ == "__main__":
+    main()
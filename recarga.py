@@ -0,0 +1,100 @@
+"""
+Recarga en caliente de imágenes, para iterar el arte sin reiniciar el juego.
+
+Vigilante revisa cada INTERVALO segundos la fecha y el tamaño de las
+imágenes que usa el juego (las caras de img/, el fondo, el reverso y
+las imágenes superpuestas de recursos/). Cuando un archivo cambia y deja de
+cambiar durante una revisión (el editor terminó de escribirlo), se
+decodifica y escala en los hilos del cargador; el bucle principal recoge
+las que ya están listas entre fotogramas y el juego cambia solo esas
+superficies. Para no trabar un fotograma, cada vuelta cambia imágenes hasta
+gastar PRESUPUESTO milisegundos (al menos una).
+
+Revisar son unas decenas de os.stat, así que se hace en el propio bucle
+sin hilos ni dependencias. Solo se vigilan archivos que ya existían al
+arrancar: una carta nueva necesita reiniciar.
+
+Uso:
+    vigilante = Vigilante(juego.rutas_imagenes(), juego.cargador)
+    vigilante.revisar()                       # en cada vuelta del bucle
+    for ruta, imagen, error in vigilante.listas():
+        juego.reemplazar_imagen(ruta, imagen)
+"""
+import os
+import time
+
+INTERVALO = 0.5    # Segundos entre revisiones de los archivos
+PRESUPUESTO = 4.0  # Milisegundos por fotograma para cambiar imágenes
+
+
+def _firma(ruta):
+    try:
+        estado = os.stat(ruta)
+    except OSError:  # Borrado a medias o solo en el paquete de recursos
+        return None
+    return estado.st_mtime_ns, estado.st_size
+
+
+class Vigilante:
+    def __init__(self, imagenes, cargador, intervalo=INTERVALO):
+        """
+        imagenes es un diccionario ruta -> size como el de
+        Juego.rutas_imagenes; cargador, un CargadorImagenes.
+        """
+        self.cargador = cargador
+        self.intervalo = intervalo
+        self.tamanos = dict(imagenes)
+        self._cargadas = {ruta: _firma(ruta) for ruta in self.tamanos}  # Lo que tiene el juego
+        self._vistas = dict(self._cargadas)                             # Lo de la última revisión
+        self._futuros = {}  # ruta -> Future de la decodificación en curso
+        self._ultima = time.perf_counter()
+
+    def revisar(self, ahora=None):
+        """
+        Si toca, compara cada archivo con la revisión anterior y encola los
+        que cambiaron y ya no cambian. Devuelve cuántos encoló.
+        """
+        ahora = time.perf_counter() if ahora is None else ahora
+        if ahora - self._ultima < self.intervalo:
+            return 0
+        self._ultima = ahora
+        encoladas = 0
+        for ruta, size in self.tamanos.items():
+            firma = _firma(ruta)
+            estable = firma == self._vistas[ruta]
+            self._vistas[ruta] = firma
+            if firma is None or not estable or firma == self._cargadas[ruta] or ruta in self._futuros:
+                continue
+            self._cargadas[ruta] = firma
+            self._futuros[ruta] = self.cargador.enviar(ruta, size)
+            encoladas += 1
+        return encoladas
+
+    def pendientes(self):
+        return len(self._futuros)
+
+    def listas(self, presupuesto=PRESUPUESTO):
+        """
+        Genera (ruta, imagen, error) de las decodificaciones terminadas
+        mientras quede presupuesto (en milisegundos, contando lo que tarde
+        quien las recibe). Si el archivo no se pudo leer, imagen es None y
+        error dice por qué; se vuelve a intentar cuando cambie otra vez.
+        """
+        inicio = time.perf_counter()
+        for ruta in [ruta for ruta, futuro in self._futuros.items() if futuro.done()]:
+            futuro = self._futuros.pop(ruta)
+            try:
+                yield ruta, futuro.result(), None
+            except Exception as error:  # pygame.error, archivo truncado...
+                yield ruta, None, str(error)
+            if (time.perf_counter() - inicio) * 1000 >= presupuesto:
+                return
+
+    def ms_hasta_revision(self):
+        """
+        Milisegundos hasta la próxima revisión (al menos 1), para que el
+        bucle no se duerma más allá; si hay decodificaciones en curso, 1.
+        """
+        if self._futuros:
+            return 1
+        return max(1, int((self.intervalo - (time.perf_counter() - self._ultima)) * 1000))
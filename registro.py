@@ -0,0 +1,160 @@
+"""
+Registro estructurado de los eventos de la partida sin frenar el bucle.
+
+El hilo principal solo mete en una cola una tupla (instante, evento,
+semilla, datos); un hilo de fondo la vacía, escribe cada evento como una
+línea JSON y rota el archivo cuando supera TAMANO_MAXIMO bytes
+(registro.jsonl.1, registro.jsonl.2, ...). Así una salida lenta o
+redirigida no puede detener un fotograma, como pasaba con print.
+
+Uso:
+    registro.iniciar("registro.jsonl")
+    registro.evento('jugada', semilla, paso, carta, origen, destino)
+    registro.cerrar()
+
+Mientras no se llame a iniciar, evento no hace nada.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+TAMANO_MAXIMO = 1 << 20  # bytes por archivo antes de rotar
+COPIAS = 3               # archivos rotados que se conservan
+
+# Nombre de cada dato de un evento, en el orden en que se pasan a evento()
+CAMPOS = {
+    'audio_no_disponible': ('error',),
+    'metricas_no_disponibles': ('error',),
+    'transmision_no_disponible': ('error',),
+    'texturas_no_disponibles': (),
+    'fuente_no_disponible': ('error',),
+    'paquete_no_disponible': ('ruta', 'error'),
+    'instantanea_no_restaurada': ('ruta', 'error'),
+    'perfil': ('archivo',),
+    'perfil_no_guardado': ('error',),
+    'imagen_recargada': ('ruta',),
+    'imagen_no_recargada': ('ruta', 'error'),
+    'modo': ('modo',),
+    'pregunta': ('texto',),
+    'pregunta_en_cola': ('texto', 'en_cola'),
+    'mezcla_inicio': ('fisica', 'cartas'),
+    'mezcla_fin': (),
+    'reparto_inicio': ('cartas', 'victoria_prevista', 'codigo'),
+    'reparto_fin': (),
+    'jugada': ('paso', 'carta', 'origen', 'destino'),
+    'fin': ('victoria', 'volteadas', 'total'),
+}
+
+_cola = None
+_hilo = None
+
+
+def evento(nombre, semilla, *datos):
+    """
+    Encola un evento. Es lo único que se hace en el hilo del juego.
+    """
+    if _cola is not None:
+        _cola.put((time.time(), nombre, semilla, datos))
+
+
+def iniciar(ruta, tamano_maximo=TAMANO_MAXIMO, copias=COPIAS):
+    """
+    Arranca el hilo que escribe el registro en ruta. Sin ruta no hace nada.
+    """
+    global _cola, _hilo
+    if not ruta or _hilo is not None:
+        return
+    _cola = queue.SimpleQueue()
+    escritor = _Escritor(ruta, tamano_maximo, copias)
+    _hilo = threading.Thread(target=escritor.ejecutar, args=(_cola,), name="registro", daemon=True)
+    _hilo.start()
+
+
+def cerrar():
+    """
+    Escribe los eventos pendientes y detiene el hilo.
+    """
+    global _cola, _hilo
+    if _hilo is None:
+        return
+    _cola.put(None)
+    _hilo.join()
+    _cola = _hilo = None
+
+
+def formatear(instante, nombre, semilla, datos):
+    """
+    Convierte una tupla de la cola en una línea JSON.
+    """
+    campos = CAMPOS.get(nombre, ())
+    registro = {'t': round(instante, 3), 'evento': nombre, 'semilla': semilla}
+    registro.update(zip(campos, datos))
+    if len(datos) > len(campos):  # Datos sin nombre: no se pierden
+        registro['datos'] = list(datos[len(campos):])
+    return json.dumps(registro, ensure_ascii=False) + '\n'
+
+
+class _Escritor:
+    def __init__(self, ruta, tamano_maximo, copias):
+        self.ruta = ruta
+        self.tamano_maximo = tamano_maximo
+        self.copias = copias
+        self.archivo = None
+        self.tamano = 0
+
+    def ejecutar(self, cola):
+        terminar = False
+        while not terminar:
+            # Bloquear hasta el primer evento y escribir de una vez los que ya esperan
+            pendientes = [cola.get()]
+            while True:
+                try:
+                    pendientes.append(cola.get_nowait())
+                except queue.Empty:
+                    break
+            for pendiente in pendientes:
+                if pendiente is None:
+                    terminar = True
+                    continue
+                try:
+                    self.escribir(formatear(*pendiente))
+                except (OSError, TypeError, ValueError):
+                    pass  # Un registro que falla no debe tumbar el juego
+            if self.archivo is not None:
+                try:
+                    self.archivo.flush()
+                except OSError:
+                    pass
+        if self.archivo is not None:
+            self.archivo.close()
+
+    def escribir(self, linea):
+        datos = linea.encode('utf-8')
+        if self.archivo is None:
+            self.abrir()
+        elif self.tamano and self.tamano + len(datos) > self.tamano_maximo:
+            self.rotar()
+        self.archivo.write(datos)
+        self.tamano += len(datos)
+
+    def abrir(self):
+        self.archivo = open(self.ruta, 'ab')
+        self.tamano = self.archivo.tell()
+
+    def rotar(self):
+        """
+        registro.jsonl pasa a ser .1, .1 pasa a .2 y así hasta COPIAS.
+        """
+        self.archivo.close()
+        self.archivo = None  # Si algo falla, la próxima línea vuelve a abrir el archivo
+        for i in range(self.copias - 1, 0, -1):
+            origen = f"{self.ruta}.{i}"
+            if os.path.exists(origen):
+                os.replace(origen, f"{self.ruta}.{i + 1}")
+        if self.copias > 0:
+            os.replace(self.ruta, f"{self.ruta}.1")
+        else:
+            os.remove(self.ruta)
+        self.abrir()
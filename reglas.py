@@ -0,0 +1,109 @@
+"""
+Reglas puras del juego del Reloj, sin dependencias de Pygame.
+
+Las usan tanto el juego (juegoBaraja.py) como las herramientas de análisis,
+que necesitan simular millones de partidas sin abrir una ventana.
+"""
+
+NUM_RANGOS = 13   # A..K, una pila por rango
+NUM_PALOS = 4     # Cartas por pila al repartir
+NUM_MAZOS = 1     # Barajas completas mezcladas juntas
+PILA_CENTRAL = NUM_RANGOS - 1  # Índice de la pila del centro (K)
+
+
+def valor_de_nombre(nombre_archivo):
+    """
+    Devuelve el valor numérico de una carta según su nombre de archivo.
+    A=1, J=11, Q=12, K=13, números según corresponda.
+    """
+    nombre = nombre_archivo.lower()
+    if nombre.startswith('a'):
+        return 1
+    elif nombre.startswith('j'):
+        return 11
+    elif nombre.startswith('q'):
+        return 12
+    elif nombre.startswith('k'):
+        return 13
+    # Para números del 2-10, tomar los dígitos del inicio
+    valor = ''
+    for char in nombre:
+        if char.isdigit():
+            valor += char
+        else:
+            break
+    return int(valor) if valor else 0
+
+
+def siguiente_pila(valor, num_rangos=NUM_RANGOS):
+    """
+    Devuelve el índice de la pila destino para una carta de valor dado.
+    El rango más alto (K) va a la pila central, el resto a la pila valor-1.
+    """
+    if valor == num_rangos:  # K
+        return num_rangos - 1  # Pila central
+    return valor - 1
+
+
+def crear_valores(num_mazos=NUM_MAZOS, num_rangos=NUM_RANGOS, num_palos=NUM_PALOS):
+    """
+    Devuelve los valores (1..num_rangos) de num_mazos barajas sin mezclar,
+    palo por palo. Hay una pila por rango, así que cada pila recibe
+    num_mazos * num_palos cartas: dos barajas dan 13 pilas de 8.
+    """
+    return list(range(1, num_rangos + 1)) * (num_palos * num_mazos)
+
+
+def repartir_valores(valores, num_rangos=NUM_RANGOS):
+    """
+    Reparte una secuencia de valores en pilas igual que Juego.repartir:
+    la carta i va a la pila i % num_rangos. La última carta de cada lista
+    es la carta superior de la pila.
+    """
+    pilas = [[] for _ in range(num_rangos)]
+    for i, valor in enumerate(valores):
+        pilas[i % num_rangos].append(valor)
+    return pilas
+
+
+def simular_partida(valores, num_rangos=NUM_RANGOS):
+    """
+    Juega una partida completa sobre el orden de valores dado, con las mismas
+    reglas que Juego.jugada_automatica. Devuelve (victoria, cartas_volteadas).
+    """
+    pilas = repartir_valores(valores, num_rangos)
+    total = len(valores)
+    pila_actual = num_rangos - 1  # Empezamos en la pila central
+    volteadas = 0
+    while True:
+        pila = pilas[pila_actual]
+        if not pila:
+            return False, volteadas
+        valor = pila.pop()
+        volteadas += 1
+        pila_actual = siguiente_pila(valor, num_rangos)
+        if volteadas == total:
+            return True, volteadas
+
+
+def calcular_trayectoria(valores, num_rangos=NUM_RANGOS):
+    """
+    Calcula la secuencia completa de jugadas de una partida ya repartida.
+    Devuelve (jugadas, victoria), donde cada jugada es una tupla
+    (indice_reparto, pila_origen, pila_destino) e indice_reparto es la
+    posición de la carta movida dentro del orden de reparto.
+    """
+    total = len(valores)
+    # Cartas boca abajo que quedan en cada pila (la carta superior es la última repartida)
+    boca_abajo = [len(range(pila, total, num_rangos)) for pila in range(num_rangos)]
+    pila_actual = num_rangos - 1  # Empezamos en la pila central
+    jugadas = []
+    while boca_abajo[pila_actual]:
+        boca_abajo[pila_actual] -= 1
+        indice = boca_abajo[pila_actual] * num_rangos + pila_actual
+        destino = siguiente_pila(valores[indice], num_rangos)
+        jugadas.append((indice, pila_actual, destino))
+        pila_actual = destino
+        if len(jugadas) == total:
+            return jugadas, True
+    return jugadas, False
@@ -0,0 +1,321 @@
+"""
+Pruebas de regresión visual del dibujo del juego, sin ventana.
+
+Lleva un Juego por una serie de escenas guionizadas (menú, instrucciones,
+mitad de la mezcla, mitad del reparto, pregunta, carta arrastrada, victoria
+y derrota) con el driver de vídeo "dummy", un reloj virtual y semillas
+fijas, dibuja cada una y la compara con su imagen de referencia en
+referencias/. Si el hash de los píxeles coincide no hace falta más; si no,
+se cuentan los píxeles cuya diferencia en algún canal supera --umbral y la
+escena falla si son más de --tolerancia. También informa de cuánto tarda
+cada escena en dibujarse, para vigilar las optimizaciones de draw_juego. Antes de
+nada comprueba el propio comparador con un fotograma de un píxel distinto.
+
+Tarda unos segundos y termina con código 1 si alguna escena falla, así
+que sirve de puerta antes de aceptar un cambio en el dibujo. Con
+--actualizar se vuelven a escribir las referencias (tras un cambio visual
+intencionado); con --diferencias se guarda, de cada escena que falla, la
+captura y una imagen con los píxeles distintos en magenta.
+
+Uso:
+    python regresion_visual.py [--escenas inicio,mezcla,...] [--repeticiones N]
+    python regresion_visual.py --actualizar
+    python regresion_visual.py --diferencias /tmp/diferencias
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+import pygame
+
+CARPETA_REFERENCIAS = "referencias"
+SEMILLA = 7              # Mezcla de las escenas de mitad de partida
+SEMILLA_VICTORIA = 22    # Semillas cuya partida termina en victoria...
+SEMILLA_DERROTA = 3      # ...y en derrota (se comprueba al jugarlas)
+UMBRAL = 8               # Diferencia por canal que se considera un píxel distinto
+TOLERANCIA = 0.001       # Fracción de píxeles distintos que se admite
+COLOR_DIFERENCIA = (255, 0, 255)
+
+
+def _evento(tipo, **atributos):
+    return pygame.event.Event(tipo, **atributos)
+
+
+def _pulsar(juego, boton):
+    juego.manejar_evento(_evento(pygame.MOUSEBUTTONDOWN, button=1, pos=boton.rect.center))
+    juego.manejar_evento(_evento(pygame.MOUSEBUTTONUP, button=1, pos=boton.rect.center))
+
+
+def _apartar_puntero(juego):
+    # Ningún botón resaltado: el puntero queda en una esquina vacía
+    juego.manejar_evento(_evento(pygame.MOUSEMOTION, pos=(0, 0), rel=(0, 0), buttons=(0, 0, 0)))
+
+
+def _escribir(juego, texto):
+    for letra in texto:
+        juego.manejar_evento(_evento(pygame.KEYDOWN, key=0, unicode=letra, mod=0))
+    juego.manejar_evento(_evento(pygame.KEYDOWN, key=pygame.K_RETURN, unicode='\r', mod=0))
+
+
+def _menu(juego):
+    juego.reiniciar_juego()
+    juego.estado = juego.ESTADO_INICIO
+    _apartar_puntero(juego)
+
+
+def _mezclar(juego, semilla, hasta_el_final=True):
+    """
+    Entra en modo manual con la semilla indicada y pulsa Mezclar. Sin
+    hasta_el_final la animación se deja con 20 cartas ya caídas.
+    """
+    _menu(juego)
+    _pulsar(juego, juego.boton_manual)
+    juego.sembrar(semilla)
+    _apartar_puntero(juego)
+    _pulsar(juego, juego.boton_mezclar)
+    _apartar_puntero(juego)
+    juego.actualizar_animacion(500)   # Mazo al centro
+    juego.actualizar_animacion(500)   # Mazo dividido
+    caidas = None if hasta_el_final else 20
+    while juego.animando_mezcla and (caidas is None or len(juego.cartas_mezcladas) < caidas):
+        juego.actualizar_animacion(100)
+    if not hasta_el_final:
+        juego.actualizar_animacion(50)  # Una carta a medio camino
+
+
+def _repartir(juego, hasta_el_final=True):
+    _pulsar(juego, juego.boton_repartir)
+    _apartar_puntero(juego)
+    paso = juego.duracion_reparto_carta
+    mitad = juego.total_cartas // 2
+    while juego.animando_reparto and (hasta_el_final or len(juego.cartas_a_repartir) > mitad):
+        juego.actualizar_reparto(paso)
+    if not hasta_el_final:
+        juego.actualizar_reparto(paso // 2)
+
+
+def _jugar(juego, semilla):
+    _mezclar(juego, semilla)
+    _repartir(juego)
+    _escribir(juego, "¿Saldrá bien?")
+    _pulsar(juego, juego.boton_jugar)
+    _apartar_puntero(juego)
+
+
+def _terminar(juego, semilla, victoria):
+    _jugar(juego, semilla)
+    while juego.jugando:
+        juego.aplicar_jugada()
+    if juego.victoria_prevista != victoria:
+        raise RuntimeError(f"La semilla {semilla} ya no termina en {'victoria' if victoria else 'derrota'}: "
+                           "cambia SEMILLA_VICTORIA o SEMILLA_DERROTA")
+    _apartar_puntero(juego)
+
+
+def escena_inicio(juego):
+    _menu(juego)
+
+
+def escena_instrucciones(juego):
+    _menu(juego)
+    _pulsar(juego, juego.boton_instrucciones)
+
+
+def escena_mezcla(juego):
+    _mezclar(juego, SEMILLA, hasta_el_final=False)
+
+
+def escena_reparto(juego):
+    _mezclar(juego, SEMILLA)
+    _repartir(juego, hasta_el_final=False)
+
+
+def escena_pregunta(juego):
+    _mezclar(juego, SEMILLA)
+    _repartir(juego)
+    for letra in "¿Me irá bi":
+        juego.manejar_evento(_evento(pygame.KEYDOWN, key=0, unicode=letra, mod=0))
+
+
+def escena_arrastre(juego):
+    """
+    Tres jugadas hechas con el ratón y la cuarta carta a medio arrastrar.
+    """
+    from juegoBaraja import posiciones
+    _jugar(juego, SEMILLA)
+
+    def centro(pila):
+        return posiciones[pila][0] + 10, posiciones[pila][1] + 10
+
+    for _ in range(3):
+        _, origen, destino, _ = juego.siguiente_jugada()
+        juego.manejar_evento(_evento(pygame.MOUSEBUTTONDOWN, button=1, pos=centro(origen)))
+        juego.manejar_evento(_evento(pygame.MOUSEBUTTONUP, button=1, pos=centro(destino)))
+    _, origen, destino, _ = juego.siguiente_jugada()
+    juego.manejar_evento(_evento(pygame.MOUSEBUTTONDOWN, button=1, pos=centro(origen)))
+    (x1, y1), (x2, y2) = centro(origen), centro(destino)
+    juego.manejar_evento(_evento(pygame.MOUSEMOTION, pos=((x1 + x2) // 2, (y1 + y2) // 2 + 40),
+                                 rel=(0, 0), buttons=(1, 0, 0)))
+
+
+def escena_victoria(juego):
+    _terminar(juego, SEMILLA_VICTORIA, True)
+
+
+def escena_derrota(juego):
+    _terminar(juego, SEMILLA_DERROTA, False)
+
+
+ESCENAS = {
+    'inicio': escena_inicio,
+    'instrucciones': escena_instrucciones,
+    'mezcla': escena_mezcla,
+    'reparto': escena_reparto,
+    'pregunta': escena_pregunta,
+    'arrastre': escena_arrastre,
+    'victoria': escena_victoria,
+    'derrota': escena_derrota,
+}
+
+
+def huella(superficie):
+    """
+    Hash de los píxeles RGB, independiente del formato de la superficie.
+    """
+    return hashlib.sha1(pygame.image.tobytes(superficie, 'RGB')).hexdigest()
+
+
+def pixeles_distintos(captura, referencia, umbral=UMBRAL, diferencias=None):
+    """
+    Cuenta los píxeles de captura que se apartan más de umbral, en algún
+    canal, de los de referencia. Si se da la superficie diferencias, se
+    pintan en ella de COLOR_DIFERENCIA.
+    """
+    if captura.get_size() != referencia.get_size():
+        return captura.get_width() * captura.get_height()
+    # threshold cuenta los píxeles parecidos; sin superficie donde pintar,
+    # set_color tiene que ser None. inverse_set=False pinta los distintos
+    if diferencias is None:
+        iguales = pygame.transform.threshold(
+            None, captura, None, (umbral, umbral, umbral, 255), None, 0, referencia)
+    else:
+        iguales = pygame.transform.threshold(
+            diferencias, captura, None, (umbral, umbral, umbral, 255), COLOR_DIFERENCIA, 1, referencia, False)
+    return captura.get_width() * captura.get_height() - iguales
+
+
+def comprobar_comparador():
+    """
+    Autocomprobación de pixeles_distintos con un fotograma que difiere de
+    su referencia en un solo píxel, con y sin superficie de diferencias.
+    Devuelve None si todo va bien o la descripción del fallo.
+    """
+    referencia = pygame.Surface((16, 16))
+    referencia.fill((40, 80, 120))
+    captura = referencia.copy()
+    captura.set_at((5, 7), (40 + 2 * UMBRAL, 80, 120))
+    captura.set_at((9, 2), (40 + UMBRAL // 2, 80, 120))  # Dentro del umbral: no cuenta
+    if pixeles_distintos(captura, referencia) != 1:
+        return f"sin diferencias cuenta {pixeles_distintos(captura, referencia)} píxeles distintos en vez de 1"
+    diferencias = captura.copy()
+    distintos = pixeles_distintos(captura, referencia, diferencias=diferencias)
+    pintados = [(x, y) for x in range(16) for y in range(16) if diferencias.get_at((x, y))[:3] == COLOR_DIFERENCIA]
+    if distintos != 1 or pintados != [(5, 7)]:
+        return f"con diferencias cuenta {distintos} píxeles distintos y pinta {pintados} en vez de [(5, 7)]"
+    return None
+
+
+def tiempo_dibujo(juego, pantalla, repeticiones):
+    """
+    Mediana, en milisegundos, de dibujar la escena actual repeticiones veces.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        juego.draw(pantalla)
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2] * 1000
+
+
+def comprobar(juego, pantalla, nombres, args):
+    """
+    Prepara, dibuja y compara cada escena. Devuelve los nombres de las que fallan.
+    """
+    fallidas = []
+    print(f"{'escena':<14}{'ms/fotograma':>13}  resultado")
+    for nombre in nombres:
+        ESCENAS[nombre](juego)
+        ms = tiempo_dibujo(juego, pantalla, args.repeticiones)
+        juego.draw(pantalla)
+        captura = pantalla.copy()
+        ruta = os.path.join(CARPETA_REFERENCIAS, nombre + ".png")
+
+        if args.actualizar:
+            os.makedirs(CARPETA_REFERENCIAS, exist_ok=True)
+            pygame.image.save(captura, ruta)
+            resultado = "referencia guardada"
+        elif not os.path.exists(ruta):
+            resultado = "FALLA: sin referencia (usa --actualizar)"
+            fallidas.append(nombre)
+        else:
+            referencia = pygame.image.load(ruta).convert()
+            if huella(captura) == huella(referencia):
+                resultado = "idéntica"
+            else:
+                diferencias = captura.copy() if args.diferencias else None
+                distintos = pixeles_distintos(captura, referencia, args.umbral, diferencias)
+                fraccion = distintos / (captura.get_width() * captura.get_height())
+                resultado = f"{distintos} píxeles distintos ({fraccion:.3%})"
+                if fraccion > args.tolerancia:
+                    resultado = "FALLA: " + resultado
+                    fallidas.append(nombre)
+                    if args.diferencias:
+                        os.makedirs(args.diferencias, exist_ok=True)
+                        pygame.image.save(captura, os.path.join(args.diferencias, nombre + ".png"))
+                        pygame.image.save(diferencias, os.path.join(args.diferencias, nombre + "_dif.png"))
+        print(f"{nombre:<14}{ms:>13.2f}  {resultado}")
+    return fallidas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara el dibujo del juego con imágenes de referencia")
+    parser.add_argument("--escenas", default=",".join(ESCENAS),
+                        help=f"Escenas separadas por comas (por defecto todas: {', '.join(ESCENAS)})")
+    parser.add_argument("--actualizar", action="store_true", help="Guarda las capturas como nuevas referencias")
+    parser.add_argument("--umbral", type=int, default=UMBRAL, help="Diferencia por canal que cuenta como distinta")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="Fracción de píxeles distintos admitida")
+    parser.add_argument("--repeticiones", type=int, default=20, help="Dibujos por escena para medir el tiempo")
+    parser.add_argument("--diferencias", help="Carpeta donde guardar las capturas y diferencias de las que fallan")
+    args = parser.parse_args()
+
+    nombres = [nombre.strip() for nombre in args.escenas.split(",") if nombre.strip()]
+    desconocidas = [nombre for nombre in nombres if nombre not in ESCENAS]
+    if desconocidas:
+        parser.error(f"escenas desconocidas: {', '.join(desconocidas)}")
+    if args.diferencias:
+        args.diferencias = os.path.abspath(args.diferencias)
+
+    # Sin ventana ni sonido real; las rutas de recursos son relativas al juego
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    import juegoBaraja
+
+    error = comprobar_comparador()
+    if error:
+        print(f"FALLA la comparación de píxeles: {error}")
+        sys.exit(1)
+
+    inicio = time.perf_counter()
+    juego = juegoBaraja.Juego()
+    juego.obtener_ticks = lambda: 0  # Reloj parado: el cursor de la pregunta siempre visible
+    fallidas = comprobar(juego, juegoBaraja.screen, nombres, args)
+    print(f"{len(nombres) - len(fallidas)}/{len(nombres)} escenas correctas en {time.perf_counter() - inicio:.1f} s")
+    sys.exit(1 if fallidas else 0)
+
+
+if __name__ == "__main__":
+    main()
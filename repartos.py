@@ -0,0 +1,315 @@
+"""
+Codificación compacta de repartos (el orden completo de las 52 cartas).
+
+Cada carta tiene un id canónico que no depende del orden de los archivos
+de img/: id = (valor - 1) * NUM_PALOS + palo, con los palos en el orden de
+PALOS. Sobre esos ids hay tres codificaciones:
+
+- Índice de permutación (código de Lehmer): el número del reparto entre
+  las 52! posibles, en BYTES_PERMUTACION (29) bytes big-endian. Es la más
+  compacta que distingue todos los repartos y ordenar los bytes es ordenar
+  los índices.
+- Ids empaquetados a 6 bits: 39 bytes, sin aritmética de enteros grandes.
+- Clave de valores: solo la secuencia de valores a 4 bits (26 bytes). El
+  resultado de una partida depende solo de los valores, así que dos
+  repartos con la misma clave se juegan igual; sirve para deduplicar.
+
+canonico_palos() renombra los palos por orden de aparición: los 24
+repartos que solo difieren en una permutación de palos comparten forma
+canónica y, por tanto, índice de permutación.
+
+Las funciones escalares son Python puro (las usa el juego); las
+terminadas en _vectorizado trabajan con matrices NumPy de forma
+(repartos, 52) para millones de repartos a la vez. NumPy es opcional:
+solo lo necesitan estas últimas.
+
+Uso:
+    ids = [id_canonico(carta.nombre_archivo) for carta in orden_reparto]
+    codigo = a_bytes(ids)                 # 29 bytes
+    assert desde_bytes(codigo) == ids
+    clave = clave_valores(ids)            # 26 bytes, igual para repartos equivalentes
+"""
+from math import factorial
+
+try:
+    import numpy as np
+except ImportError:  # NumPy solo es necesario para las funciones vectorizadas
+    np = None
+
+from reglas import NUM_RANGOS, NUM_PALOS, valor_de_nombre
+
+PALOS = ('corazon', 'diamante', 'picas', 'trebol')  # Orden canónico de los palos
+NUM_CARTAS = NUM_RANGOS * NUM_PALOS
+BYTES_PERMUTACION = (factorial(NUM_CARTAS).bit_length() + 7) // 8  # 29
+BYTES_6BITS = (NUM_CARTAS * 6 + 7) // 8                             # 39
+BYTES_VALORES = (NUM_CARTAS + 1) // 2                               # 26
+
+_BITS_LIMB = 32  # Enteros grandes vectorizados: limbs de 32 bits en uint64
+_LIMBS = (BYTES_PERMUTACION + 3) // 4
+_MASCARA_LIMB = (1 << _BITS_LIMB) - 1
+
+
+def id_canonico(nombre_archivo):
+    """
+    Id canónico (0..51) de una carta a partir de su nombre de archivo,
+    p. ej. '10picas.png' o 'Qcorazon.png'.
+    """
+    palo = nombre_archivo.lower().rsplit('.', 1)[0].lstrip('0123456789ajqk')
+    return (valor_de_nombre(nombre_archivo) - 1) * NUM_PALOS + PALOS.index(palo)
+
+
+def valor_de_id(id_carta):
+    """
+    Valor (1..13) de la carta con el id canónico dado.
+    """
+    return id_carta // NUM_PALOS + 1
+
+
+def _comprobar_permutacion(ids):
+    if sorted(ids) != list(range(NUM_CARTAS)):
+        raise ValueError(f"Se esperaba un orden de las {NUM_CARTAS} cartas, cada una una vez")
+
+
+def indice_permutacion(ids):
+    """
+    Índice (0 .. 52! - 1) del orden dado, según su código de Lehmer.
+    """
+    _comprobar_permutacion(ids)
+    restantes = list(range(NUM_CARTAS))
+    indice = 0
+    for i, id_carta in enumerate(ids):
+        posicion = restantes.index(id_carta)
+        del restantes[posicion]
+        indice = indice * (NUM_CARTAS - i) + posicion
+    return indice
+
+
+def permutacion_de_indice(indice):
+    """
+    Inversa de indice_permutacion: el orden de ids con ese índice.
+    """
+    if not 0 <= indice < factorial(NUM_CARTAS):
+        raise ValueError(f"Índice de permutación fuera de rango: {indice}")
+    digitos = []
+    for base in range(1, NUM_CARTAS + 1):
+        indice, digito = divmod(indice, base)
+        digitos.append(digito)
+    restantes = list(range(NUM_CARTAS))
+    return [restantes.pop(digito) for digito in reversed(digitos)]
+
+
+def a_bytes(ids):
+    """
+    Orden de las cartas como índice de permutación en BYTES_PERMUTACION bytes.
+    """
+    return indice_permutacion(ids).to_bytes(BYTES_PERMUTACION, 'big')
+
+
+def desde_bytes(datos):
+    """
+    Inversa de a_bytes.
+    """
+    if len(datos) != BYTES_PERMUTACION:
+        raise ValueError(f"Un reparto codificado ocupa {BYTES_PERMUTACION} bytes, no {len(datos)}")
+    return permutacion_de_indice(int.from_bytes(datos, 'big'))
+
+
+def empaquetar_6bits(ids):
+    """
+    Ids de 0 a 63 empaquetados a 6 bits, el primero en los bits altos.
+    """
+    numero = 0
+    for id_carta in ids:
+        if not 0 <= id_carta < 64:
+            raise ValueError(f"Id de carta fuera de rango para 6 bits: {id_carta}")
+        numero = (numero << 6) | id_carta
+    relleno = -len(ids) * 6 % 8
+    return (numero << relleno).to_bytes((len(ids) * 6 + relleno) // 8, 'big')
+
+
+def desempaquetar_6bits(datos, cantidad=NUM_CARTAS):
+    """
+    Inversa de empaquetar_6bits para las primeras cantidad cartas.
+    """
+    numero = int.from_bytes(datos, 'big') >> (len(datos) * 8 - cantidad * 6)
+    return [(numero >> (6 * (cantidad - 1 - i))) & 0x3F for i in range(cantidad)]
+
+
+def canonico_palos(ids):
+    """
+    Renombra los palos por orden de aparición: el primer palo que sale pasa
+    a ser PALOS[0], el segundo PALOS[1]... Los repartos que solo difieren
+    en una permutación de palos dan el mismo resultado.
+    """
+    nuevo_palo = {}
+    canonico = []
+    for id_carta in ids:
+        palo = nuevo_palo.setdefault(id_carta % NUM_PALOS, len(nuevo_palo))
+        canonico.append(id_carta - id_carta % NUM_PALOS + palo)
+    return canonico
+
+
+def clave_valores(ids):
+    """
+    Secuencia de valores del reparto a 4 bits por carta (BYTES_VALORES
+    bytes). Dos repartos con la misma clave se juegan exactamente igual.
+    """
+    valores = [valor_de_id(id_carta) for id_carta in ids]
+    if len(valores) % 2:
+        valores.append(0)
+    return bytes((a << 4) | b for a, b in zip(valores[::2], valores[1::2]))
+
+
+def _necesita_numpy():
+    if np is None:
+        raise ImportError("Las funciones vectorizadas de repartos necesitan NumPy")
+
+
+def _grupos_de_bases(bases):
+    """
+    Agrupa bases consecutivas mientras su producto quepa en 31 bits, para
+    multiplicar o dividir los enteros grandes por varias a la vez.
+    """
+    grupos, actual, producto = [], [], 1
+    for base in bases:
+        if producto * base >= 1 << 31:
+            grupos.append((actual, producto))
+            actual, producto = [], 1
+        actual.append(base)
+        producto *= base
+    grupos.append((actual, producto))
+    return grupos
+
+
+def digitos_lehmer_vectorizado(mazos):
+    """
+    Código de Lehmer de cada fila: cuántas de las cartas siguientes tienen
+    un id menor. Devuelve una matriz int64 de la misma forma.
+    """
+    _necesita_numpy()
+    mazos = np.asarray(mazos)
+    digitos = np.zeros(mazos.shape, dtype=np.int64)
+    for i in range(mazos.shape[1] - 1):
+        digitos[:, i] = (mazos[:, i + 1:] < mazos[:, i:i + 1]).sum(axis=1)
+    return digitos
+
+
+def a_bytes_vectorizado(mazos):
+    """
+    a_bytes para cada fila de mazos (repartos x 52 ids). Devuelve una
+    matriz uint8 de repartos x BYTES_PERMUTACION.
+    """
+    digitos = digitos_lehmer_vectorizado(mazos)
+    limbs = np.zeros((len(digitos), _LIMBS), dtype=np.uint64)
+    posicion = 0
+    # Horner en base mixta: indice = indice * (52 - i) + digito[i], varias bases a la vez
+    for bases, producto in _grupos_de_bases(range(NUM_CARTAS, 0, -1)):
+        sumando = np.zeros(len(digitos), dtype=np.int64)
+        for base in bases:
+            sumando = sumando * base + digitos[:, posicion]
+            posicion += 1
+        limbs *= np.uint64(producto)
+        limbs[:, 0] += sumando.astype(np.uint64)
+        for k in range(_LIMBS - 1):
+            limbs[:, k + 1] += limbs[:, k] >> np.uint64(_BITS_LIMB)
+            limbs[:, k] &= np.uint64(_MASCARA_LIMB)
+    grande = limbs[:, ::-1].astype('>u4').view(np.uint8)
+    return grande[:, grande.shape[1] - BYTES_PERMUTACION:]
+
+
+def desde_bytes_vectorizado(codigos):
+    """
+    Inversa de a_bytes_vectorizado: matriz int64 de repartos x 52 ids.
+    """
+    _necesita_numpy()
+    codigos = np.asarray(codigos, dtype=np.uint8)
+    if codigos.ndim != 2 or codigos.shape[1] != BYTES_PERMUTACION:
+        raise ValueError(f"Se esperaba una matriz de repartos x {BYTES_PERMUTACION} bytes")
+    relleno = np.zeros((len(codigos), _LIMBS * 4 - BYTES_PERMUTACION), dtype=np.uint8)
+    grande = np.ascontiguousarray(np.hstack([relleno, codigos]))
+    limbs = grande.view('>u4')[:, ::-1].astype(np.uint64)
+
+    # Los dígitos salen del menos significativo (base 1) al más (base 52)
+    digitos = np.zeros((len(codigos), NUM_CARTAS), dtype=np.int64)
+    posicion = NUM_CARTAS
+    for bases, producto in _grupos_de_bases(range(1, NUM_CARTAS + 1)):
+        resto = np.zeros(len(codigos), dtype=np.uint64)
+        divisor = np.uint64(producto)
+        for k in range(_LIMBS - 1, -1, -1):
+            actual = (resto << np.uint64(_BITS_LIMB)) | limbs[:, k]
+            limbs[:, k] = actual // divisor
+            resto = actual % divisor
+        resto = resto.astype(np.int64)
+        for base in bases:
+            posicion -= 1
+            resto, digitos[:, posicion] = np.divmod(resto, base)
+    if limbs.any():
+        raise ValueError("Índice de permutación fuera de rango")
+
+    # De atrás hacia delante: cada carta toma su dígito y las que van detrás
+    # con un id igual o mayor suben uno, como si se hubiera sacado de la lista
+    mazos = digitos
+    for i in range(NUM_CARTAS - 2, -1, -1):
+        detras = mazos[:, i + 1:]
+        detras += detras >= mazos[:, i:i + 1]
+    return mazos
+
+
+def empaquetar_6bits_vectorizado(mazos):
+    """
+    empaquetar_6bits para cada fila: matriz uint8 de repartos x 39 bytes
+    (para 52 cartas).
+    """
+    _necesita_numpy()
+    mazos = np.asarray(mazos, dtype=np.uint32)
+    ancho = (mazos.shape[1] * 6 + 7) // 8
+    sobran = -mazos.shape[1] % 4
+    if sobran:
+        mazos = np.hstack([mazos, np.zeros((len(mazos), sobran), dtype=np.uint32)])
+    # Cada 4 ids de 6 bits forman 3 bytes
+    a, b, c, d = (mazos[:, i::4] for i in range(4))
+    bloque = (a << 18) | (b << 12) | (c << 6) | d
+    bytes_ = np.stack([bloque >> 16, (bloque >> 8) & 0xFF, bloque & 0xFF], axis=2).astype(np.uint8)
+    return bytes_.reshape(len(mazos), -1)[:, :ancho]
+
+
+def desempaquetar_6bits_vectorizado(datos, cantidad=NUM_CARTAS):
+    """
+    Inversa de empaquetar_6bits_vectorizado: matriz int64 de repartos x cantidad.
+    """
+    _necesita_numpy()
+    datos = np.asarray(datos, dtype=np.uint8)
+    sobran = -datos.shape[1] % 3
+    if sobran:
+        datos = np.hstack([datos, np.zeros((len(datos), sobran), dtype=np.uint8)])
+    bytes_ = datos.reshape(len(datos), -1, 3).astype(np.int64)
+    bloque = (bytes_[:, :, 0] << 16) | (bytes_[:, :, 1] << 8) | bytes_[:, :, 2]
+    ids = np.stack([bloque >> 18, (bloque >> 12) & 0x3F, (bloque >> 6) & 0x3F, bloque & 0x3F], axis=2)
+    return ids.reshape(len(datos), -1)[:, :cantidad]
+
+
+def canonico_palos_vectorizado(mazos):
+    """
+    canonico_palos para cada fila de mazos.
+    """
+    _necesita_numpy()
+    mazos = np.asarray(mazos, dtype=np.int64)
+    palos = mazos % NUM_PALOS
+    # Posición de la primera aparición de cada palo; los que no salen, al final
+    primera = np.full((len(mazos), NUM_PALOS), mazos.shape[1], dtype=np.int64)
+    for palo in range(NUM_PALOS):
+        aparece = palos == palo
+        primera[:, palo] = np.where(aparece.any(axis=1), np.argmax(aparece, axis=1), mazos.shape[1])
+    nuevo_palo = np.argsort(np.argsort(primera, axis=1, kind='stable'), axis=1)
+    return mazos - palos + np.take_along_axis(nuevo_palo, palos, axis=1)
+
+
+def clave_valores_vectorizado(mazos):
+    """
+    clave_valores para cada fila: matriz uint8 de repartos x 26 bytes.
+    """
+    _necesita_numpy()
+    valores = np.asarray(mazos, dtype=np.int64) // NUM_PALOS + 1
+    if valores.shape[1] % 2:
+        valores = np.hstack([valores, np.zeros((len(valores), 1), dtype=np.int64)])
+    return ((valores[:, ::2] << 4) | valores[:, 1::2]).astype(np.uint8)
@@ -0,0 +1,194 @@
+"""
+Modelo de mezcla tipo riffle (hojeo).
+
+La mezcla del juego divide el mazo en dos mitades y las intercala soltando
+paquetes alternos de 1 a 3 cartas, empezando por la mitad izquierda. Este
+módulo implementa esa misma lógica de paquetes en dos formas:
+
+- paquetes_riffle: versión en Python puro que usa Juego.mezclar_hojeo.
+- riffles_vectorizados: versión con NumPy para mezclar millones de mazos
+  a la vez, con el modelo de paquetes o con el de Gilbert-Shannon-Reeds.
+
+El modelo de paquetes siempre suelta primero la carta superior de la mitad
+izquierda, así que esa carta nunca cambia de sitio por muchos riffles que
+se hagan (benchmark.py riffle lo muestra). Por eso la mezcla física del
+juego usa paquetes_gsr, que corta y suelta como Gilbert-Shannon-Reeds.
+
+NumPy es opcional: solo lo necesitan las funciones vectorizadas.
+"""
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy solo es necesario para las funciones vectorizadas
+    np = None
+
+from reglas import NUM_RANGOS
+
+PAQUETE_MIN = 1  # Cartas mínimas por paquete soltado
+PAQUETE_MAX = 3  # Cartas máximas por paquete soltado
+
+
+def paquetes_riffle(mazo_izquierdo, mazo_derecho, rng=random):
+    """
+    Intercala dos mitades soltando paquetes alternos de PAQUETE_MIN a
+    PAQUETE_MAX cartas. Devuelve una lista de (carta, lado) en el orden en
+    que caen, con lado 'izquierda' o 'derecha'. No modifica las mitades.
+    """
+    izquierdo = list(mazo_izquierdo)
+    derecho = list(mazo_derecho)
+    caidas = []
+    while izquierdo or derecho:
+        if izquierdo:
+            cant = rng.randint(PAQUETE_MIN, min(PAQUETE_MAX, len(izquierdo)))
+            caidas.extend((carta, 'izquierda') for carta in izquierdo[:cant])
+            del izquierdo[:cant]
+        if derecho:
+            cant = rng.randint(PAQUETE_MIN, min(PAQUETE_MAX, len(derecho)))
+            caidas.extend((carta, 'derecha') for carta in derecho[:cant])
+            del derecho[:cant]
+    return caidas
+
+
+def riffle(mazo, rng=random):
+    """
+    Hace un riffle completo del mazo (corte por la mitad, igual que el
+    juego) y devuelve el nuevo orden.
+    """
+    mitad = len(mazo) // 2
+    return [carta for carta, _ in paquetes_riffle(mazo[:mitad], mazo[mitad:], rng)]
+
+
+def paquetes_gsr(mazo, rng=random):
+    """
+    Riffle de Gilbert-Shannon-Reeds: corta el mazo en una posición binomial
+    y suelta cada carta de una mitad con probabilidad proporcional a las
+    cartas que le quedan. Devuelve una lista de (carta, lado) en el orden en
+    que caen, igual que paquetes_riffle.
+    """
+    corte = sum(rng.random() < 0.5 for _ in mazo)
+    izquierdo = list(mazo[:corte])
+    derecho = list(mazo[corte:])
+    caidas = []
+    while izquierdo or derecho:
+        if rng.random() * (len(izquierdo) + len(derecho)) < len(izquierdo):
+            caidas.append((izquierdo.pop(0), 'izquierda'))
+        else:
+            caidas.append((derecho.pop(0), 'derecha'))
+    return caidas
+
+
+# VERSIÓN VECTORIZADA (NumPy)
+
+def _requiere_numpy():
+    if np is None:
+        raise RuntimeError("Las funciones vectorizadas de riffle necesitan NumPy (pip install numpy)")
+
+
+def _tipo_indice(n):
+    """
+    Tipo entero más pequeño capaz de indexar un mazo de n cartas.
+    """
+    return np.int16 if n < np.iinfo(np.int16).max else np.int32
+
+
+def _lados_paquetes(num_mazos, n_izq, n_der, rng):
+    """
+    Devuelve una matriz (num_mazos, n_izq + n_der) con el lado de cada
+    carta soltada (0 = izquierda, 1 = derecha) siguiendo la lógica de
+    paquetes_riffle. Las rondas se recorren en Python y los mazos en NumPy.
+    """
+    tipo = _tipo_indice(n_izq + n_der)
+    restantes = [np.full(num_mazos, n_izq, dtype=tipo), np.full(num_mazos, n_der, dtype=tipo)]
+    tamanos = []
+    while restantes[0].any() or restantes[1].any():
+        for lado in (0, 1):
+            rest = restantes[lado]
+            tope = np.minimum(PAQUETE_MAX, rest)
+            # Igual que randint(PAQUETE_MIN, tope): uniforme entre 1 y tope
+            cant = (rng.random(num_mazos, dtype=np.float32) * (tope - PAQUETE_MIN + 1)).astype(tipo)
+            cant += PAQUETE_MIN
+            cant[rest == 0] = 0
+            rest -= cant
+            tamanos.append(cant)
+    # Cada fila de tamaños suma exactamente el tamaño del mazo, así que
+    # repetir el lado de cada paquete da directamente la matriz de lados.
+    tamanos = np.stack(tamanos, axis=1)
+    patron = np.tile(np.array([0, 1], dtype=np.int8), tamanos.size // 2)
+    return np.repeat(patron, tamanos.ravel()).reshape(num_mazos, n_izq + n_der)
+
+
+def _intercalar(mazos, lados):
+    """
+    Aplica a cada fila de mazos el intercalado indicado por lados. Las
+    cartas con lado 0 salen de la primera parte del mazo (tantas como ceros
+    haya en la fila) y las de lado 1 de la segunda, respetando el orden.
+    """
+    n = mazos.shape[1]
+    izquierda = lados == 0
+    # Cartas izquierdas soltadas hasta cada posición (incluida)
+    izquierdas = np.cumsum(izquierda, axis=1, dtype=_tipo_indice(n))
+    origen = izquierdas - 1
+    # Una carta derecha en la posición j es la número j - izquierdas de su mitad
+    derecho = izquierdas[:, -1:] + np.arange(n, dtype=izquierdas.dtype) - izquierdas
+    np.copyto(origen, derecho, where=~izquierda)
+    return np.take_along_axis(mazos, origen, axis=1)
+
+
+def riffles_vectorizados(mazos, num_riffles=1, modelo='paquetes', rng=None):
+    """
+    Aplica num_riffles riffles a cada fila de la matriz mazos (ids de carta)
+    y devuelve una matriz nueva con el resultado.
+
+    modelo='paquetes' usa la lógica del juego (corte por la mitad y
+    paquetes de 1 a 3). modelo='gsr' usa Gilbert-Shannon-Reeds: corte
+    binomial e intercalado proporcional al tamaño de cada mitad, que
+    equivale a asignar cada posición a una mitad con probabilidad 1/2.
+    """
+    _requiere_numpy()
+    rng = np.random.default_rng() if rng is None else rng
+    mazos = np.asarray(mazos)
+    num_mazos, n = mazos.shape
+    for _ in range(num_riffles):
+        if modelo == 'paquetes':
+            lados = _lados_paquetes(num_mazos, n // 2, n - n // 2, rng)
+        elif modelo == 'gsr':
+            # Un bit aleatorio por posición: cada intercalado es igual de probable
+            bytes_aleatorios = rng.integers(0, 256, size=(num_mazos, (n + 7) // 8), dtype=np.uint8)
+            lados = np.unpackbits(bytes_aleatorios, axis=1, count=n)
+        else:
+            raise ValueError(f"Modelo de riffle desconocido: {modelo}")
+        mazos = _intercalar(mazos, lados)
+    return mazos
+
+
+def cartas_volteadas_vectorizado(valores, num_rangos=NUM_RANGOS):
+    """
+    Juega una partida por fila de la matriz valores (1..num_rangos, en orden
+    de reparto) y devuelve cuántas cartas se voltearon en cada una. Una
+    partida ganada voltea todas las cartas. Mismas reglas que
+    reglas.simular_partida.
+    """
+    _requiere_numpy()
+    valores = np.asarray(valores)
+    num_mazos, n = valores.shape
+    filas = np.arange(num_mazos)
+    boca_abajo = np.zeros((num_mazos, num_rangos), dtype=np.int64)
+    for pila in range(num_rangos):
+        boca_abajo[:, pila] = len(range(pila, n, num_rangos))
+    pila_actual = np.full(num_mazos, num_rangos - 1, dtype=np.int64)
+    volteadas = np.zeros(num_mazos, dtype=np.int64)
+    activas = np.ones(num_mazos, dtype=bool)
+    for _ in range(n):
+        restantes = boca_abajo[filas, pila_actual]
+        activas &= restantes > 0
+        if not activas.any():
+            break
+        # La carta superior boca abajo de la pila p ocupa el reparto
+        # (restantes - 1) * num_rangos + p
+        indice = np.where(activas, (restantes - 1) * num_rangos + pila_actual, 0)
+        valor = valores[filas, indice]
+        boca_abajo[filas, pila_actual] -= activas
+        volteadas += activas
+        pila_actual = np.where(activas, valor - 1, pila_actual)
+    return volteadas
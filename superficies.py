@@ -0,0 +1,97 @@
+"""
+Preparación de superficies para que cada blit use el camino más rápido.
+
+Cada imagen se clasifica según su canal alfa y se convierte al formato de
+pantalla que le corresponde:
+
+- opaca: convert(), blit directo sin mezcla de alfa.
+- binaria (solo píxeles totalmente opacos o totalmente transparentes):
+  convert() con color clave y RLEACCEL.
+- translúcida: convert_alpha() con RLEACCEL, que salta las zonas
+  transparentes y copia las opacas sin mezclar.
+
+El formato 'premultiplicado' (alfa premultiplicado, blit con
+BLEND_PREMULTIPLIED) está disponible para comparar en
+"python benchmark.py superficies", pero no se elige por defecto: con el SDL
+actual es más lento que el alfa con RLE y obliga a cambiar cada blit.
+"""
+import pygame
+
+COLOR_CLAVE = (255, 0, 255)  # Color clave para imágenes con alfa binario
+
+OPACO = 'opaco'
+CLAVE = 'clave'
+ALFA = 'alfa'
+ALFA_RLE = 'alfa_rle'
+PREMULTIPLICADO = 'premultiplicado'
+
+# Flags de blit que necesita cada formato
+FLAGS_BLIT = {PREMULTIPLICADO: getattr(pygame, 'BLEND_PREMULTIPLIED', 0)}
+
+
+def clasificar_alfa(superficie):
+    """
+    Devuelve 'opaca', 'binaria' o 'translucida' según el canal alfa.
+    """
+    if not superficie.get_flags() & pygame.SRCALPHA:
+        return 'opaca'
+    ancho, alto = superficie.get_size()
+    opacos = pygame.mask.from_surface(superficie, 254).count()  # alfa == 255
+    if opacos == ancho * alto:
+        return 'opaca'
+    visibles = pygame.mask.from_surface(superficie, 0).count()  # alfa > 0
+    return 'binaria' if visibles == opacos else 'translucida'
+
+
+def _color_clave_libre(superficie):
+    """
+    Devuelve True si ningún píxel opaco usa COLOR_CLAVE.
+    """
+    opacos = pygame.mask.from_surface(superficie, 254)
+    con_clave = pygame.mask.from_threshold(superficie, COLOR_CLAVE + (255,), (1, 1, 1, 255))
+    return opacos.overlap_area(con_clave, (0, 0)) == 0
+
+
+def elegir_formato(superficie):
+    """
+    Devuelve el formato más rápido para una superficie con alfa por píxel.
+    """
+    clase = clasificar_alfa(superficie)
+    if clase == 'opaca':
+        return OPACO
+    if clase == 'binaria' and _color_clave_libre(superficie):
+        return CLAVE
+    return ALFA_RLE
+
+
+def preparar_superficie(superficie, formato):
+    """
+    Convierte una superficie al formato de pantalla indicado.
+    """
+    if formato == OPACO:
+        return superficie.convert()
+    if formato == CLAVE:
+        resultado = superficie.convert()
+        transparentes = pygame.mask.from_surface(superficie, 254)
+        transparentes.invert()
+        transparentes.to_surface(resultado, setcolor=COLOR_CLAVE, unsetcolor=None)
+        resultado.set_colorkey(COLOR_CLAVE, pygame.RLEACCEL)
+        return resultado
+    if formato == ALFA:
+        return superficie.convert_alpha()
+    if formato == ALFA_RLE:
+        resultado = superficie.convert_alpha()
+        resultado.set_alpha(255, pygame.RLEACCEL)
+        return resultado
+    if formato == PREMULTIPLICADO:
+        return superficie.convert_alpha().premul_alpha()
+    raise ValueError(f"Formato de superficie desconocido: {formato}")
+
+
+def optimizar_superficie(superficie):
+    """
+    Elige el formato más rápido para la superficie y la convierte.
+    Devuelve (superficie_convertida, formato).
+    """
+    formato = elegir_formato(superficie)
+    return preparar_superficie(superficie, formato), formato
@@ -0,0 +1,214 @@
+"""
+Motor de dibujo alternativo con texturas de SDL2 (pygame._sdl2.video).
+
+PantallaTexturas se pasa a Juego.draw en lugar de la superficie de la
+ventana: imita la parte de pygame.Surface que usa el dibujo del juego
+(blit, fill, get_size...) pero cada imagen se sube una sola vez como
+textura y cada blit es una copia de textura, que SDL agrupa en lotes
+(SDL_RENDER_BATCHING). Las caras y reversos de las cartas van juntos en un
+atlas, una sola textura. Funciona también con el renderer de software de
+SDL, así que se puede probar en máquinas sin GPU.
+
+Las superficies se identifican por su contenido: los reversos copiados de
+cada carta comparten una textura y los textos que se vuelven a renderizar
+igual en cada fotograma no se vuelven a subir. Una superficie no debe
+modificarse después de dibujarla por primera vez.
+
+Para los rectángulos y líneas, el dibujo del juego llama a rectangulo() y
+linea() de este módulo, que sirven para los dos motores. Los bordes
+redondeados se dibujan rectos con texturas.
+"""
+import os
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+try:
+    from pygame._sdl2 import video
+except ImportError:  # pygame sin el módulo _sdl2
+    video = None
+
+MAX_TEXTURAS = 256  # Texturas sueltas (textos, etc.) que se conservan
+ANCHO_ATLAS = 2048
+SEPARACION = 2      # Píxeles vacíos entre imágenes del atlas
+
+
+def disponible():
+    return video is not None
+
+
+def rectangulo(destino, color, rect, ancho=0, border_radius=0):
+    """
+    pygame.draw.rect para una superficie o una PantallaTexturas.
+    """
+    if isinstance(destino, pygame.Surface):
+        return pygame.draw.rect(destino, color, rect, ancho, border_radius=border_radius)
+    return destino.rectangulo(color, rect, ancho)
+
+
+def linea(destino, color, inicio, fin, ancho=1):
+    """
+    pygame.draw.line para una superficie o una PantallaTexturas.
+    """
+    if isinstance(destino, pygame.Surface):
+        return pygame.draw.line(destino, color, inicio, fin, ancho)
+    return destino.linea(color, inicio, fin, ancho)
+
+
+def _clave(superficie):
+    return superficie.get_size(), hash(pygame.image.tobytes(superficie, 'RGBA'))
+
+
+class PantallaTexturas:
+    def __init__(self, size, titulo="Juego de Cartas", acelerado=True, ventana=None):
+        """
+        Crea la ventana y su Renderer. Con acelerado=False se usa el
+        renderer de software de SDL. Con ventana se dibuja en una ya creada.
+        """
+        if video is None:
+            raise RuntimeError("pygame._sdl2.video no está disponible en esta versión de pygame")
+        os.environ.setdefault("SDL_RENDER_BATCHING", "1")
+        self.size = tuple(size)
+        self.ventana = ventana or video.Window(titulo, self.size)
+        self.renderer = video.Renderer(self.ventana, accelerated=1 if acelerado else 0)
+        self._por_objeto = {}           # id(superficie) -> (weakref, textura, origen)
+        self._atlas = {}                # contenido -> (textura, origen), fijas
+        self._sueltas = OrderedDict()   # contenido -> (textura, origen), las menos usadas salen primero
+        self.subidas = 0                # Texturas creadas, para el benchmark
+
+    # Interfaz de pygame.Surface que usa el dibujo del juego
+
+    def get_size(self):
+        return self.size
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def get_rect(self, **kwargs):
+        rect = pygame.Rect((0, 0), self.size)
+        for nombre, valor in kwargs.items():
+            setattr(rect, nombre, valor)
+        return rect
+
+    def fill(self, color, rect=None):
+        self.renderer.draw_color = pygame.Color(color)
+        if rect is None:
+            self.renderer.clear()
+        else:
+            self.renderer.fill_rect(pygame.Rect(rect))
+
+    def blit(self, superficie, destino, area=None, special_flags=0):
+        textura, origen = self.textura(superficie)
+        if area is not None:
+            area = pygame.Rect(area).clip(pygame.Rect((0, 0), origen.size))
+            origen = area.move(origen.topleft)
+        if isinstance(destino, pygame.Rect):
+            x, y = destino.topleft
+        else:
+            x, y = destino[0], destino[1]
+        textura.draw(srcrect=origen, dstrect=(x, y, origen.width, origen.height))
+        return pygame.Rect(int(x), int(y), origen.width, origen.height)
+
+    # Dibujo de formas
+
+    def rectangulo(self, color, rect, ancho=0):
+        rect = pygame.Rect(rect)
+        self.renderer.draw_color = pygame.Color(color)
+        if ancho <= 0:
+            self.renderer.fill_rect(rect)
+            return rect
+        # Igual que pygame.draw.rect, el borde crece hacia dentro
+        for i in range(ancho):
+            self.renderer.draw_rect(rect.inflate(-2 * i, -2 * i))
+        return rect
+
+    def linea(self, color, inicio, fin, ancho=1):
+        self.renderer.draw_color = pygame.Color(color)
+        (x1, y1), (x2, y2) = inicio, fin
+        vertical = abs(x2 - x1) < abs(y2 - y1)
+        for i in range(ancho):
+            desplazamiento = i - (ancho - 1) // 2
+            if vertical:
+                self.renderer.draw_line((x1 + desplazamiento, y1), (x2 + desplazamiento, y2))
+            else:
+                self.renderer.draw_line((x1, y1 + desplazamiento), (x2, y2 + desplazamiento))
+        return pygame.Rect(min(x1, x2), min(y1, y2), abs(x2 - x1) + 1, abs(y2 - y1) + 1)
+
+    def flip(self):
+        self.renderer.present()
+
+    def to_surface(self):
+        """
+        Copia lo dibujado a una superficie (para comparar los dos motores).
+        """
+        return self.renderer.to_surface()
+
+    # Texturas
+
+    def registrar_atlas(self, superficies):
+        """
+        Sube de una vez las superficies indicadas (caras y reversos de las
+        cartas) en una sola textura. Las repetidas ocupan un solo hueco.
+        """
+        claves = [(_clave(superficie), superficie) for superficie in superficies]
+        unicas = {}
+        for clave, superficie in claves:
+            if clave not in self._atlas and clave not in unicas:
+                unicas[clave] = superficie
+        if unicas:
+            self._subir_atlas(unicas)
+        for clave, superficie in claves:
+            self._recordar(superficie, self._atlas[clave])
+
+    def _subir_atlas(self, unicas):
+        # Estantes: filas de izquierda a derecha, de la altura de la imagen más alta
+        huecos = []
+        x = y = alto_fila = 0
+        for clave, superficie in unicas.items():
+            ancho, alto = superficie.get_size()
+            if x and x + ancho > ANCHO_ATLAS:
+                x, y, alto_fila = 0, y + alto_fila + SEPARACION, 0
+            huecos.append((clave, superficie, pygame.Rect(x, y, ancho, alto)))
+            x += ancho + SEPARACION
+            alto_fila = max(alto_fila, alto)
+        atlas = pygame.Surface((max(h.right for _, _, h in huecos), y + alto_fila), pygame.SRCALPHA)
+        for _, superficie, hueco in huecos:
+            # Copia exacta, con el color clave convertido en alfa, sin mezclar
+            atlas.blit(superficie.convert_alpha(), hueco, special_flags=pygame.BLEND_RGBA_MAX)
+        textura = video.Texture.from_surface(self.renderer, atlas)
+        textura.blend_mode = 1  # SDL_BLENDMODE_BLEND
+        self.subidas += 1
+        for clave, superficie, hueco in huecos:
+            self._atlas[clave] = (textura, hueco)
+
+    def textura(self, superficie):
+        """
+        Devuelve (textura, rectángulo de origen) de la superficie, subiéndola
+        si su contenido no está ya en el atlas ni entre las texturas sueltas.
+        """
+        entrada = self._por_objeto.get(id(superficie))
+        if entrada is not None and entrada[0]() is superficie:
+            return entrada[1]
+        clave = _clave(superficie)
+        encontrada = self._atlas.get(clave) or self._sueltas.get(clave)
+        if encontrada is None:
+            encontrada = (video.Texture.from_surface(self.renderer, superficie),
+                          pygame.Rect((0, 0), superficie.get_size()))
+            self.subidas += 1
+            self._sueltas[clave] = encontrada
+            if len(self._sueltas) > MAX_TEXTURAS:
+                self._sueltas.popitem(last=False)
+        elif clave in self._sueltas:
+            self._sueltas.move_to_end(clave)
+        self._recordar(superficie, encontrada)
+        return encontrada
+
+    def _recordar(self, superficie, entrada):
+        if len(self._por_objeto) > 4 * MAX_TEXTURAS:
+            # Olvidar las superficies que ya no existen
+            self._por_objeto = {k: v for k, v in self._por_objeto.items() if v[0]() is not None}
+        self._por_objeto[id(superficie)] = (weakref.ref(superficie), entrada)
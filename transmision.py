@@ -0,0 +1,411 @@
+"""
+Transmisión de la mesa a espectadores con mensajes binarios compactos.
+
+El juego solo mete en una cola el cambio que acaba de ocurrir (reparto,
+jugada, fase del modo automático, pregunta, resultado); un hilo de fondo
+lo aplica a su propia copia de la mesa, lo codifica una vez y lo reparte a
+todos los espectadores conectados por TCP. Al conectarse, cada espectador
+recibe los nombres de las cartas y una foto completa de la mesa, y después
+solo los cambios: una jugada ocupa 6 bytes. El bucle de dibujo no
+interviene y nunca se envían fotogramas.
+
+Cada mensaje es su longitud (varint) seguida de un byte de tipo y sus
+datos en little endian. Los identificadores de carta son los de
+Juego.cartas_por_id; en la foto, el bit VOLTEADA marca las cartas boca arriba.
+
+Un espectador que no lee (más de MAX_PENDIENTE bytes sin enviar) se
+desconecta para no acumular memoria; al volver recibe otra foto.
+
+Uso:
+    transmision.iniciar(9110, [carta.nombre_archivo for carta in juego.cartas_por_id])
+    transmision.evento('jugada', id_carta, origen, destino)
+    transmision.fase(juego.estado, juego._auto_fase)
+    transmision.detener()
+
+Mientras no se llame a iniciar, evento y fase no hacen nada. El visor
+está en espectador.py.
+"""
+import queue
+import selectors
+import socket
+import struct
+import threading
+
+PUERTO = 9110
+NUM_PILAS = 13
+MAX_PENDIENTE = 256 * 1024  # bytes por espectador antes de desconectarlo
+VOLTEADA = 0x8000           # Bit de carta boca arriba en la foto
+
+# Tipos de mensaje
+CARTAS, FOTO, RECOGER, REPARTO, JUGADA, FASE, PREGUNTA, FIN = range(1, 9)
+TIPOS = {'cartas': CARTAS, 'foto': FOTO, 'recoger': RECOGER, 'reparto': REPARTO,
+         'jugada': JUGADA, 'fase': FASE, 'pregunta': PREGUNTA, 'fin': FIN}
+# Fases del modo automático (Juego._auto_fase), por su código
+FASES = (None, 'pregunta', 'mezclar', 'repartir', 'esperando_reparto', 'jugar')
+
+_FOTO = struct.Struct('<IBBBB')   # semilla, estado, fase, resultado, pilas
+_JUGADA = struct.Struct('<HBB')   # carta, pila de origen, pila de destino
+_FASE = struct.Struct('<BB')      # estado, fase
+_FIN = struct.Struct('<BHH')      # victoria, volteadas, total
+_SIN_RESULTADO = 2
+
+_cola = None
+_despertador = None
+_hilo = None
+_ultima_fase = None
+
+
+def evento(nombre, *datos):
+    """
+    Encola un cambio de la mesa. Es lo único que se hace en el hilo del juego.
+    """
+    if _cola is not None:
+        _cola.put((TIPOS[nombre], datos))
+        _despertar()
+
+
+def fase(estado, fase_auto):
+    """
+    Anuncia la pantalla y la fase del modo automático si cambiaron desde la
+    última llamada. Se puede llamar en cada fotograma.
+    """
+    global _ultima_fase
+    if _cola is not None and (estado, fase_auto) != _ultima_fase:
+        _ultima_fase = (estado, fase_auto)
+        evento('fase', estado, fase_auto)
+
+
+def _despertar():
+    try:
+        _despertador.send(b'\0')
+    except OSError:
+        pass  # El buffer ya tiene un aviso pendiente
+
+
+def iniciar(puerto, nombres_cartas, host="127.0.0.1"):
+    """
+    Empieza a aceptar espectadores en el puerto. Sin puerto no hace nada.
+    Para que se vea desde otros dispositivos de la red usa host="0.0.0.0".
+    """
+    global _cola, _despertador, _hilo, _ultima_fase
+    if not puerto or _hilo is not None:
+        return
+    servidor = _Servidor(host, puerto, nombres_cartas)
+    _cola = queue.SimpleQueue()
+    _despertador = servidor.despertador
+    _ultima_fase = None
+    _hilo = threading.Thread(target=servidor.ejecutar, args=(_cola,), name="transmision", daemon=True)
+    _hilo.start()
+
+
+def detener():
+    """
+    Envía lo pendiente que se pueda, cierra las conexiones y detiene el hilo.
+    """
+    global _cola, _despertador, _hilo
+    if _hilo is None:
+        return
+    _cola.put(None)
+    _despertar()
+    _hilo.join()
+    _cola = _despertador = _hilo = None
+
+
+# Codificación
+
+def _varint(n):
+    datos = bytearray()
+    while n >= 0x80:
+        datos.append(n & 0x7f | 0x80)
+        n >>= 7
+    datos.append(n)
+    return bytes(datos)
+
+
+def _codigo_fase(fase_auto):
+    return FASES.index(fase_auto) if fase_auto in FASES else 0
+
+
+def _ids(ids):
+    return struct.pack(f'<{len(ids)}H', *ids)
+
+
+def codificar(tipo, *datos):
+    """
+    Devuelve el mensaje completo, con su longitud delante.
+    """
+    if tipo == CARTAS:
+        (nombres,) = datos
+        cuerpo = '\n'.join(nombres).encode('utf-8')
+    elif tipo == FOTO:
+        semilla, estado, fase_auto, resultado, pilas, pregunta = datos
+        partes = [_FOTO.pack(semilla, estado, _codigo_fase(fase_auto),
+                             _SIN_RESULTADO if resultado is None else int(resultado), len(pilas))]
+        for pila in pilas:
+            partes.append(struct.pack('<H', len(pila)) + _ids(pila))
+        partes.append(pregunta.encode('utf-8'))
+        cuerpo = b''.join(partes)
+    elif tipo == RECOGER:
+        cuerpo = b''
+    elif tipo == REPARTO:
+        semilla, ids = datos
+        cuerpo = struct.pack('<I', semilla) + _ids(ids)
+    elif tipo == JUGADA:
+        cuerpo = _JUGADA.pack(*datos)
+    elif tipo == FASE:
+        estado, fase_auto = datos
+        cuerpo = _FASE.pack(estado, _codigo_fase(fase_auto))
+    elif tipo == PREGUNTA:
+        (texto,) = datos
+        cuerpo = texto.encode('utf-8')
+    elif tipo == FIN:
+        victoria, volteadas, total = datos
+        cuerpo = _FIN.pack(int(victoria), volteadas, total)
+    else:
+        raise ValueError(f"Tipo de mensaje desconocido: {tipo}")
+    return _varint(len(cuerpo) + 1) + bytes((tipo,)) + cuerpo
+
+
+def decodificar(mensaje):
+    """
+    Convierte un mensaje sin su longitud en (tipo, datos), con los mismos
+    datos que recibe Mesa.aplicar. Los tipos desconocidos dan (tipo, None).
+    """
+    tipo, cuerpo = mensaje[0], memoryview(mensaje)[1:]
+    if tipo == CARTAS:
+        texto = bytes(cuerpo).decode('utf-8')
+        return tipo, (texto.split('\n') if texto else [],)
+    if tipo == FOTO:
+        semilla, estado, fase_auto, resultado, num_pilas = _FOTO.unpack_from(cuerpo)
+        posicion = _FOTO.size
+        pilas = []
+        for _ in range(num_pilas):
+            (n,) = struct.unpack_from('<H', cuerpo, posicion)
+            pilas.append(list(struct.unpack_from(f'<{n}H', cuerpo, posicion + 2)))
+            posicion += 2 + 2 * n
+        pregunta = bytes(cuerpo[posicion:]).decode('utf-8')
+        resultado = None if resultado == _SIN_RESULTADO else bool(resultado)
+        return tipo, (semilla, estado, FASES[fase_auto], resultado, pilas, pregunta)
+    if tipo == RECOGER:
+        return tipo, ()
+    if tipo == REPARTO:
+        (semilla,) = struct.unpack_from('<I', cuerpo)
+        n = (len(cuerpo) - 4) // 2
+        return tipo, (semilla, list(struct.unpack_from(f'<{n}H', cuerpo, 4)))
+    if tipo == JUGADA:
+        return tipo, _JUGADA.unpack(cuerpo)
+    if tipo == FASE:
+        estado, fase_auto = _FASE.unpack(cuerpo)
+        return tipo, (estado, FASES[fase_auto])
+    if tipo == PREGUNTA:
+        return tipo, (bytes(cuerpo).decode('utf-8'),)
+    if tipo == FIN:
+        victoria, volteadas, total = _FIN.unpack(cuerpo)
+        return tipo, (bool(victoria), volteadas, total)
+    return tipo, None
+
+
+class Lector:
+    """
+    Separa en mensajes los bytes que llegan por el socket, en trozos de
+    cualquier tamaño.
+    """
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def recibir(self, datos):
+        """
+        Añade datos y devuelve la lista de (tipo, datos) de los mensajes completos.
+        """
+        self.buffer += datos
+        mensajes = []
+        posicion = 0
+        while True:
+            largo = desplazamiento = 0
+            i = posicion
+            while i < len(self.buffer):
+                byte = self.buffer[i]
+                largo |= (byte & 0x7f) << desplazamiento
+                desplazamiento += 7
+                i += 1
+                if not byte & 0x80:
+                    break
+            else:
+                break  # Longitud incompleta
+            if len(self.buffer) - i < largo:
+                break
+            mensajes.append(decodificar(bytes(self.buffer[i:i + largo])))
+            posicion = i + largo
+        del self.buffer[:posicion]
+        return mensajes
+
+
+class Mesa:
+    """
+    Estado de la mesa que ve un espectador, reconstruido a partir de los
+    mensajes. La usan el servidor, para las fotos, y el visor.
+    """
+    def __init__(self, num_pilas=NUM_PILAS):
+        self.nombres = []          # Nombre de archivo de cada id de carta
+        self.pilas = [[] for _ in range(num_pilas)]
+        self.volteadas = set()
+        self.semilla = 0
+        self.estado = 0
+        self.fase = None
+        self.pregunta = ""
+        self.resultado = None      # None mientras se juega, True o False al terminar
+        self.jugadas = 0
+
+    def aplicar(self, tipo, datos):
+        if tipo == CARTAS:
+            (self.nombres,) = datos
+        elif tipo == FOTO:
+            self.semilla, self.estado, self.fase, self.resultado, pilas, self.pregunta = datos
+            self.pilas = [[carta & ~VOLTEADA for carta in pila] for pila in pilas]
+            self.volteadas = {carta & ~VOLTEADA for pila in pilas for carta in pila if carta & VOLTEADA}
+            self.jugadas = len(self.volteadas)
+        elif tipo == RECOGER:
+            self.pilas = [[] for _ in self.pilas]
+            self.volteadas = set()
+            self.resultado = None
+            self.jugadas = 0
+        elif tipo == REPARTO:
+            self.semilla, ids = datos
+            self.aplicar(RECOGER, ())
+            for i, carta in enumerate(ids):
+                self.pilas[i % len(self.pilas)].append(carta)
+        elif tipo == JUGADA:
+            carta, origen, destino = datos
+            if carta in self.pilas[origen]:
+                self.pilas[origen].remove(carta)
+            self.pilas[destino].append(carta)
+            self.volteadas.add(carta)
+            self.jugadas += 1
+        elif tipo == FASE:
+            self.estado, self.fase = datos
+        elif tipo == PREGUNTA:
+            (self.pregunta,) = datos
+        elif tipo == FIN:
+            self.resultado = datos[0]
+
+    def foto(self):
+        """
+        Mensaje FOTO con el estado completo, para un espectador que llega.
+        """
+        pilas = [[carta | VOLTEADA if carta in self.volteadas else carta for carta in pila] for pila in self.pilas]
+        return codificar(FOTO, self.semilla, self.estado, self.fase, self.resultado, pilas, self.pregunta)
+
+
+class _Servidor:
+    def __init__(self, host, puerto, nombres_cartas):
+        self.escucha = socket.create_server((host, puerto))
+        self.escucha.setblocking(False)
+        self.despertador, self._aviso = socket.socketpair()
+        self.despertador.setblocking(False)
+        self._aviso.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.escucha, selectors.EVENT_READ)
+        self.selector.register(self._aviso, selectors.EVENT_READ)
+        self.mesa = Mesa()
+        self.cartas = codificar(CARTAS, list(nombres_cartas))
+        self.pendiente = {}  # socket del espectador -> bytearray sin enviar
+
+    def ejecutar(self, cola):
+        terminar = False
+        while not terminar:
+            for clave, mascara in self.selector.select():
+                if clave.fileobj is self.escucha:
+                    self.aceptar()
+                elif clave.fileobj is self._aviso:
+                    terminar = self.repartir(cola) or terminar
+                else:
+                    if mascara & selectors.EVENT_READ:
+                        self.leer(clave.fileobj)
+                    if mascara & selectors.EVENT_WRITE and clave.fileobj in self.pendiente:
+                        self.enviar(clave.fileobj)
+        for espectador in list(self.pendiente):
+            self.enviar(espectador)
+            self.cerrar(espectador)
+        self.selector.close()
+        self.escucha.close()
+        self._aviso.close()
+        self.despertador.close()
+
+    def aceptar(self):
+        try:
+            espectador, _ = self.escucha.accept()
+        except OSError:
+            return
+        espectador.setblocking(False)
+        espectador.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.pendiente[espectador] = bytearray()
+        self.selector.register(espectador, selectors.EVENT_READ)
+        self.poner(espectador, self.cartas + self.mesa.foto())
+
+    def repartir(self, cola):
+        """
+        Aplica y reenvía los cambios encolados. Devuelve True al recibir la orden de parar.
+        """
+        try:
+            while self._aviso.recv(4096):
+                pass
+        except OSError:
+            pass
+        mensajes = []
+        terminar = False
+        while True:
+            try:
+                pendiente = cola.get_nowait()
+            except queue.Empty:
+                break
+            if pendiente is None:
+                terminar = True
+                continue
+            tipo, datos = pendiente
+            self.mesa.aplicar(tipo, datos)
+            mensajes.append(codificar(tipo, *datos))
+        if mensajes:
+            # Todo lo encolado sale en un solo envío por espectador
+            datos = b''.join(mensajes)
+            for espectador in list(self.pendiente):
+                self.poner(espectador, datos)
+        return terminar
+
+    def poner(self, espectador, datos):
+        buffer = self.pendiente[espectador]
+        vacio = not buffer
+        buffer += datos
+        if len(buffer) > MAX_PENDIENTE:
+            self.cerrar(espectador)  # No lee: que vuelva a conectarse y reciba una foto
+        elif vacio:
+            self.enviar(espectador)
+
+    def enviar(self, espectador):
+        buffer = self.pendiente[espectador]
+        try:
+            enviados = espectador.send(buffer)
+        except BlockingIOError:
+            enviados = 0
+        except OSError:
+            self.cerrar(espectador)
+            return
+        del buffer[:enviados]
+        eventos = selectors.EVENT_READ | (selectors.EVENT_WRITE if buffer else 0)
+        self.selector.modify(espectador, eventos)
+
+    def leer(self, espectador):
+        # Los espectadores no envían nada: leer solo sirve para ver si se fueron
+        try:
+            datos = espectador.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            datos = b''
+        if not datos:
+            self.cerrar(espectador)
+
+    def cerrar(self, espectador):
+        if self.pendiente.pop(espectador, None) is None:
+            return
+        self.selector.unregister(espectador)
+        espectador.close()